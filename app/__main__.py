@@ -1,35 +1,102 @@
-# pylint: disable=wrong-import-position
-import os
-from contextlib import asynccontextmanager
+# pylint: disable=import-outside-toplevel
+import argparse
+import getpass
+from typing import TYPE_CHECKING
 
 from dotenv import load_dotenv
-from fastapi import FastAPI
-from fastapi_pagination import add_pagination
+
+if TYPE_CHECKING:
+    from fastapi import FastAPI
 
 load_dotenv()
 
-from app.database._engine import db_init
-from app.routes.login import router as router_login
-from app.routes.status import router as router_status
-from app.routes.user import router as router_user
+app: 'FastAPI'
+
+
+def __getattr__(name: str):
+    """app создаётся фабрикой при первом обращении: CLI-команды не импортируют FastAPI"""
+    if name == 'app':
+        from app.application import create_app
+        globals()['app'] = create_app()
+        return globals()['app']
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
 
+def import_users_command(args: argparse.Namespace):
+    """Импорт пользователей из файла NDJSON/CSV"""
+    from app.database._engine import db_init
+    from app.database.user_import import IMPORT_CHUNK_SIZE, import_users
 
-@asynccontextmanager
-async def lifespan(_: FastAPI):
+    file_format = args.format or ('csv' if args.path.endswith('.csv') else 'ndjson')
     db_init()
-    yield
+    with open(args.path, encoding='utf-8-sig', newline='') as file:
+        report = import_users(file, file_format, args.chunk_size or IMPORT_CHUNK_SIZE)
+    print(report.model_dump_json(indent=2))
+
+
+def seed_users_command(args: argparse.Namespace):
+    """Заполнить БД сгенерированными пользователями"""
+    from app.database._engine import db_init
+    from app.database.seed import SEED_BATCH_SIZE, seed_users
+
+    db_init()
+    print(f'Seeded {seed_users(args.count, args.seed, args.batch_size or SEED_BATCH_SIZE)} users')
+
+
+def set_password_command(args: argparse.Namespace):
+    """Задать пароль пользователя по email"""
+    from app.auth import hash_password
+    from app.database._engine import db_init
+    from app.database.credentials import get_user_id, set_password_hash
+
+    db_init()
+    user_id = get_user_id(args.email)
+    if user_id is None:
+        raise SystemExit(f'User {args.email} not found')
+    set_password_hash(user_id, hash_password(getpass.getpass()))
+    print(f'Password set for {args.email}')
+
 
+def serve_command(args: argparse.Namespace):
+    """Запуск сервера в нескольких процессах"""
+    from app.server import serve
 
-app = FastAPI(lifespan=lifespan)
+    serve(args.workers, args.host, args.port, args.loop, args.http)
 
 
-app.include_router(router_status)
-app.include_router(router_user)
-app.include_router(router_login)
+def main():
+    """Точка входа python -m app"""
+    parser = argparse.ArgumentParser(prog='python -m app')
+    commands = parser.add_subparsers(dest='command')
+    import_parser = commands.add_parser('import-users', help='Импорт пользователей из файла')
+    import_parser.add_argument('path')
+    import_parser.add_argument('--format', choices=['ndjson', 'csv'])
+    import_parser.add_argument(
+        '--chunk-size', type=int, help='По умолчанию USERS_IMPORT_CHUNK_SIZE')
+    import_parser.set_defaults(handler=import_users_command)
+    seed_parser = commands.add_parser('seed-users', help='Заполнить БД пользователями')
+    seed_parser.add_argument('count', type=int)
+    seed_parser.add_argument('--seed', type=int)
+    seed_parser.add_argument('--batch-size', type=int, help='По умолчанию USERS_SEED_BATCH_SIZE')
+    seed_parser.set_defaults(handler=seed_users_command)
+    password_parser = commands.add_parser('set-password', help='Задать пароль пользователя')
+    password_parser.add_argument('email')
+    password_parser.set_defaults(handler=set_password_command)
+    serve_parser = commands.add_parser('serve', help='Запустить сервер (по умолчанию)')
+    serve_parser.add_argument('--workers', type=int, help='По умолчанию WEB_WORKERS или число CPU')
+    serve_parser.add_argument('--host')
+    serve_parser.add_argument('--port', type=int)
+    serve_parser.add_argument(
+        '--loop', choices=['auto', 'asyncio', 'uvloop'], help='По умолчанию WEB_LOOP')
+    serve_parser.add_argument(
+        '--http', choices=['auto', 'h11', 'httptools'], help='По умолчанию WEB_HTTP')
+    serve_parser.set_defaults(handler=serve_command)
+    args = parser.parse_args()
 
-add_pagination(app)
+    if args.command is None:
+        args = parser.parse_args(['serve'])
+    args.handler(args)
 
 
 if __name__ == '__main__':
-    import uvicorn
-    uvicorn.run(app)
+    main()
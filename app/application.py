@@ -0,0 +1,67 @@
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING
+
+from dotenv import load_dotenv
+
+if TYPE_CHECKING:
+    from fastapi import FastAPI
+
+# pylint: disable=import-outside-toplevel
+
+
+@asynccontextmanager
+async def lifespan(_: 'FastAPI'):
+    """Запуск: схема БД, лента изменений и проверка доступности; остановка: дописать
+    очередь записи, закрыть подписки, соединения и пулы
+    """
+    from app import auth
+    from app.database import _engine, changefeed, replicas, write_behind
+    from app.database.health import health_monitor
+
+    _engine.db_init()
+    await changefeed.feed.start()
+    health_monitor.start()
+    yield
+    await write_behind.user_creates.close()
+    await changefeed.feed.stop()
+    await health_monitor.stop()
+    await _engine.dispose_async_engine()
+    await replicas.router.dispose()
+    auth.shutdown_hash_pool()
+    _engine.dispose_engine()
+
+
+def create_app() -> 'FastAPI':
+    """Приложение FastAPI с маршрутами и middleware.
+
+    FastAPI, модели и маршруты импортируются при вызове, а не при импорте
+    модуля, движки БД создаются при первом обращении к БД. Для uvicorn:
+    app.application:create_app с --factory.
+    """
+    load_dotenv()
+    from fastapi import FastAPI
+    from fastapi_pagination import add_pagination
+
+    from app.middleware.compression import CompressionMiddleware
+    from app.middleware.metrics import MetricsMiddleware
+    from app.middleware.ratelimit import RateLimitMiddleware
+    from app.middleware.replicas import ReadYourWritesMiddleware
+    from app.routes.login import router as router_login
+    from app.routes.metrics import router as router_metrics
+    from app.routes.status import router as router_status
+    from app.routes.user import router as router_user
+
+    app = FastAPI(lifespan=lifespan)
+
+    app.include_router(router_status)
+    app.include_router(router_user)
+    app.include_router(router_login)
+    app.include_router(router_metrics)
+
+    app.add_middleware(ReadYourWritesMiddleware)
+    app.add_middleware(RateLimitMiddleware)
+    app.add_middleware(CompressionMiddleware)
+    app.add_middleware(MetricsMiddleware)
+
+    add_pagination(app)
+    return app
@@ -0,0 +1,163 @@
+import asyncio
+import hashlib
+import hmac
+import os
+import secrets
+import time
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+KDF_N = int(os.getenv('LOGIN_KDF_N', '16384'))
+KDF_R = int(os.getenv('LOGIN_KDF_R', '8'))
+KDF_P = int(os.getenv('LOGIN_KDF_P', '1'))
+HASH_WORKERS = int(os.getenv('LOGIN_HASH_WORKERS', str(min(4, os.cpu_count() or 1))))
+SESSION_CACHE_SIZE = int(os.getenv('LOGIN_SESSION_CACHE_SIZE', '1024'))
+SESSION_CACHE_TTL = float(os.getenv('LOGIN_SESSION_CACHE_TTL', '300'))
+TOKEN_TTL = int(os.getenv('LOGIN_TOKEN_TTL', '3600'))
+# Без LOGIN_TOKEN_SECRET ключ случайный: токены действительны до перезапуска,
+# воркерам serve общий случайный ключ передаёт app.server.share_token_secret
+TOKEN_SECRET = (os.getenv('LOGIN_TOKEN_SECRET') or secrets.token_hex(32)).encode()
+
+HASH_POOL: ThreadPoolExecutor | None = None
+
+
+def _b64encode(data: bytes) -> str:
+    return urlsafe_b64encode(data).rstrip(b'=').decode()
+
+
+def _b64decode(data: str) -> bytes:
+    return urlsafe_b64decode(data + '=' * (-len(data) % 4))
+
+
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    return hashlib.scrypt(
+        password.encode(), salt=salt, n=n, r=r, p=p,
+        maxmem=128 * r * (n + p + 2) + 1024 * 1024, dklen=32,
+    )
+
+
+def hash_password(password: str) -> str:
+    """Хэш пароля scrypt с параметрами LOGIN_KDF_* в формате scrypt$n$r$p$salt$hash"""
+    salt = secrets.token_bytes(16)
+    digest = _scrypt(password, salt, KDF_N, KDF_R, KDF_P)
+    return f'scrypt${KDF_N}${KDF_R}${KDF_P}${_b64encode(salt)}${_b64encode(digest)}'
+
+
+def verify_password(password: str, password_hash: str) -> bool:
+    """Пароль соответствует хэшу; параметры KDF берутся из самого хэша"""
+    try:
+        algorithm, n, r, p, salt, digest = password_hash.split('$')
+        if algorithm != 'scrypt':
+            return False
+        expected = _scrypt(password, _b64decode(salt), int(n), int(r), int(p))
+    except ValueError:
+        return False
+    return hmac.compare_digest(expected, _b64decode(digest))
+
+
+def needs_rehash(password_hash: str) -> bool:
+    """Хэш получен с параметрами, отличными от текущих LOGIN_KDF_*"""
+    return not password_hash.startswith(f'scrypt${KDF_N}${KDF_R}${KDF_P}$')
+
+
+def get_hash_pool() -> ThreadPoolExecutor:
+    """Пул потоков для KDF, создаётся при первом обращении.
+
+    Отдельный от пула запросов: долгое хэширование не занимает потоки,
+    нужные sync-обработчикам, а HASH_WORKERS ограничивает нагрузку на CPU.
+    """
+    global HASH_POOL  # pylint: disable=global-statement
+    if HASH_POOL is None:
+        HASH_POOL = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix='kdf')
+    return HASH_POOL
+
+
+def shutdown_hash_pool():
+    """Остановить пул KDF"""
+    global HASH_POOL  # pylint: disable=global-statement
+    if HASH_POOL is not None:
+        HASH_POOL.shutdown()
+        HASH_POOL = None
+
+
+async def hash_password_async(password: str) -> str:
+    """Хэш пароля в пуле KDF"""
+    return await asyncio.get_running_loop().run_in_executor(
+        get_hash_pool(), hash_password, password)
+
+
+class VerifiedSessions:
+    """Недавно проверенные пары email и пароля, не больше maxsize.
+
+    Хранится HMAC пары на секрете токенов и хэш, с которым пароль совпал:
+    после смены пароля хэш в БД другой, и запись перестаёт подходить.
+    """
+    def __init__(self, maxsize: int = SESSION_CACHE_SIZE, ttl: float = SESSION_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[bytes, tuple[str, float]] = OrderedDict()
+
+    @staticmethod
+    def _key(email: str, password: str) -> bytes:
+        return hmac.digest(TOKEN_SECRET, f'{email}\0{password}'.encode(), 'sha256')
+
+    def check(self, email: str, password: str, password_hash: str) -> bool:
+        """Пара уже проверялась с этим хэшем и запись не устарела"""
+        key = self._key(email, password)
+        entry = self._data.get(key)
+        if entry is None or entry[1] <= time.monotonic():
+            return False
+        self._data.move_to_end(key)
+        return hmac.compare_digest(entry[0], password_hash)
+
+    def add(self, email: str, password: str, password_hash: str):
+        """Запомнить успешную проверку"""
+        key = self._key(email, password)
+        self._data[key] = (password_hash, time.monotonic() + self.ttl)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        """Очистить кэш"""
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+verified_sessions = VerifiedSessions()
+
+
+async def check_password(email: str, password: str, password_hash: str) -> bool:
+    """Проверить пароль: из кэша проверенных пар или KDF в отдельном пуле"""
+    if verified_sessions.check(email, password, password_hash):
+        return True
+    valid = await asyncio.get_running_loop().run_in_executor(
+        get_hash_pool(), verify_password, password, password_hash)
+    if valid:
+        verified_sessions.add(email, password, password_hash)
+    return valid
+
+
+def _sign(payload: str) -> str:
+    return _b64encode(hmac.digest(TOKEN_SECRET, payload.encode(), 'sha256'))
+
+
+def issue_token(user_id: int, now: float | None = None) -> str:
+    """Подписанный токен user_id.expires.signature, действует LOGIN_TOKEN_TTL секунд"""
+    expires = int(time.time() if now is None else now) + TOKEN_TTL
+    payload = f'{user_id}.{expires}'
+    return f'{payload}.{_sign(payload)}'
+
+
+def verify_token(token: str, now: float | None = None) -> int | None:
+    """id пользователя из токена без обращения к БД, None - подпись неверна или срок истёк"""
+    payload, _, signature = token.rpartition('.')
+    if not hmac.compare_digest(_sign(payload).encode(), signature.encode()):
+        return None
+    user_id, _, expires = payload.partition('.')
+    if int(expires) <= (time.time() if now is None else now):
+        return None
+    return int(user_id)
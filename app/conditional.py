@@ -0,0 +1,70 @@
+import hashlib
+from datetime import datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Iterable
+
+from fastapi import Request
+
+from app.models.user import UserModel
+
+
+def user_etag(user: UserModel) -> str:
+    """ETag пользователя по id и версии строки"""
+    return f'"{user.id}.{user.version}"'
+
+
+def page_etag(users: Iterable[UserModel], *extra) -> str:
+    """ETag страницы по id и версиям пользователей и параметрам страницы"""
+    digest = hashlib.blake2b(repr(extra).encode(), digest_size=16)
+    for user in users:
+        digest.update(f'{user.id}.{user.version};'.encode())
+    return f'"{digest.hexdigest()}"'
+
+
+def validators(etag: str, last_modified: datetime | None = None) -> dict[str, str]:
+    """Заголовки ETag, Last-Modified и Cache-Control для ответа"""
+    headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+    if last_modified is not None:
+        headers['Last-Modified'] = format_datetime(last_modified, usegmt=True)
+    return headers
+
+
+def user_validators(user: UserModel) -> dict[str, str]:
+    """Заголовки валидации для ответа с пользователем"""
+    return validators(user_etag(user), user.updated_at)
+
+
+def parse_etags(header: str) -> list[str]:
+    """Список ETag из If-Match / If-None-Match"""
+    return [tag.strip() for tag in header.split(',') if tag.strip()]
+
+
+def not_modified(request: Request, etag: str, last_modified: datetime | None = None) -> bool:
+    """Клиентская копия актуальна: можно ответить 304 Not Modified.
+
+    If-Modified-Since учитывается, только если нет If-None-Match.
+    """
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match is not None:
+        tags = [tag.removeprefix('W/') for tag in parse_etags(if_none_match)]
+        return '*' in tags or etag in tags
+    if_modified_since = request.headers.get('if-modified-since')
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    return since.tzinfo is not None and last_modified.replace(microsecond=0) <= since
+
+
+def if_match_versions(if_match: str | None, user_id: int) -> set[int] | None:
+    """Версии пользователя из If-Match, None - условие не задано или '*'"""
+    if if_match is None or if_match.strip() == '*':
+        return None
+    versions = set()
+    for tag in parse_etags(if_match):
+        tag_id, _, version = tag.strip('"').partition('.')
+        if not tag.startswith('W/') and tag_id == str(user_id) and version.isdigit():
+            versions.add(int(version))
+    return versions
@@ -1,24 +1,200 @@
 import logging
 import os
+import threading
 
+from sqlalchemy import Engine, event
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlalchemy.orm import Session
-from sqlmodel import SQLModel, create_engine, text
+from sqlalchemy.schema import CreateColumn, CreateIndex
+from sqlmodel import SQLModel, create_engine, inspect, text
 
-engine = create_engine(
-    url=os.getenv('DATABASE_ENGINE'),
-    pool_size=int(os.getenv('DATABASE_POOL_SIZE', '10'))
-)
+from app.database.pool import INSTRUMENTED_POOLS, pool_status
+from app.database.query_metrics import instrument_engine
+
+DATABASE_ASYNC = os.getenv('DATABASE_ASYNC', 'false').lower() in ('1', 'true', 'yes')
+DATABASE_POOL_PRE_PING = os.getenv('DATABASE_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes')
+# false - схемой БД управляют миграции, db_init её не создаёт и не меняет
+DATABASE_CREATE_ALL = os.getenv('DATABASE_CREATE_ALL', 'true').lower() in ('1', 'true', 'yes')
+
+_ASYNC_DRIVERS = {
+    'postgresql': 'postgresql+asyncpg',
+    'sqlite': 'sqlite+aiosqlite',
+}
+
+
+def pool_options(url: str | URL) -> dict:
+    """Параметры пула соединений из DATABASE_POOL_*"""
+    url = make_url(url)
+    pool_class = url.get_dialect().get_pool_class(url)
+    if pool_class not in INSTRUMENTED_POOLS:
+        return {'pool_pre_ping': DATABASE_POOL_PRE_PING}
+    return {
+        'poolclass': INSTRUMENTED_POOLS[pool_class],
+        'pool_size': int(os.getenv('DATABASE_POOL_SIZE', '10')),
+        'max_overflow': int(os.getenv('DATABASE_MAX_OVERFLOW', '10')),
+        'pool_timeout': float(os.getenv('DATABASE_POOL_TIMEOUT', '30')),
+        'pool_recycle': int(os.getenv('DATABASE_POOL_RECYCLE', '1800')),
+        'pool_pre_ping': DATABASE_POOL_PRE_PING,
+    }
+
+
+def _enable_foreign_keys(dbapi_connection, _):
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA foreign_keys=ON')
+    cursor.close()
+
+
+def enable_foreign_keys(sync_engine: Engine):
+    """Проверка внешних ключей и ON DELETE CASCADE в SQLite (по умолчанию выключены)"""
+    if sync_engine.dialect.name == 'sqlite':
+        event.listen(sync_engine, 'connect', _enable_foreign_keys)
+
+
+_engine_lock = threading.Lock()
+_sync_engine: Engine | None = None
+_replica_engines: list[Engine] | None = None
+_async_engine: AsyncEngine | None = None
+
+
+def get_engine() -> Engine:
+    """Основной движок БД, создаётся при первом обращении"""
+    global _sync_engine  # pylint: disable=global-statement
+    with _engine_lock:
+        if _sync_engine is None:
+            url = os.getenv('DATABASE_ENGINE')
+            _sync_engine = create_engine(url=url, **pool_options(url))
+            instrument_engine(_sync_engine)
+            enable_foreign_keys(_sync_engine)
+    return _sync_engine
+
+
+def get_replica_engines() -> list[Engine]:
+    """Движки реплик из DATABASE_REPLICAS, создаются при первом обращении"""
+    global _replica_engines  # pylint: disable=global-statement
+    with _engine_lock:
+        if _replica_engines is None:
+            _replica_engines = [
+                create_engine(url=url, **pool_options(url))
+                for url in filter(None, os.getenv('DATABASE_REPLICAS', '').split(','))
+            ]
+            for replica_engine in _replica_engines:
+                instrument_engine(replica_engine)
+    return _replica_engines
+
+
+def __getattr__(name: str):
+    """engine и replica_engines - движки, созданные при первом обращении к атрибуту"""
+    if name == 'engine':
+        return get_engine()
+    if name == 'replica_engines':
+        return get_replica_engines()
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def async_url(url: str | URL) -> URL:
+    """Адрес БД с асинхронным драйвером"""
+    url = make_url(url)
+    return url.set(drivername=_ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername))
+
+
+def get_async_engine() -> AsyncEngine:
+    """Асинхронный движок БД, создаётся при первом обращении"""
+    global _async_engine  # pylint: disable=global-statement
+    if _async_engine is None:
+        url = os.getenv('DATABASE_ASYNC_ENGINE') or async_url(get_engine().url)
+        _async_engine = create_async_engine(url=url, **pool_options(url))
+        instrument_engine(_async_engine.sync_engine)
+        enable_foreign_keys(_async_engine.sync_engine)
+    return _async_engine
+
+
+async def dispose_async_engine():
+    """Закрыть соединения асинхронного движка"""
+    global _async_engine  # pylint: disable=global-statement
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+
+
+def pools_status() -> list[dict]:
+    """Состояние пулов соединений созданных движков"""
+    pools = []
+    if _sync_engine is not None:
+        pools.append(pool_status('sync', _sync_engine.pool))
+    if _async_engine is not None:
+        pools.append(pool_status('async', _async_engine.pool))
+    pools.extend(
+        pool_status(f'replica{index}', replica.pool)
+        for index, replica in enumerate(_replica_engines or [])
+    )
+    return pools
+
+
+def dispose_engine():
+    """Закрыть соединения основного движка, если он создан"""
+    if _sync_engine is not None:
+        _sync_engine.dispose()
 
 
 def db_init():
-    """Инициализация БД"""
-    SQLModel.metadata.create_all(engine)
+    """Инициализация БД, без DATABASE_CREATE_ALL - ничего не делает"""
+    if not DATABASE_CREATE_ALL:
+        logging.info('DATABASE_CREATE_ALL is off, database schema is not created')
+        return
+    # Таблицы регистрируются в SQLModel.metadata при импорте моделей
+    # pylint: disable=import-outside-toplevel,unused-import
+    import app.models.login
+    import app.models.user
+    SQLModel.metadata.create_all(get_engine())
+    create_columns()
+    create_indexes()
+
+
+def create_columns():
+    """Добавить столбцы, появившиеся в моделях после создания таблиц"""
+    engine = get_engine()
+    inspector = inspect(engine)
+    for table in SQLModel.metadata.sorted_tables:
+        existing = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            definition = CreateColumn(column).compile(dialect=engine.dialect)
+            with engine.begin() as connection:
+                connection.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {definition}'))
+
+
+def create_indexes():
+    """Создать индексы, добавленные в модели после создания таблиц.
+
+    Индексы с ``info['dialect']`` создаются только для своей СУБД. Ошибка
+    создания (например, дубли email для уникального индекса) не прерывает запуск.
+    """
+    engine = get_engine()
+    dialect = engine.dialect.name
+    statements = []
+    if dialect == 'postgresql':
+        statements.append(text('CREATE EXTENSION IF NOT EXISTS pg_trgm'))
+    statements.extend(
+        CreateIndex(index, if_not_exists=True)
+        for table in SQLModel.metadata.sorted_tables
+        for index in table.indexes
+        if index.info.get('dialect', dialect) == dialect
+    )
+    for statement in statements:
+        try:
+            with engine.begin() as connection:
+                connection.execute(statement)
+        except SQLAlchemyError as e:
+            logging.warning('On index creation: %s', e)
 
 
 def check_availability() -> bool:
     """Проверка доступности БД"""
     try:
-        with Session(engine) as session:
+        with Session(get_engine()) as session:
             session.execute(text('SELECT 1'))
         return True
     # pylint: disable=broad-exception-caught
@@ -0,0 +1,348 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Iterable, Protocol
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.models.user import UserModel
+
+
+class CacheBackend:
+    """Кэш пользователей по id.
+
+    Запись из запроса на чтение (``fill``) принимается, только если с момента
+    ``version()`` не было инвалидаций: так чтение, начавшееся до изменения,
+    не вернёт в кэш устаревшую запись.
+
+    Методы *_async для async-обработчиков: у кэша с блокирующим клиентом
+    (``blocking``) вызов выполняется в пуле потоков, а не в цикле событий.
+    """
+    blocking = False
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def version(self) -> int:
+        """Номер поколения кэша, снимается перед запросом в БД"""
+        return self._version
+
+    def get(self, user_id: int) -> UserModel | None:
+        """Получить пользователя из кэша"""
+        user = self._get(user_id)
+        with self._lock:
+            if user is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return user
+
+    def get_many(self, user_ids: Iterable[int]) -> dict[int, UserModel]:
+        """Получить из кэша найденных пользователей по списку id одним обращением"""
+        user_ids = list(user_ids)
+        found = {
+            user_id: user for user_id, user in zip(user_ids, self._get_many(user_ids))
+            if user is not None
+        }
+        with self._lock:
+            self.hits += len(found)
+            self.misses += len(user_ids) - len(found)
+        return found
+
+    def fill(self, user_id: int, user: UserModel, version: int):
+        """Сохранить прочитанного из БД пользователя"""
+        with self._lock:
+            if version != self._version:
+                return
+        self._set(user_id, user)
+
+    def fill_many(self, users: Iterable[UserModel], version: int):
+        """Сохранить прочитанных из БД пользователей одним обращением"""
+        with self._lock:
+            if version != self._version:
+                return
+        self._set_many(list(users))
+
+    def refresh(self, user_id: int, user: UserModel):
+        """Заменить запись после изменения пользователя"""
+        with self._lock:
+            self._version += 1
+        self._set(user_id, user)
+
+    def refresh_many(self, users: Iterable[UserModel]):
+        """Заменить записи после изменения пользователей одним обращением"""
+        with self._lock:
+            self._version += 1
+        self._set_many(list(users))
+
+    def invalidate(self, user_id: int):
+        """Удалить запись после удаления пользователя"""
+        with self._lock:
+            self._version += 1
+        self._delete(user_id)
+
+    def invalidate_many(self, user_ids: Iterable[int]):
+        """Удалить записи после удаления пользователей одним обращением"""
+        with self._lock:
+            self._version += 1
+        self._delete_many(list(user_ids))
+
+    def clear(self):
+        """Очистить кэш и счётчики"""
+        with self._lock:
+            self._version += 1
+            self.hits = self.misses = self.evictions = 0
+        self._clear()
+
+    def stats(self) -> dict[str, Any]:
+        """Счётчики попаданий, промахов и вытеснений"""
+        return {
+            'backend': type(self).__name__,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': self._size(),
+        }
+
+    async def _call_async(self, method: Callable, *args) -> Any:
+        if self.blocking:
+            return await run_in_threadpool(method, *args)
+        return method(*args)
+
+    async def get_async(self, user_id: int) -> UserModel | None:
+        """Получить пользователя из кэша (async)"""
+        return await self._call_async(self.get, user_id)
+
+    async def get_many_async(self, user_ids: Iterable[int]) -> dict[int, UserModel]:
+        """Получить из кэша найденных пользователей по списку id (async)"""
+        return await self._call_async(self.get_many, user_ids)
+
+    async def fill_async(self, user_id: int, user: UserModel, version: int):
+        """Сохранить прочитанного из БД пользователя (async)"""
+        await self._call_async(self.fill, user_id, user, version)
+
+    async def fill_many_async(self, users: Iterable[UserModel], version: int):
+        """Сохранить прочитанных из БД пользователей (async)"""
+        await self._call_async(self.fill_many, users, version)
+
+    async def refresh_async(self, user_id: int, user: UserModel):
+        """Заменить запись после изменения пользователя (async)"""
+        await self._call_async(self.refresh, user_id, user)
+
+    async def refresh_many_async(self, users: Iterable[UserModel]):
+        """Заменить записи после изменения пользователей (async)"""
+        await self._call_async(self.refresh_many, users)
+
+    async def invalidate_async(self, user_id: int):
+        """Удалить запись после удаления пользователя (async)"""
+        await self._call_async(self.invalidate, user_id)
+
+    async def invalidate_many_async(self, user_ids: Iterable[int]):
+        """Удалить записи после удаления пользователей (async)"""
+        await self._call_async(self.invalidate_many, user_ids)
+
+    def _get(self, user_id: int) -> UserModel | None:
+        raise NotImplementedError
+
+    def _get_many(self, user_ids: list[int]) -> list[UserModel | None]:
+        return [self._get(user_id) for user_id in user_ids]
+
+    def _set(self, user_id: int, user: UserModel):
+        raise NotImplementedError
+
+    def _set_many(self, users: list[UserModel]):
+        for user in users:
+            self._set(user.id, user)
+
+    def _delete(self, user_id: int):
+        raise NotImplementedError
+
+    def _delete_many(self, user_ids: list[int]):
+        for user_id in user_ids:
+            self._delete(user_id)
+
+    def _clear(self):
+        raise NotImplementedError
+
+    def _size(self) -> int | None:
+        return None
+
+
+class NullCache(CacheBackend):
+    """Кэш выключен"""
+    def get(self, user_id: int) -> UserModel | None:
+        return None
+
+    def get_many(self, user_ids: Iterable[int]) -> dict[int, UserModel]:
+        return {}
+
+    def _get(self, user_id: int) -> UserModel | None:
+        return None
+
+    def _set(self, user_id: int, user: UserModel):
+        pass
+
+    def _delete(self, user_id: int):
+        pass
+
+    def _clear(self):
+        pass
+
+    def _size(self) -> int | None:
+        return 0
+
+
+class LRUCache(CacheBackend):
+    """Кэш в памяти процесса с вытеснением LRU и временем жизни записей.
+
+    Изменение в одном воркере не сбрасывает записи других: при нескольких
+    воркерах они отдают старую запись до ``ttl`` секунд, общий кэш - redis.
+    """
+    def __init__(self, maxsize: int = 10_000, ttl: float = 30.0):
+        super().__init__()
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[int, tuple[float, UserModel]] = OrderedDict()
+
+    def _get(self, user_id: int) -> UserModel | None:
+        with self._lock:
+            entry = self._data.get(user_id)
+            if entry is None:
+                return None
+            expires, user = entry
+            if expires < time.monotonic():
+                del self._data[user_id]
+                self.evictions += 1
+                return None
+            self._data.move_to_end(user_id)
+            return user
+
+    def _set(self, user_id: int, user: UserModel):
+        with self._lock:
+            self._data[user_id] = (time.monotonic() + self.ttl, user)
+            self._data.move_to_end(user_id)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def _delete(self, user_id: int):
+        with self._lock:
+            self._data.pop(user_id, None)
+
+    def _clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def _size(self) -> int | None:
+        return len(self._data)
+
+
+class SharedCacheClient(Protocol):
+    """Клиент общего хранилища с интерфейсом redis"""
+    def get(self, name: str) -> bytes | str | None:
+        """Значение ключа или None"""
+
+    def mget(self, keys: list[str]) -> list[bytes | str | None]:
+        """Значения ключей, None - для отсутствующих"""
+
+    def set(self, name: str, value: str, ex: int | None = None) -> Any:
+        """Записать значение ключа со временем жизни ex секунд"""
+
+    def delete(self, *names: str) -> Any:
+        """Удалить ключи"""
+
+    def pipeline(self, transaction: bool = True) -> Any:
+        """Конвейер команд: set копятся и отправляются одним обращением в execute()"""
+
+
+class SharedCache(CacheBackend):
+    """Общий для процессов кэш во внешнем хранилище (redis или совместимом).
+
+    Поколение кэша локально для процесса, поэтому между процессами
+    устаревание записи ограничено временем жизни ``ttl``. Пакет id читается
+    одним MGET и записывается одним конвейером. Клиент блокирующий: в
+    async-обработчиках обращения идут через пул потоков.
+    """
+    blocking = True
+
+    def __init__(self, client: SharedCacheClient, ttl: int = 30, prefix: str = 'users:'):
+        super().__init__()
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def _key(self, user_id: int) -> str:
+        return f'{self.prefix}{user_id}'
+
+    @staticmethod
+    def _decode(raw: bytes | str | None) -> UserModel | None:
+        if raw is None:
+            return None
+        data = json.loads(raw)
+        updated_at = data.pop('updated_at')
+        user = UserModel.model_validate(data)
+        user.updated_at = updated_at and datetime.fromisoformat(updated_at)
+        return user
+
+    @staticmethod
+    def _encode(user: UserModel) -> str:
+        # version и updated_at исключены из model_dump, но нужны для ETag
+        return json.dumps({
+            **user.model_dump(mode='json'),
+            'version': user.version,
+            'updated_at': user.updated_at and user.updated_at.isoformat(),
+        })
+
+    def _get(self, user_id: int) -> UserModel | None:
+        return self._decode(self.client.get(self._key(user_id)))
+
+    def _get_many(self, user_ids: list[int]) -> list[UserModel | None]:
+        if not user_ids:
+            return []
+        return [
+            self._decode(raw)
+            for raw in self.client.mget([self._key(user_id) for user_id in user_ids])
+        ]
+
+    def _set(self, user_id: int, user: UserModel):
+        self.client.set(self._key(user_id), self._encode(user), ex=self.ttl)
+
+    def _set_many(self, users: list[UserModel]):
+        if not users:
+            return
+        pipeline = self.client.pipeline(transaction=False)
+        for user in users:
+            pipeline.set(self._key(user.id), self._encode(user), ex=self.ttl)
+        pipeline.execute()
+
+    def _delete(self, user_id: int):
+        self.client.delete(self._key(user_id))
+
+    def _delete_many(self, user_ids: list[int]):
+        if user_ids:
+            self.client.delete(*(self._key(user_id) for user_id in user_ids))
+
+    def _clear(self):
+        pass
+
+
+def cache_from_env() -> CacheBackend:
+    """Кэш пользователей по настройкам USERS_CACHE*"""
+    backend = os.getenv('USERS_CACHE', 'none').lower()
+    ttl = int(os.getenv('USERS_CACHE_TTL', '30'))
+    if backend == 'lru':
+        return LRUCache(maxsize=int(os.getenv('USERS_CACHE_SIZE', '10000')), ttl=ttl)
+    if backend == 'redis':
+        import redis  # pylint: disable=import-outside-toplevel
+        return SharedCache(redis.Redis.from_url(os.getenv('USERS_CACHE_URL')), ttl=ttl)
+    return NullCache()
+
+
+user_cache: CacheBackend = cache_from_env()
@@ -0,0 +1,346 @@
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import secrets
+import threading
+from collections import deque
+from typing import Iterable, NamedTuple
+
+from pydantic_core import to_json
+from sqlalchemy import text
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.database import _engine
+from app.models.user import UserModel
+
+CHANGES_HISTORY_SIZE = int(os.getenv('USERS_CHANGES_HISTORY_SIZE', '10000'))
+CHANGES_BUFFER_SIZE = int(os.getenv('USERS_CHANGES_BUFFER_SIZE', '1000'))
+# disconnect - закрыть поток переполненного подписчика, drop - отбросить старые события
+CHANGES_OVERFLOW = os.getenv('USERS_CHANGES_OVERFLOW', 'disconnect')
+CHANGES_KEEPALIVE = float(os.getenv('USERS_CHANGES_KEEPALIVE', '15'))
+# Поток закрывается через столько секунд, клиент переподключается с Last-Event-ID
+CHANGES_STREAM_TTL = float(os.getenv('USERS_CHANGES_STREAM_TTL', '300'))
+CHANGES_RECONNECT_DELAY = float(os.getenv('USERS_CHANGES_RECONNECT_DELAY', '1'))
+CHANGES_CHANNEL = 'user_changes'
+CHANGES_SEQUENCE = 'user_changes_seq'
+
+
+class ChangeEvent(NamedTuple):
+    """Изменение пользователя: номер, операция, id и JSON для клиента"""
+    seq: int
+    op: str
+    user_id: int
+    data: str
+
+
+def _payload(op: str, changed: UserModel | int) -> dict:
+    if isinstance(changed, int):
+        return {'op': op, 'id': changed, 'user': None}
+    return {'op': op, 'id': changed.id, 'user': changed}
+
+
+def _event(seq: int, payload: dict) -> ChangeEvent:
+    data = to_json({'seq': seq, **payload}).decode()
+    return ChangeEvent(seq, payload['op'], payload['id'], data)
+
+
+class Subscription:  # pylint: disable=too-many-instance-attributes
+    """Подписка на ленту: ограниченный буфер событий в цикле событий подписчика.
+
+    При переполнении буфера с политикой disconnect подписка закрывается
+    (клиент переподключается с Last-Event-ID), с политикой drop отбрасываются
+    самые старые события, их число - в dropped.
+    """
+    def __init__(self, size: int, overflow: str):
+        self.size = size
+        self.overflow = overflow
+        self.events: deque[ChangeEvent] = deque()
+        self.dropped = 0
+        self.closed = False
+        self.reset = False
+        self._loop = asyncio.get_running_loop()
+        self._ready = asyncio.Event()
+
+    def put(self, event: ChangeEvent):
+        """Добавить событие в буфер; вызывается из любого потока и не блокируется"""
+        if self.closed:
+            return
+        if len(self.events) >= self.size:
+            if self.overflow != 'drop':
+                self.close()
+                return
+            self.events.popleft()
+            self.dropped += 1
+        self.events.append(event)
+        self._wake()
+
+    def close(self):
+        """Закрыть подписку: поток отдаст уже полученные события и завершится"""
+        self.closed = True
+        self._wake()
+
+    def _wake(self):
+        with contextlib.suppress(RuntimeError):
+            self._loop.call_soon_threadsafe(self._ready.set)
+
+    async def get(self) -> list[ChangeEvent]:
+        """Дождаться и забрать накопленные события"""
+        if not self.events:
+            await self._ready.wait()
+        self._ready.clear()
+        events = []
+        while self.events:
+            events.append(self.events.popleft())
+        return events
+
+
+class ChangeFeed:
+    """Лента изменений пользователей в процессе.
+
+    Последние history_size событий хранятся для продолжения с номера после
+    переподключения. Запись вызывает notify в своей транзакции до фиксации
+    и publish после неё. Публикация не ждёт подписчиков: событие только
+    добавляется в их буферы.
+
+    Номера событий свои в каждом процессе, поэтому id события для клиента -
+    epoch-номер, где epoch случаен для процесса: продолжение с id другого
+    процесса (другого воркера или до перезапуска) получает reset. Изменения,
+    сделанные другими воркерами, в эту ленту не попадают.
+    """
+    def __init__(
+        self, history_size: int = CHANGES_HISTORY_SIZE, buffer_size: int = CHANGES_BUFFER_SIZE,
+        overflow: str = CHANGES_OVERFLOW,
+    ):
+        self.buffer_size = buffer_size
+        self.overflow = overflow
+        self.history: deque[ChangeEvent] = deque(maxlen=history_size)
+        self.subscriptions: set[Subscription] = set()
+        self.epoch = secrets.token_hex(4)
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    def notify(self, session: Session, op: str, changed: Iterable[UserModel | int]):
+        """Записать изменения в транзакции session до её фиксации"""
+
+    async def notify_async(
+        self, session: AsyncSession, op: str, changed: Iterable[UserModel | int]
+    ):
+        """Записать изменения в транзакции session до её фиксации (async)"""
+
+    def publish(self, op: str, changed: Iterable[UserModel | int]):
+        """Опубликовать изменения после фиксации: пользователи (create, update) или id (delete)"""
+        with self._lock:
+            for item in changed:
+                self._seq += 1
+                self._deliver(_event(self._seq, _payload(op, item)))
+
+    async def publish_async(self, op: str, changed: Iterable[UserModel | int]):
+        """Опубликовать изменения (async)"""
+        self.publish(op, changed)
+
+    def _deliver(self, event: ChangeEvent):
+        """Сохранить событие в истории и раздать подписчикам, под self._lock"""
+        self.history.append(event)
+        for subscription in self.subscriptions:
+            subscription.put(event)
+
+    def last_seq(self) -> int:
+        """Номер последнего события"""
+        return self.history[-1].seq if self.history else self._seq
+
+    def event_id(self, seq: int) -> str:
+        """id события для клиента: epoch и номер"""
+        return f'{self.epoch}-{seq}'
+
+    def _resume_seq(self, last_event_id: str) -> int | None:
+        """Номер из id события этой ленты, None - id другой ленты или неверный"""
+        epoch, _, seq = last_event_id.rpartition('-')
+        return int(seq) if epoch == self.epoch and seq.isdigit() else None
+
+    def _missed(self, after: int | None) -> list[ChangeEvent] | None:
+        """События истории после номера after, None - продолжить с него нельзя"""
+        first = self.history[0].seq if self.history else self._seq + 1
+        if after is None or not first - 1 <= after <= self.last_seq():
+            return None
+        return [event for event in self.history if event.seq > after]
+
+    def subscribe(self, last_event_id: str | None = None) -> Subscription:
+        """Подписаться на события после события с id last_event_id.
+
+        Пропущенные события из истории отдаются сразу, без ограничения буфера.
+        Если их уже нет в истории или id не из этой ленты (другой процесс,
+        перезапуск), у подписки reset=True и она получает только новые
+        события: клиенту нужно заново прочитать список пользователей.
+        """
+        subscription = Subscription(self.buffer_size, self.overflow)
+        with self._lock:
+            if last_event_id is not None:
+                missed = self._missed(self._resume_seq(last_event_id))
+                subscription.reset = missed is None
+                subscription.events.extend(missed or ())
+            self.subscriptions.add(subscription)
+        return subscription
+
+    def restart(self, last_seq: int = 0):
+        """Начать историю заново после last_seq и закрыть подписки.
+
+        События до last_seq могли быть пропущены: продолжить можно только
+        с last_seq, подписчики переподключаются и получают reset.
+        """
+        with self._lock:
+            self.history.clear()
+            self._seq = last_seq
+            for subscription in self.subscriptions:
+                subscription.close()
+
+    def unsubscribe(self, subscription: Subscription):
+        """Отписаться"""
+        with self._lock:
+            self.subscriptions.discard(subscription)
+
+    async def start(self):
+        """Запустить получение событий из внешнего источника"""
+
+    async def stop(self):
+        """Закрыть подписки и остановить получение событий"""
+        with self._lock:
+            for subscription in self.subscriptions:
+                subscription.close()
+
+
+class PostgresChangeFeed(ChangeFeed):
+    """Лента изменений через LISTEN/NOTIFY PostgreSQL: события всех процессов.
+
+    NOTIFY с номером из последовательности user_changes_seq выполняется
+    в транзакции записи (notify): событие доставляется только при её
+    фиксации и не теряется между фиксацией и публикацией. PostgreSQL
+    доставляет NOTIFY всем слушателям в порядке фиксации транзакций, номера
+    же выдаются до фиксации и могут идти не по порядку. Поэтому продолжение
+    ищет событие с номером в истории и отдаёт события, пришедшие после него:
+    порядок одинаков во всех процессах, и продолжение работает при
+    переподключении к другому процессу.
+
+    Последовательность создаётся при запуске с DATABASE_CREATE_ALL, иначе -
+    миграцией: без неё записи завершаются ошибкой.
+
+    Слушает соединение asyncpg async-движка. При потере соединения оно
+    открывается заново, история начинается заново, подписки закрываются:
+    пропущенные события не восстановить, клиенты получают reset.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.epoch = 'pg'
+        self._connection = None
+        self._driver = None
+        self._lost = asyncio.Event()
+        self._watcher: asyncio.Task | None = None
+
+    @staticmethod
+    def _notify_query():
+        return text(
+            f"SELECT pg_notify('{CHANGES_CHANNEL}', "
+            f"nextval('{CHANGES_SEQUENCE}') || ' ' || :payload)"
+        )
+
+    @staticmethod
+    def _notify_params(op: str, changed: Iterable[UserModel | int]) -> list[dict]:
+        return [{'payload': to_json(_payload(op, item)).decode()} for item in changed]
+
+    def notify(self, session: Session, op: str, changed: Iterable[UserModel | int]):
+        params = self._notify_params(op, changed)
+        if params:
+            session.connection().execute(self._notify_query(), params)
+
+    async def notify_async(
+        self, session: AsyncSession, op: str, changed: Iterable[UserModel | int]
+    ):
+        params = self._notify_params(op, changed)
+        if params:
+            await (await session.connection()).execute(self._notify_query(), params)
+
+    def publish(self, op: str, changed: Iterable[UserModel | int]):
+        """События приходят через LISTEN после фиксации транзакции с notify"""
+
+    def _missed(self, after: int | None) -> list[ChangeEvent] | None:
+        """События, пришедшие после события с номером after, None - его нет в истории"""
+        missed = []
+        for event in reversed(self.history):
+            if event.seq == after:
+                missed.reverse()
+                return missed
+            missed.append(event)
+        return None
+
+    def on_notify(self, *args):
+        """Обработчик asyncpg: payload - номер и JSON события через пробел"""
+        seq, _, payload = args[-1].partition(' ')
+        with self._lock:
+            self._deliver(_event(int(seq), json.loads(payload)))
+
+    async def start(self):
+        if _engine.DATABASE_CREATE_ALL:
+            async with _engine.get_async_engine().begin() as connection:
+                await connection.execute(text(f'CREATE SEQUENCE IF NOT EXISTS {CHANGES_SEQUENCE}'))
+        await self._listen()
+        self._watcher = asyncio.create_task(self._watch())
+
+    async def _listen(self):
+        """LISTEN на новом соединении, история начинается заново"""
+        lost = self._lost = asyncio.Event()
+        self._connection = await _engine.get_async_engine().connect()
+        self._driver = (await self._connection.get_raw_connection()).driver_connection
+        self._driver.add_termination_listener(lambda _: lost.set())
+        await self._driver.add_listener(CHANGES_CHANNEL, self.on_notify)
+        self.restart()
+
+    async def _alive(self) -> bool:
+        """Соединение LISTEN не закрыто и отвечает за CHANGES_KEEPALIVE секунд"""
+        try:
+            await asyncio.wait_for(self._lost.wait(), CHANGES_KEEPALIVE)
+            return False
+        except TimeoutError:
+            pass
+        try:
+            await asyncio.wait_for(self._driver.fetchval('SELECT 1'), CHANGES_KEEPALIVE)
+        except Exception:  # pylint: disable=broad-exception-caught
+            return False
+        return True
+
+    async def _watch(self):
+        """Переподключить LISTEN при потере соединения"""
+        while True:
+            if await self._alive():
+                continue
+            logging.warning('Change feed LISTEN connection lost, reconnecting')
+            with contextlib.suppress(Exception):
+                await self._connection.invalidate()
+            try:
+                await self._listen()
+            except Exception:  # pylint: disable=broad-exception-caught
+                logging.exception('On change feed LISTEN reconnect')
+                self._lost.set()
+                await asyncio.sleep(CHANGES_RECONNECT_DELAY)
+
+    async def stop(self):
+        await super().stop()
+        if self._watcher is not None:
+            self._watcher.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._watcher
+            self._watcher = None
+        if self._connection is not None:
+            await self._connection.close()
+            self._connection = None
+
+
+def feed_from_env() -> ChangeFeed:
+    """Лента изменений по USERS_CHANGES_BACKEND: memory (по умолчанию) или postgres"""
+    if os.getenv('USERS_CHANGES_BACKEND', 'memory') == 'postgres':
+        return PostgresChangeFeed()
+    return ChangeFeed()
+
+
+feed: ChangeFeed = feed_from_env()
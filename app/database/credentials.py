@@ -0,0 +1,51 @@
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.database._engine import get_async_engine, get_engine
+from app.models.login import CredentialModel
+from app.models.user import UserModel, utcnow
+
+
+def _credential_query(email: str):
+    return (
+        select(CredentialModel)
+        .join(UserModel, UserModel.id == CredentialModel.user_id)
+        .where(UserModel.email == email)
+    )
+
+
+def get_credential(email: str) -> CredentialModel | None:
+    """Учётные данные пользователя по email.
+
+    Читаются с основной БД: после смены пароля реплика может отдать старый хэш.
+    """
+    with Session(get_engine()) as session:
+        return session.exec(_credential_query(email)).first()
+
+
+def get_user_id(email: str) -> int | None:
+    """id пользователя по email"""
+    with Session(get_engine()) as session:
+        return session.exec(select(UserModel.id).where(UserModel.email == email)).first()
+
+
+def set_password_hash(user_id: int, password_hash: str):
+    """Записать хэш пароля пользователя"""
+    with Session(get_engine()) as session:
+        session.merge(
+            CredentialModel(user_id=user_id, password_hash=password_hash, updated_at=utcnow()))
+        session.commit()
+
+
+async def get_credential_async(email: str) -> CredentialModel | None:
+    """Учётные данные пользователя по email (async)"""
+    async with AsyncSession(get_async_engine()) as session:
+        return (await session.exec(_credential_query(email))).first()
+
+
+async def set_password_hash_async(user_id: int, password_hash: str):
+    """Записать хэш пароля пользователя (async)"""
+    async with AsyncSession(get_async_engine()) as session:
+        await session.merge(
+            CredentialModel(user_id=user_id, password_hash=password_hash, updated_at=utcnow()))
+        await session.commit()
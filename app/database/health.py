@@ -0,0 +1,84 @@
+import asyncio
+import contextlib
+import logging
+import os
+import time
+from typing import Callable
+
+from app.database._engine import check_availability
+
+
+class HealthMonitor:
+    """Фоновая проверка доступности БД с жёстким таймаутом и кэшированием результата.
+
+    Одновременно выполняется не больше одной проверки: если предыдущая зависла
+    в пуле потоков, новая не запускается и БД считается недоступной.
+    """
+    def __init__(
+        self,
+        interval: float,
+        timeout: float,
+        probe: Callable[[], bool] = check_availability,
+    ):
+        self.interval = interval
+        self.timeout = timeout
+        self.probe = probe
+        self.available: bool | None = None
+        self.last_check: float | None = None
+        self.last_success: float | None = None
+        self.last_latency: float | None = None
+        self._probe: asyncio.Future | None = None
+        self._task: asyncio.Task | None = None
+
+    async def check(self) -> bool:
+        """Проверить БД и сохранить результат"""
+        start = time.monotonic()
+        if self._probe is None or self._probe.done():
+            self._probe = asyncio.get_running_loop().run_in_executor(None, self.probe)
+            try:
+                available = await asyncio.wait_for(asyncio.shield(self._probe), self.timeout)
+            except asyncio.TimeoutError:
+                logging.warning('Database health check timed out after %ss', self.timeout)
+                available = False
+        else:
+            available = False
+        self.last_check = time.monotonic()
+        self.last_latency = self.last_check - start
+        self.available = available
+        if available:
+            self.last_success = self.last_check
+        return available
+
+    async def run(self):
+        """Проверять БД с интервалом interval"""
+        while True:
+            await self.check()
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        """Запустить фоновые проверки"""
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """Остановить фоновые проверки"""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    def snapshot(self) -> dict:
+        """Последний результат проверки"""
+        now = time.monotonic()
+        return {
+            'database': bool(self.available),
+            'last_check_latency': self.last_latency,
+            'last_check_age': None if self.last_check is None else now - self.last_check,
+            'since_last_success': None if self.last_success is None else now - self.last_success,
+        }
+
+
+health_monitor = HealthMonitor(
+    interval=float(os.getenv('HEALTH_CHECK_INTERVAL', '5')),
+    timeout=float(os.getenv('HEALTH_CHECK_TIMEOUT', '2')),
+)
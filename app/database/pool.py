@@ -0,0 +1,93 @@
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+from app.metrics import Histogram
+
+
+class PoolStats:
+    """Ожидающие соединения, таймауты и время получения соединения из пула.
+
+    Ожидающими считаются только получения из насыщенного пула: свободных
+    соединений нет и новое создать нельзя.
+    """
+    def __init__(self):
+        self.waiters = 0
+        self.timeouts = 0
+        self.checkout_latency = Histogram()
+        self._lock = threading.Lock()
+
+    def checkout(self, connect, saturated: bool):
+        """Получить соединение с учётом ожидания и времени"""
+        if saturated:
+            with self._lock:
+                self.waiters += 1
+        start = time.perf_counter()
+        try:
+            return connect()
+        except exc.TimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            raise
+        finally:
+            self.checkout_latency.observe(time.perf_counter() - start)
+            if saturated:
+                with self._lock:
+                    self.waiters -= 1
+
+
+def pool_saturated(pool: QueuePool) -> bool:
+    """Все соединения пула заняты и переполнение исчерпано: получение будет ждать"""
+    max_overflow = pool._max_overflow  # pylint: disable=protected-access
+    return max_overflow > -1 and pool.checkedout() >= pool.size() + max_overflow
+
+
+class InstrumentedQueuePool(QueuePool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def connect(self):
+        return self.stats.checkout(super().connect, pool_saturated(self))
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def connect(self):
+        return self.stats.checkout(super().connect, pool_saturated(self))
+
+
+INSTRUMENTED_POOLS = {
+    QueuePool: InstrumentedQueuePool,
+    AsyncAdaptedQueuePool: InstrumentedAsyncQueuePool,
+}
+
+
+def pool_status(name: str, pool: Pool) -> dict:
+    """Состояние пула: занятые соединения, переполнение, ожидающие и насыщение"""
+    status = {'engine': name, 'pool': type(pool).__name__}
+    if not isinstance(pool, QueuePool):
+        return status
+    capacity = pool.size() + max(pool._max_overflow, 0)  # pylint: disable=protected-access
+    status.update(
+        size=pool.size(),
+        max_overflow=pool._max_overflow,  # pylint: disable=protected-access
+        timeout=pool.timeout(),
+        checked_out=pool.checkedout(),
+        checked_in=pool.checkedin(),
+        overflow=pool.overflow(),
+        saturation=pool.checkedout() / capacity if capacity else None,
+    )
+    stats: PoolStats | None = getattr(pool, 'stats', None)
+    if stats is not None:
+        status.update(
+            waiters=stats.waiters,
+            timeouts=stats.timeouts,
+            checkout_latency=stats.checkout_latency.snapshot(),
+        )
+    return status
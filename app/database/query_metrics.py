@@ -0,0 +1,45 @@
+import logging
+import os
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app import metrics
+
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv('SLOW_QUERY_THRESHOLD_MS', '500'))
+
+_OPERATIONS = frozenset(('SELECT', 'INSERT', 'UPDATE', 'DELETE'))
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # pylint: disable=unused-argument,too-many-positional-arguments
+    if metrics.METRICS_ENABLED:
+        conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # pylint: disable=unused-argument,too-many-positional-arguments
+    starts = conn.info.get('query_start')
+    if not starts:
+        return
+    duration = time.perf_counter() - starts.pop()
+    operation = statement.lstrip()[:6].upper()
+    metrics.DB_STATEMENT_DURATION.labels(
+        operation if operation in _OPERATIONS else 'OTHER').observe(duration)
+    if duration * 1000 >= SLOW_QUERY_THRESHOLD_MS:
+        metrics.DB_SLOW_STATEMENTS.labels().inc()
+        logging.warning('Slow query %.1f ms: %s', duration * 1000, statement[:1000])
+
+
+def _handle_error(context):
+    starts = context.connection.info.get('query_start') if context.connection else None
+    if starts:
+        starts.pop()
+
+
+def instrument_engine(engine: Engine):
+    """Подключить замер времени SQL-запросов и журнал медленных запросов"""
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+    event.listen(engine, 'handle_error', _handle_error)
@@ -0,0 +1,123 @@
+import itertools
+import logging
+import os
+import time
+from contextvars import ContextVar, Token
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy import Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from app.database import _engine
+from app.database._engine import async_url, pool_options
+from app.database.query_metrics import instrument_engine
+
+REPLICA_RETRY_INTERVAL = float(os.getenv('DATABASE_REPLICA_RETRY_INTERVAL', '30'))
+STICKY_SECONDS = int(os.getenv('DATABASE_STICKY_SECONDS', '5'))
+
+_read_primary: ContextVar[bool] = ContextVar('read_primary', default=False)
+
+
+def use_primary() -> Token:
+    """Читать с основной БД до конца текущего запроса (read-your-writes)"""
+    return _read_primary.set(True)
+
+
+def primary_pinned() -> bool:
+    """Текущий запрос читает с основной БД"""
+    return _read_primary.get()
+
+
+def reset_primary(token: Token):
+    """Вернуть выбор БД для чтения"""
+    _read_primary.reset(token)
+
+
+class Replica:
+    """Реплика: sync-движок, async-движок по требованию и время, до которого она исключена"""
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.down_until = 0.0
+        self._async_engine: AsyncEngine | None = None
+
+    def available(self) -> bool:
+        """Реплика не исключена после ошибки"""
+        return self.down_until <= time.monotonic()
+
+    def async_engine(self) -> AsyncEngine:
+        """Асинхронный движок реплики, создаётся при первом обращении"""
+        if self._async_engine is None:
+            url = async_url(self.engine.url)
+            self._async_engine = create_async_engine(url=url, **pool_options(url))
+            instrument_engine(self._async_engine.sync_engine)
+        return self._async_engine
+
+    async def dispose(self):
+        """Закрыть соединения реплики"""
+        self.engine.dispose()
+        if self._async_engine is not None:
+            await self._async_engine.dispose()
+            self._async_engine = None
+
+
+class ReplicaRouter:
+    """Выбор БД для чтения: реплики по кругу, основная БД - если реплик нет,
+    все исключены после ошибок или клиент недавно писал (read-your-writes).
+
+    Реплика, на которой чтение завершилось ошибкой БД, исключается на
+    retry_interval секунд, а чтение повторяется на основной БД.
+    """
+    def __init__(self, engines: list[Engine], retry_interval: float = REPLICA_RETRY_INTERVAL):
+        self.replicas = [Replica(engine) for engine in engines]
+        self.retry_interval = retry_interval
+        self._counter = itertools.count()
+
+    def choose(self) -> Replica | None:
+        """Следующая доступная реплика, None - читать с основной БД"""
+        if not self.replicas or _read_primary.get():
+            return None
+        for _ in range(len(self.replicas)):
+            replica = self.replicas[next(self._counter) % len(self.replicas)]
+            if replica.available():
+                return replica
+        return None
+
+    def mark_down(self, replica: Replica, exc: Exception):
+        """Исключить реплику на retry_interval секунд"""
+        replica.down_until = time.monotonic() + self.retry_interval
+        logging.warning('Replica %s excluded for %ss: %s',
+                        replica.engine.url.render_as_string(), self.retry_interval, exc)
+
+    def read(self, func: Callable[..., Any], *args) -> Any:
+        """Выполнить чтение func(engine, *args) на реплике либо на основной БД"""
+        replica = self.choose()
+        if replica is not None:
+            try:
+                return func(replica.engine, *args)
+            except DBAPIError as exc:
+                self.mark_down(replica, exc)
+        return func(_engine.get_engine(), *args)
+
+    async def read_async(self, func: Callable[..., Awaitable], *args) -> Any:
+        """Выполнить чтение func(engine, *args) на реплике либо на основной БД (async)"""
+        replica = self.choose()
+        if replica is not None:
+            try:
+                return await func(replica.async_engine(), *args)
+            except DBAPIError as exc:
+                self.mark_down(replica, exc)
+        return await func(_engine.get_async_engine(), *args)
+
+    async def dispose(self):
+        """Закрыть соединения реплик"""
+        for replica in self.replicas:
+            await replica.dispose()
+
+
+def __getattr__(name: str):
+    """router создаётся при первом обращении вместе с движками реплик"""
+    if name == 'router':
+        globals()['router'] = ReplicaRouter(_engine.get_replica_engines())
+        return globals()['router']
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
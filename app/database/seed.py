@@ -0,0 +1,99 @@
+import os
+import random
+from contextlib import contextmanager
+from typing import Iterator
+
+from mimesis import Locale, Person
+from mimesis.datasets import EMAIL_DOMAINS
+from sqlmodel import Session, func, select
+
+from app.database._engine import get_engine
+from app.database.user_import import load_rows
+from app.database.users import create_users, delete_users
+from app.models.user import UserCreateModel, UserModel
+
+SEED_BATCH_SIZE = int(os.getenv('USERS_SEED_BATCH_SIZE', '10000'))
+AVATAR_URL = 'https://reqres.in/img/faces/{}-image.jpg'
+
+NAMES_SAMPLE_SIZE = 5000
+
+PERSON = Person(Locale.EN)
+
+
+def sample_names(size: int = NAMES_SAMPLE_SIZE) -> tuple[tuple[str, ...], tuple[str, ...]]:
+    """Пулы имён и фамилий: выборка из mimesis с фиксированным seed без повторов"""
+    person = Person(Locale.EN, seed=0)
+    first_names = dict.fromkeys(person.first_name() for _ in range(size))
+    last_names = dict.fromkeys(person.last_name() for _ in range(size))
+    return tuple(first_names), tuple(last_names)
+
+
+FIRST_NAMES, LAST_NAMES = sample_names()
+
+
+def generate_user(person: Person = PERSON) -> UserCreateModel:
+    """Сгенерировать заполненную модель пользователя со случайными данными"""
+    return UserCreateModel(
+        email=person.email(unique=True),
+        first_name=person.name(),
+        last_name=person.surname(),
+        avatar=AVATAR_URL.format(random.randint(1, 12)),
+    )
+
+
+def next_number() -> int:
+    """Первый свободный номер для email сгенерированных пользователей.
+
+    Номер не меньше следующего id, поэтому пока пользователь из прошлой
+    генерации есть в БД, его email не повторится.
+    """
+    with Session(get_engine()) as session:
+        return (session.exec(select(func.max(UserModel.id))).one() or 0) + 1
+
+
+def generate_users(count: int, seed: int | None = None, start: int = 0) -> list[dict]:
+    """Сгенерировать count пользователей одной пачкой.
+
+    Имена и аватары воспроизводимы при одинаковом seed, уникальность email
+    обеспечивает порядковый номер начиная со start.
+    """
+    rng = random.Random(seed)
+    first_names = rng.choices(FIRST_NAMES, k=count)
+    last_names = rng.choices(LAST_NAMES, k=count)
+    domains = rng.choices(EMAIL_DOMAINS, k=count)
+    faces = rng.choices(range(1, 13), k=count)
+    return [
+        {
+            'email': f'{first_name}.{last_name}.{number}{domain}'.lower(),
+            'first_name': first_name,
+            'last_name': last_name,
+            'avatar': AVATAR_URL.format(face),
+        }
+        for number, first_name, last_name, domain, face
+        in zip(range(start, start + count), first_names, last_names, domains, faces)
+    ]
+
+
+def seed_users(count: int, seed: int | None = None, batch_size: int = SEED_BATCH_SIZE) -> int:
+    """Добавить count пользователей пачками через COPY/executemany.
+
+    Возвращает число реально добавленных строк: строки с занятым email пропускаются.
+    """
+    rng = random.Random(seed)
+    start, left, inserted = next_number(), count, 0
+    while left > 0:
+        size = min(batch_size, left)
+        inserted += size - len(load_rows(generate_users(size, rng.getrandbits(64), start)))
+        start += size
+        left -= size
+    return inserted
+
+
+@contextmanager
+def seeded_users(count: int, seed: int | None = None) -> Iterator[list[UserModel]]:
+    """Временные пользователи: создаются одним INSERT и удаляются одним DELETE"""
+    users = create_users(generate_users(count, seed, next_number()))
+    try:
+        yield users
+    finally:
+        delete_users([user.id for user in users])
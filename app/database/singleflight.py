@@ -0,0 +1,92 @@
+import asyncio
+import os
+import threading
+from collections.abc import Hashable
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable
+
+from app import metrics
+
+SINGLEFLIGHT_ENABLED = os.getenv('USERS_SINGLEFLIGHT', 'true').lower() in ('1', 'true', 'yes')
+
+
+class SingleFlight:
+    """Объединение одинаковых одновременных чтений: пока запрос по ключу выполняется,
+    остальные вызовы с тем же ключом ждут его результат (или исключение).
+
+    Sync-вызовы из разных потоков и async-вызовы в одном цикле событий
+    объединяются отдельно. Результат общий для всех ожидающих, поэтому
+    изменять его нельзя.
+    """
+    def __init__(self, name: str):
+        self.name = name
+        self.queries = 0
+        self.coalesced = 0
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, Future] = {}
+        self._async_calls: dict[Hashable, asyncio.Future] = {}
+
+    def _joined(self):
+        with self._lock:
+            self.coalesced += 1
+        metrics.DB_COALESCED_REQUESTS.labels(self.name).inc()
+
+    def _started(self):
+        with self._lock:
+            self.queries += 1
+
+    def do(self, key: Hashable, func: Callable[..., Any], *args) -> Any:
+        """Выполнить func(*args) или дождаться уже выполняемого вызова с тем же ключом"""
+        if not SINGLEFLIGHT_ENABLED:
+            return func(*args)
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        if not leader:
+            self._joined()
+            return future.result()
+        self._started()
+        try:
+            result = func(*args)
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+        future.set_result(result)
+        return result
+
+    async def do_async(self, key: Hashable, func: Callable[..., Awaitable], *args) -> Any:
+        """Выполнить func(*args) или дождаться уже выполняемого вызова с тем же ключом (async).
+
+        Запрос выполняется отдельной задачей: отмена одного из ожидающих
+        не прерывает его для остальных.
+        """
+        if not SINGLEFLIGHT_ENABLED:
+            return await func(*args)
+        key = (asyncio.get_running_loop(), key)
+        task = self._async_calls.get(key)
+        if task is not None:
+            self._joined()
+        else:
+            self._started()
+            task = self._async_calls[key] = asyncio.ensure_future(func(*args))
+            task.add_done_callback(lambda _: self._async_calls.pop(key, None))
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict[str, int]:
+        """Счётчики выполненных и объединённых запросов"""
+        return {'queries': self.queries, 'coalesced': self.coalesced}
+
+    def clear(self):
+        """Сбросить счётчики"""
+        with self._lock:
+            self.queries = 0
+            self.coalesced = 0
+
+
+user_reads = SingleFlight('get_user')
+page_reads = SingleFlight('get_users_paginated')
@@ -0,0 +1,137 @@
+import csv
+import io
+import json
+import os
+from itertools import islice
+from typing import IO, Iterable, Iterator
+
+from pydantic import ValidationError
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.database._engine import get_engine
+from app.models.user import ImportErrorModel, ImportReportModel, UserCreateModel, UserModel
+
+IMPORT_CHUNK_SIZE = int(os.getenv('USERS_IMPORT_CHUNK_SIZE', '5000'))
+IMPORT_MAX_ERRORS = int(os.getenv('USERS_IMPORT_MAX_ERRORS', '1000'))
+IMPORT_FIELDS = tuple(UserCreateModel.model_fields)
+IMPORT_STAGING_TABLE = 'users_import'
+
+
+def parse_rows(file: IO[str], file_format: str) -> Iterator[tuple[int, dict | str]]:
+    """Построчный разбор файла: номер строки и данные либо текст ошибки разбора"""
+    if file_format == 'csv':
+        reader = csv.DictReader(file)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for line_num, line in enumerate(file, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as exc:
+            yield line_num, f'Invalid JSON: {exc.msg}'
+            continue
+        yield line_num, row if isinstance(row, dict) else 'Row is not an object'
+
+
+def validate_rows(
+    rows: Iterable[tuple[int, dict | str]]
+) -> tuple[list[tuple[int, dict]], list[ImportErrorModel]]:
+    """Проверить строки по UserCreateModel: номера и данные валидных строк, ошибки остальных"""
+    valid, rejected = [], []
+    for line_num, row in rows:
+        if isinstance(row, str):
+            rejected.append(ImportErrorModel(row=line_num, error=row))
+            continue
+        try:
+            UserCreateModel.model_validate(row)
+        except ValidationError as exc:
+            rejected.append(ImportErrorModel(row=line_num, error=str(exc.errors()[0]['msg'])))
+            continue
+        valid.append((line_num, {field: row[field] for field in IMPORT_FIELDS}))
+    return valid, rejected
+
+
+def _copy_rows(rows: list[dict]) -> list[str]:
+    """Загрузить пачку через COPY во временную таблицу (PostgreSQL + psycopg2).
+
+    Из неё - INSERT ... ON CONFLICT DO NOTHING в порядке строк файла:
+    COPY прямо в таблицу пользователей прервался бы на первом занятом email.
+    """
+    columns = ', '.join(IMPORT_FIELDS)
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(
+        [number, *(row[field] for field in IMPORT_FIELDS)] for number, row in enumerate(rows))
+    buffer.seek(0)
+    with get_engine().begin() as connection:
+        cursor = connection.connection.driver_connection.cursor()
+        cursor.execute(
+            f'CREATE TEMP TABLE {IMPORT_STAGING_TABLE} ON COMMIT DROP AS '
+            f'SELECT 0 AS number, {columns} FROM {UserModel.__tablename__} WITH NO DATA'
+        )
+        cursor.copy_expert(
+            f'COPY {IMPORT_STAGING_TABLE} (number, {columns}) FROM STDIN WITH (FORMAT csv)',
+            buffer,
+        )
+        cursor.execute(
+            f'INSERT INTO {UserModel.__tablename__} ({columns}) '
+            f'SELECT {columns} FROM {IMPORT_STAGING_TABLE} ORDER BY number '
+            'ON CONFLICT (email) DO NOTHING RETURNING email'
+        )
+        return [email for email, in cursor.fetchall()]
+
+
+def _insert_rows(rows: list[dict]) -> list[str]:
+    """Загрузить пачку пакетным INSERT ... ON CONFLICT DO NOTHING (executemany)"""
+    engine = get_engine()
+    dialect_insert = postgresql.insert if engine.dialect.name == 'postgresql' else sqlite.insert
+    query = (
+        dialect_insert(UserModel)
+        .on_conflict_do_nothing(index_elements=['email'])
+        .returning(UserModel.email)
+    )
+    with engine.begin() as connection:
+        return list(connection.scalars(query, rows))
+
+
+def load_rows(rows: list[dict]) -> list[int]:
+    """Загрузить пачку проверенных строк одной транзакцией.
+
+    Строки с уже занятым email (в БД или выше в пачке) пропускаются,
+    возвращаются их индексы в пачке.
+    """
+    if not rows:
+        return []
+    dialect = get_engine().dialect
+    if dialect.name == 'postgresql' and dialect.driver == 'psycopg2':
+        inserted = set(_copy_rows(rows))
+    else:
+        inserted = set(_insert_rows(rows))
+    conflicts = []
+    for index, row in enumerate(rows):
+        if row['email'] in inserted:
+            inserted.discard(row['email'])
+        else:
+            conflicts.append(index)
+    return conflicts
+
+
+def import_users(
+    file: IO[str], file_format: str, chunk_size: int = IMPORT_CHUNK_SIZE
+) -> ImportReportModel:
+    """Импорт пользователей из NDJSON/CSV пачками по chunk_size строк"""
+    report = ImportReportModel()
+    rows = parse_rows(file, file_format)
+    while chunk := list(islice(rows, chunk_size)):
+        valid, rejected = validate_rows(chunk)
+        conflicts = load_rows([row for _, row in valid])
+        rejected.extend(
+            ImportErrorModel(row=valid[index][0], error='Email already registered')
+            for index in conflicts
+        )
+        rejected.sort(key=lambda error: error.row)
+        report.imported += len(valid) - len(conflicts)
+        report.rejected += len(rejected)
+        report.errors.extend(rejected[:IMPORT_MAX_ERRORS - len(report.errors)])
+    return report
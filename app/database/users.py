@@ -1,63 +1,690 @@
-import logging
-from typing import Iterable, Type
+import binascii
+import os
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from contextlib import contextmanager
+from typing import AsyncIterator, Iterable, Iterator, Sequence
 
 from fastapi import HTTPException
 from fastapi_pagination import Page
-from fastapi_pagination.ext.sqlmodel import paginate
-from sqlalchemy.orm.exc import UnmappedInstanceError
-from sqlmodel import Session, select
+from fastapi_pagination.api import resolve_params
+from fastapi_pagination.ext.sqlmodel import apaginate, paginate
+from sqlalchemy import Row, func, inspect, or_
+from sqlalchemy import select as select_rows
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, delete, insert, select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.database._engine import engine
-from app.models.user import UserModel
+from app.database import cache, changefeed, replicas, singleflight
+from app.database._engine import get_async_engine, get_engine
+from app.models.user import UserCursorPageModel, UserFilterModel, UserModel
+
+USER_FIELDS = tuple(name for name, field in UserModel.model_fields.items() if not field.exclude)
+
+
+def row_columns(fields: Sequence[str] = USER_FIELDS) -> tuple:
+    """Колонки строк: запрошенные поля, затем version и id для ETag и курсоров"""
+    extra = (UserModel.version,) if 'id' in fields else (UserModel.version, UserModel.id)
+    return (*(getattr(UserModel, field) for field in fields), *extra)
+
+
+ROW_COLUMNS = row_columns()
+EXPORT_BATCH_SIZE = int(os.getenv('USERS_EXPORT_BATCH_SIZE', '1000'))
+# Ниже лимита параметров запроса SQLite до 3.32 (999), в PostgreSQL лимит 65535
+BATCH_GET_CHUNK_SIZE = int(os.getenv('USERS_BATCH_GET_CHUNK_SIZE', '900'))
+
+
+@contextmanager
+def _email_conflict():
+    """Нарушение уникальности email - 409 Conflict"""
+    try:
+        yield
+    except IntegrityError as exc:
+        raise HTTPException(status_code=409, detail='Email already registered') from exc
+
+
+def _flight_key(*parts) -> tuple:
+    """Ключ объединения одинаковых чтений.
+
+    Поколение кэша меняется при каждом изменении пользователей: запрос,
+    пришедший после записи, не получит результат чтения, начатого до неё.
+    """
+    return (*parts, cache.user_cache.version(), replicas.primary_pinned())
+
+
+def _filters_key(filters: UserFilterModel | None) -> str | None:
+    return None if filters is None else filters.model_dump_json()
 
 
 def get_user(user_id: int) -> UserModel | None:
-    """Получить пользователя по id"""
-    with Session(engine) as session:
-        return session.get(UserModel, user_id)
+    """Получить пользователя по id; одновременные промахи кэша - одним запросом"""
+    user = cache.user_cache.get(user_id)
+    if user is not None:
+        return user
+    return singleflight.user_reads.do(_flight_key(user_id), _load_user, user_id)
+
+
+def _load_user(user_id: int) -> UserModel | None:
+    version = cache.user_cache.version()
+    user = replicas.router.read(_get, user_id)
+    if user is not None:
+        cache.user_cache.fill(user_id, user, version)
+    return user
+
+
+def get_users_by_ids(user_ids: Iterable[int]) -> dict[int, UserModel]:
+    """Найденные пользователи по id: из кэша, остальные запросами IN по BATCH_GET_CHUNK_SIZE id"""
+    wanted = list(dict.fromkeys(user_ids))
+    found = cache.user_cache.get_many(wanted)
+    missing = [user_id for user_id in wanted if user_id not in found]
+    if missing:
+        version = cache.user_cache.version()
+        loaded = replicas.router.read(_by_ids, missing)
+        found.update((user.id, user) for user in loaded)
+        cache.user_cache.fill_many(loaded, version)
+    return found
+
+
+def _chunks(user_ids: list[int]) -> Iterator[list[int]]:
+    for start in range(0, len(user_ids), BATCH_GET_CHUNK_SIZE):
+        yield user_ids[start:start + BATCH_GET_CHUNK_SIZE]
+
+
+def _by_ids(bind, user_ids: list[int]) -> list[UserModel]:
+    with Session(bind) as session:
+        return [
+            user for chunk in _chunks(user_ids)
+            for user in session.exec(select(UserModel).where(UserModel.id.in_(chunk)))
+        ]
 
 
 def get_users() -> Iterable[UserModel]:
     """Получить всех пользователей"""
-    with Session(engine) as session:
-        return session.exec(select(UserModel)).all()
+    return replicas.router.read(_all, select(UserModel))
+
+
+def _get(bind, user_id: int) -> UserModel | None:
+    with Session(bind) as session:
+        return session.get(UserModel, user_id)
+
+
+def _all(bind, query) -> Sequence:
+    with Session(bind) as session:
+        return session.exec(query).all()
+
+
+def _paginate(bind, query) -> Page[UserModel]:
+    with Session(bind) as session:
+        return paginate(session, query)
+
+
+def _count_and_rows(bind, query, limit: int, offset: int) -> tuple[int, Sequence[Row]]:
+    with Session(bind) as session:
+        total = session.exec(_count_query(query)).scalar_one()
+        return total, session.exec(query.limit(limit).offset(offset)).all()
+
+
+def filter_users(query, filters: UserFilterModel | None):
+    """Условия поиска: email - точное совпадение, first_name и last_name - префикс без учёта
+    регистра, search - подстрока имени или фамилии без учёта регистра"""
+    if filters is None:
+        return query
+    if filters.email is not None:
+        query = query.where(UserModel.email == filters.email)
+    if filters.first_name is not None:
+        query = query.where(func.lower(UserModel.first_name).startswith(
+            filters.first_name.lower(), autoescape=True))
+    if filters.last_name is not None:
+        query = query.where(func.lower(UserModel.last_name).startswith(
+            filters.last_name.lower(), autoescape=True))
+    if filters.search is not None:
+        search = filters.search.lower()
+        query = query.where(or_(
+            func.lower(UserModel.first_name).contains(search, autoescape=True),
+            func.lower(UserModel.last_name).contains(search, autoescape=True),
+        ))
+    return query
+
 
+def _export_query(fields: Sequence[str], filters: UserFilterModel | None):
+    """Запрос выгрузки: только выбранные колонки в виде строк, курсор на стороне сервера"""
+    query = select_rows(*(getattr(UserModel, field) for field in fields)).order_by(UserModel.id)
+    query = filter_users(query, filters)
+    return query.execution_options(stream_results=True, yield_per=EXPORT_BATCH_SIZE)
 
-def get_users_paginated() -> Page[UserModel]:
-    """Получить всех пользователей постранично"""
-    with Session(engine) as session:
-        return paginate(session, select(UserModel))
+
+def stream_users(fields: Sequence[str], filters: UserFilterModel | None) -> Iterator[Sequence[Row]]:
+    """Выгрузить пользователей пачками по EXPORT_BATCH_SIZE строк"""
+    with Session(get_engine()) as session:
+        yield from session.exec(_export_query(fields, filters)).partitions()
+
+
+def get_users_paginated(filters: UserFilterModel | None = None) -> Page[UserModel]:
+    """Получить всех пользователей постранично; одинаковые одновременные запросы - одним"""
+    key = _flight_key('page', _filters_key(filters), resolve_params().model_dump_json())
+    return singleflight.page_reads.do(
+        key, replicas.router.read, _paginate, filter_users(select(UserModel), filters))
+
+
+def _rows_query(filters: UserFilterModel | None, fields: Sequence[str] = USER_FIELDS):
+    """Только колонки fields (и служебные version, id) строками, без создания ORM-объектов"""
+    return filter_users(select_rows(*row_columns(fields)), filters)
+
+
+def _count_query(query):
+    return select_rows(func.count()).select_from(query.order_by(None).subquery())
+
+
+def get_users_rows(
+    filters: UserFilterModel | None, limit: int, offset: int, fields: Sequence[str] = USER_FIELDS
+) -> tuple[int, Sequence[Row]]:
+    """Общее количество и страница пользователей строками (fields, version и id)"""
+    return singleflight.page_reads.do(
+        _flight_key('rows', _filters_key(filters), limit, offset, tuple(fields)),
+        replicas.router.read, _count_and_rows, _rows_query(filters, fields), limit, offset,
+    )
+
+
+def encode_cursor(direction: str, user_id: int) -> str:
+    """Непрозрачный курсор страницы: направление и граничный id"""
+    return urlsafe_b64encode(f'{direction}:{user_id}'.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> tuple[str, int]:
+    """Разобрать курсор страницы"""
+    try:
+        raw = urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        direction, user_id = raw.split(':')
+        if direction not in ('next', 'prev'):
+            raise ValueError(direction)
+        return direction, int(user_id)
+    except (ValueError, binascii.Error) as exc:
+        raise HTTPException(status_code=422, detail='Invalid cursor') from exc
+
+
+def _keyset_query(
+    cursor: str | None, size: int, filters: UserFilterModel | None,
+    fields: Sequence[str] | None = None,
+):
+    """Запрос страницы по ключу id без OFFSET и COUNT; выбирается на одну запись больше.
+
+    С fields - строки только этих колонок, иначе ORM-объекты.
+    """
+    if fields is None:
+        query = filter_users(select(UserModel), filters)
+    else:
+        query = _rows_query(filters, fields)
+    if cursor is None:
+        return 'next', query.order_by(UserModel.id).limit(size + 1)
+    direction, user_id = decode_cursor(cursor)
+    if direction == 'next':
+        query = query.where(UserModel.id > user_id).order_by(UserModel.id)
+    else:
+        query = query.where(UserModel.id < user_id).order_by(UserModel.id.desc())
+    return direction, query.limit(size + 1)
+
+
+def _keyset_page(
+    rows: Sequence[UserModel | Row], direction: str, size: int, cursor: str | None
+) -> tuple[list, str | None, str | None]:
+    """Записи страницы и курсоры соседних страниц"""
+    has_more = len(rows) > size
+    items = list(rows[:size])
+    if direction == 'prev':
+        items.reverse()
+        has_next, has_prev = True, has_more
+    else:
+        has_next, has_prev = has_more, cursor is not None
+    return (
+        items,
+        encode_cursor('next', items[-1].id) if items and has_next else None,
+        encode_cursor('prev', items[0].id) if items and has_prev else None,
+    )
+
+
+def get_users_keyset(
+    cursor: str | None, size: int, filters: UserFilterModel | None = None
+) -> UserCursorPageModel:
+    """Получить страницу пользователей по курсору"""
+    direction, query = _keyset_query(cursor, size, filters)
+    rows = replicas.router.read(_all, query)
+    items, next_cursor, previous = _keyset_page(rows, direction, size, cursor)
+    return UserCursorPageModel(items=items, size=size, next=next_cursor, previous=previous)
+
+
+def get_users_keyset_rows(
+    cursor: str | None, size: int, filters: UserFilterModel | None = None,
+    fields: Sequence[str] = USER_FIELDS,
+) -> tuple[list[Row], str | None, str | None]:
+    """Страница пользователей по курсору строками (fields, version и id) и курсоры"""
+    direction, query = _keyset_query(cursor, size, filters, fields)
+    rows = replicas.router.read(_all, query)
+    return _keyset_page(rows, direction, size, cursor)
 
 
 def create_user(user: UserModel) -> UserModel:
     """Создать пользователя"""
-    with Session(engine) as session:
+    with Session(get_engine()) as session:
         session.add(user)
+        with _email_conflict():
+            session.flush()
+        changefeed.feed.notify(session, 'create', [user])
         session.commit()
         session.refresh(user)
+        cache.user_cache.refresh(user.id, user)
+        changefeed.feed.publish('create', [user])
         return user
 
 
-def update_user(user_id: int, user: UserModel) -> Type[UserModel]:
-    """Изменить пользователя"""
-    with Session(engine) as session:
-        db_user = session.get(UserModel, user_id)
-        if not db_user:
-            raise HTTPException(status_code=404, detail='User not found')
-        user_data = user.model_dump(exclude_unset=True)
-        db_user.sqlmodel_update(user_data)
-        session.add(db_user)
+def update_user(
+    user_id: int, user: UserModel, versions: set[int] | None = None
+) -> UserModel:
+    """Изменить пользователя одним UPDATE ... RETURNING, versions - допустимые версии из If-Match"""
+    with Session(get_engine(), expire_on_commit=False) as session:
+        with _email_conflict():
+            db_user = session.scalars(_update_user_query(user_id, user, versions)).first()
+        if db_user is not None:
+            changefeed.feed.notify(session, 'update', [db_user])
         session.commit()
-        session.refresh(db_user)
-        return db_user
+        if db_user is None:
+            _not_updated(versions is not None and session.get(UserModel, user_id) is not None)
+    cache.user_cache.refresh(user_id, db_user)
+    changefeed.feed.publish('update', [db_user])
+    return db_user
 
 
 def delete_user(user_id: int):
-    """Удалить пользователя"""
-    with Session(engine) as session:
-        user = session.get(UserModel, user_id)
+    """Удалить пользователя одним DELETE ... RETURNING id"""
+    with Session(get_engine()) as session:
+        deleted = session.scalars(_delete_users_query([user_id])).first()
+        if deleted is not None:
+            changefeed.feed.notify(session, 'delete', [user_id])
+        session.commit()
+    cache.user_cache.invalidate(user_id)
+    if deleted is None:
+        raise HTTPException(status_code=404, detail='User not found')
+    changefeed.feed.publish('delete', [user_id])
+
+
+def _update_user_query(user_id: int, user: UserModel, versions: set[int] | None):
+    query = update(UserModel).where(UserModel.id == user_id)
+    if versions is not None:
+        query = query.where(UserModel.version.in_(versions))
+    return (
+        query
+        .values(**user.model_dump(exclude_unset=True), version=UserModel.version + 1)
+        .returning(UserModel)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _not_updated(exists: bool):
+    """UPDATE не нашёл строку: версия не совпала с If-Match (412) или пользователя нет (404)"""
+    if exists:
+        raise HTTPException(status_code=412, detail='User was modified')
+    raise HTTPException(status_code=404, detail='User not found')
+
+
+def create_users(new_users: list[dict]) -> list[UserModel]:
+    """Создать пользователей одним INSERT ... RETURNING в одной транзакции"""
+    if not new_users:
+        return []
+    with Session(get_engine(), expire_on_commit=False) as session:
+        created = session.scalars(_insert_users_query(), new_users).all()
+        changefeed.feed.notify(session, 'create', created)
+        session.commit()
+    cache.user_cache.refresh_many(created)
+    changefeed.feed.publish('create', created)
+    return list(created)
+
+
+def create_users_each(new_users: list[dict]) -> list[UserModel | HTTPException]:
+    """Создать пользователей в одной транзакции; занятый email не мешает остальным.
+
+    Сначала один INSERT ... RETURNING на всех. При нарушении уникальности -
+    по строке в точках сохранения одной транзакции, для таких строк - 409.
+    """
+    try:
+        return create_users(new_users)
+    except IntegrityError:
+        pass
+    results: list[UserModel | HTTPException] = []
+    with Session(get_engine(), expire_on_commit=False) as session:
+        for user_data in new_users:
+            try:
+                with _email_conflict(), session.begin_nested():
+                    results.append(session.scalars(_insert_users_query(), [user_data]).one())
+            except HTTPException as exc:
+                results.append(exc)
+        created = [user for user in results if isinstance(user, UserModel)]
+        changefeed.feed.notify(session, 'create', created)
+        session.commit()
+    cache.user_cache.refresh_many(created)
+    changefeed.feed.publish('create', created)
+    return results
+
+
+def update_users(changes: list[tuple[int, dict]]) -> list[UserModel | HTTPException | None]:
+    """Изменить пользователей в одной транзакции; занятый email не мешает остальным.
+
+    Результат по порядку изменений: пользователь, 409 или None - не найден.
+    Сначала все изменения одним flush. При нарушении уникальности -
+    по изменению в точках сохранения одной транзакции, как в create_users_each.
+    """
+    if not changes:
+        return []
+    with Session(get_engine(), expire_on_commit=False) as session:
         try:
-            session.delete(user)
-            session.commit()
-        except UnmappedInstanceError:
-            logging.info('On user %s deletion', user_id)
+            results = _apply_changes(session.exec(_users_by_ids_query(changes)).all(), changes)
+            session.flush()
+        except IntegrityError:
+            session.rollback()
+            results = []
+            db_users = _by_id(session.exec(_users_by_ids_query(changes)).all())
+            for user_id, user_data in changes:
+                try:
+                    with _email_conflict(), session.begin_nested():
+                        db_user = _apply_change(db_users.get(user_id), user_data)
+                except HTTPException as exc:
+                    db_user = exc
+                results.append(db_user)
+            for db_user in _updated(results):
+                if inspect(db_user).expired_attributes:
+                    session.refresh(db_user)
+        updated = _updated(results)
+        changefeed.feed.notify(session, 'update', updated)
+        session.commit()
+    cache.user_cache.refresh_many(updated)
+    changefeed.feed.publish('update', updated)
+    return results
+
+
+def delete_users(user_ids: list[int]) -> set[int]:
+    """Удалить пользователей одним DELETE ... RETURNING id, вернуть удалённые id"""
+    if not user_ids:
+        return set()
+    with Session(get_engine()) as session:
+        deleted = set(session.scalars(_delete_users_query(user_ids)))
+        changefeed.feed.notify(session, 'delete', sorted(deleted))
+        session.commit()
+    cache.user_cache.invalidate_many(user_ids)
+    changefeed.feed.publish('delete', sorted(deleted))
+    return deleted
+
+
+def _insert_users_query():
+    return insert(UserModel).returning(UserModel, sort_by_parameter_order=True)
+
+
+def _users_by_ids_query(changes: list[tuple[int, dict]]):
+    return select(UserModel).where(UserModel.id.in_({user_id for user_id, _ in changes}))
+
+
+def _by_id(db_users: Sequence[UserModel]) -> dict[int, UserModel]:
+    return {db_user.id: db_user for db_user in db_users}
+
+
+def _apply_change(db_user: UserModel | None, user_data: dict) -> UserModel | None:
+    if db_user is not None:
+        db_user.sqlmodel_update(user_data)
+    return db_user
+
+
+def _apply_changes(
+    db_users: Sequence[UserModel], changes: list[tuple[int, dict]]
+) -> list[UserModel | None]:
+    by_id = _by_id(db_users)
+    return [_apply_change(by_id.get(user_id), user_data) for user_id, user_data in changes]
+
+
+def _updated(results: list[UserModel | HTTPException | None]) -> list[UserModel]:
+    """Изменённые пользователи без повторов"""
+    return list({
+        user.id: user for user in results if isinstance(user, UserModel)}.values())
+
+
+def _delete_users_query(user_ids: list[int]):
+    return (
+        delete(UserModel)
+        .where(UserModel.id.in_(set(user_ids)))
+        .returning(UserModel.id)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def get_user_async(user_id: int) -> UserModel | None:
+    """Получить пользователя по id (async)"""
+    user = await cache.user_cache.get_async(user_id)
+    if user is not None:
+        return user
+    return await singleflight.user_reads.do_async(
+        _flight_key(user_id), _load_user_async, user_id)
+
+
+async def _load_user_async(user_id: int) -> UserModel | None:
+    version = cache.user_cache.version()
+    user = await replicas.router.read_async(_get_async, user_id)
+    if user is not None:
+        await cache.user_cache.fill_async(user_id, user, version)
+    return user
+
+
+async def get_users_by_ids_async(user_ids: Iterable[int]) -> dict[int, UserModel]:
+    """Найденные пользователи по id: из кэша, остальные запросами IN (async)"""
+    wanted = list(dict.fromkeys(user_ids))
+    found = await cache.user_cache.get_many_async(wanted)
+    missing = [user_id for user_id in wanted if user_id not in found]
+    if missing:
+        version = cache.user_cache.version()
+        loaded = await replicas.router.read_async(_by_ids_async, missing)
+        found.update((user.id, user) for user in loaded)
+        await cache.user_cache.fill_many_async(loaded, version)
+    return found
+
+
+async def _by_ids_async(bind, user_ids: list[int]) -> list[UserModel]:
+    async with AsyncSession(bind) as session:
+        users = []
+        for chunk in _chunks(user_ids):
+            users.extend(await session.exec(select(UserModel).where(UserModel.id.in_(chunk))))
+        return users
+
+
+async def _get_async(bind, user_id: int) -> UserModel | None:
+    async with AsyncSession(bind) as session:
+        return await session.get(UserModel, user_id)
+
+
+async def _all_async(bind, query) -> Sequence:
+    async with AsyncSession(bind) as session:
+        return (await session.exec(query)).all()
+
+
+async def _paginate_async(bind, query) -> Page[UserModel]:
+    async with AsyncSession(bind) as session:
+        return await apaginate(session, query)
+
+
+async def _count_and_rows_async(
+    bind, query, limit: int, offset: int
+) -> tuple[int, Sequence[Row]]:
+    async with AsyncSession(bind) as session:
+        total = (await session.exec(_count_query(query))).scalar_one()
+        return total, (await session.exec(query.limit(limit).offset(offset))).all()
+
+
+async def stream_users_async(
+    fields: Sequence[str], filters: UserFilterModel | None
+) -> AsyncIterator[Sequence[Row]]:
+    """Выгрузить пользователей пачками по EXPORT_BATCH_SIZE строк (async)"""
+    async with AsyncSession(get_async_engine()) as session:
+        result = await session.stream(_export_query(fields, filters))
+        async for partition in result.partitions():
+            yield partition
+
+
+async def get_users_paginated_async(filters: UserFilterModel | None = None) -> Page[UserModel]:
+    """Получить всех пользователей постранично (async)"""
+    key = _flight_key('page', _filters_key(filters), resolve_params().model_dump_json())
+    return await singleflight.page_reads.do_async(
+        key, replicas.router.read_async, _paginate_async, filter_users(select(UserModel), filters))
+
+
+async def get_users_keyset_async(
+    cursor: str | None, size: int, filters: UserFilterModel | None = None
+) -> UserCursorPageModel:
+    """Получить страницу пользователей по курсору (async)"""
+    direction, query = _keyset_query(cursor, size, filters)
+    rows = await replicas.router.read_async(_all_async, query)
+    items, next_cursor, previous = _keyset_page(rows, direction, size, cursor)
+    return UserCursorPageModel(items=items, size=size, next=next_cursor, previous=previous)
+
+
+async def get_users_rows_async(
+    filters: UserFilterModel | None, limit: int, offset: int, fields: Sequence[str] = USER_FIELDS
+) -> tuple[int, Sequence[Row]]:
+    """Общее количество и страница пользователей строками (async)"""
+    return await singleflight.page_reads.do_async(
+        _flight_key('rows', _filters_key(filters), limit, offset, tuple(fields)),
+        replicas.router.read_async, _count_and_rows_async, _rows_query(filters, fields),
+        limit, offset,
+    )
+
+
+async def get_users_keyset_rows_async(
+    cursor: str | None, size: int, filters: UserFilterModel | None = None,
+    fields: Sequence[str] = USER_FIELDS,
+) -> tuple[list[Row], str | None, str | None]:
+    """Страница пользователей по курсору строками и курсоры (async)"""
+    direction, query = _keyset_query(cursor, size, filters, fields)
+    rows = await replicas.router.read_async(_all_async, query)
+    return _keyset_page(rows, direction, size, cursor)
+
+
+async def create_user_async(user: UserModel) -> UserModel:
+    """Создать пользователя (async)"""
+    async with AsyncSession(get_async_engine()) as session:
+        session.add(user)
+        with _email_conflict():
+            await session.flush()
+        await changefeed.feed.notify_async(session, 'create', [user])
+        await session.commit()
+        await session.refresh(user)
+        await cache.user_cache.refresh_async(user.id, user)
+        await changefeed.feed.publish_async('create', [user])
+        return user
+
+
+async def update_user_async(
+    user_id: int, user: UserModel, versions: set[int] | None = None
+) -> UserModel:
+    """Изменить пользователя одним UPDATE ... RETURNING (async)"""
+    async with AsyncSession(get_async_engine(), expire_on_commit=False) as session:
+        with _email_conflict():
+            result = await session.exec(_update_user_query(user_id, user, versions))
+            db_user = result.scalars().first()
+        if db_user is not None:
+            await changefeed.feed.notify_async(session, 'update', [db_user])
+        await session.commit()
+        if db_user is None:
+            _not_updated(
+                versions is not None and await session.get(UserModel, user_id) is not None)
+    await cache.user_cache.refresh_async(user_id, db_user)
+    await changefeed.feed.publish_async('update', [db_user])
+    return db_user
+
+
+async def delete_user_async(user_id: int):
+    """Удалить пользователя одним DELETE ... RETURNING id (async)"""
+    async with AsyncSession(get_async_engine()) as session:
+        deleted = (await session.exec(_delete_users_query([user_id]))).scalars().first()
+        if deleted is not None:
+            await changefeed.feed.notify_async(session, 'delete', [user_id])
+        await session.commit()
+    await cache.user_cache.invalidate_async(user_id)
+    if deleted is None:
+        raise HTTPException(status_code=404, detail='User not found')
+    await changefeed.feed.publish_async('delete', [user_id])
+
+
+async def create_users_async(new_users: list[dict]) -> list[UserModel]:
+    """Создать пользователей одним INSERT ... RETURNING в одной транзакции (async)"""
+    if not new_users:
+        return []
+    async with AsyncSession(get_async_engine(), expire_on_commit=False) as session:
+        created = (await session.scalars(_insert_users_query(), new_users)).all()
+        await changefeed.feed.notify_async(session, 'create', created)
+        await session.commit()
+    await cache.user_cache.refresh_many_async(created)
+    await changefeed.feed.publish_async('create', created)
+    return list(created)
+
+
+async def create_users_each_async(new_users: list[dict]) -> list[UserModel | HTTPException]:
+    """Создать пользователей в одной транзакции; занятый email не мешает остальным (async)"""
+    try:
+        return await create_users_async(new_users)
+    except IntegrityError:
+        pass
+    results: list[UserModel | HTTPException] = []
+    async with AsyncSession(get_async_engine(), expire_on_commit=False) as session:
+        for user_data in new_users:
+            try:
+                with _email_conflict():
+                    async with session.begin_nested():
+                        result = await session.scalars(_insert_users_query(), [user_data])
+                        results.append(result.one())
+            except HTTPException as exc:
+                results.append(exc)
+        created = [user for user in results if isinstance(user, UserModel)]
+        await changefeed.feed.notify_async(session, 'create', created)
+        await session.commit()
+    await cache.user_cache.refresh_many_async(created)
+    await changefeed.feed.publish_async('create', created)
+    return results
+
+
+async def update_users_async(
+    changes: list[tuple[int, dict]]
+) -> list[UserModel | HTTPException | None]:
+    """Изменить пользователей в одной транзакции; занятый email не мешает остальным (async)"""
+    if not changes:
+        return []
+    async with AsyncSession(get_async_engine(), expire_on_commit=False) as session:
+        try:
+            results = _apply_changes(
+                (await session.exec(_users_by_ids_query(changes))).all(), changes)
+            await session.flush()
+        except IntegrityError:
+            await session.rollback()
+            results = []
+            db_users = _by_id((await session.exec(_users_by_ids_query(changes))).all())
+            for user_id, user_data in changes:
+                try:
+                    with _email_conflict():
+                        async with session.begin_nested():
+                            db_user = _apply_change(db_users.get(user_id), user_data)
+                except HTTPException as exc:
+                    db_user = exc
+                results.append(db_user)
+            for db_user in _updated(results):
+                if inspect(db_user).expired_attributes:
+                    await session.refresh(db_user)
+        updated = _updated(results)
+        await changefeed.feed.notify_async(session, 'update', updated)
+        await session.commit()
+    await cache.user_cache.refresh_many_async(updated)
+    await changefeed.feed.publish_async('update', updated)
+    return results
+
+
+async def delete_users_async(user_ids: list[int]) -> set[int]:
+    """Удалить пользователей одним DELETE ... RETURNING id, вернуть удалённые id (async)"""
+    if not user_ids:
+        return set()
+    async with AsyncSession(get_async_engine()) as session:
+        deleted = set(await session.scalars(_delete_users_query(user_ids)))
+        await changefeed.feed.notify_async(session, 'delete', sorted(deleted))
+        await session.commit()
+    await cache.user_cache.invalidate_many_async(user_ids)
+    await changefeed.feed.publish_async('delete', sorted(deleted))
+    return deleted
@@ -0,0 +1,151 @@
+import asyncio
+import logging
+import os
+from typing import Awaitable, Callable
+
+from fastapi.concurrency import run_in_threadpool
+
+from app import metrics
+from app.database import _engine, users
+from app.models.user import UserModel
+
+WRITE_BEHIND_ENABLED = os.getenv('USERS_WRITE_BEHIND', 'false').lower() in ('1', 'true', 'yes')
+WRITE_BEHIND_BATCH_SIZE = int(os.getenv('USERS_WRITE_BEHIND_BATCH_SIZE', '100'))
+WRITE_BEHIND_FLUSH_MS = float(os.getenv('USERS_WRITE_BEHIND_FLUSH_MS', '10'))
+WRITE_BEHIND_QUEUE_SIZE = int(os.getenv('USERS_WRITE_BEHIND_QUEUE_SIZE', '1000'))
+WRITE_BEHIND_PUT_TIMEOUT = float(os.getenv('USERS_WRITE_BEHIND_PUT_TIMEOUT', '1'))
+
+Flush = Callable[[list[dict]], Awaitable[list[UserModel | Exception]]]
+
+
+class QueueFull(Exception):
+    """Очередь записи заполнена дольше put_timeout"""
+
+
+class WriteBehindQueue:  # pylint: disable=too-many-instance-attributes
+    """Отложенная запись: новые пользователи копятся в ограниченной очереди, фоновая
+    задача записывает их пачками до batch_size или через flush_ms после первого
+    в пачке, одной транзакцией.
+
+    Вызывающий ждёт future с созданным пользователем либо ошибкой своей строки.
+    При заполненной очереди submit ждёт место до put_timeout секунд, затем
+    QueueFull. Фоновая задача запускается при первой записи в текущем цикле событий.
+    """
+    def __init__(
+        self, flush: Flush, *, batch_size: int = WRITE_BEHIND_BATCH_SIZE,
+        flush_ms: float = WRITE_BEHIND_FLUSH_MS, maxsize: int = WRITE_BEHIND_QUEUE_SIZE,
+        put_timeout: float = WRITE_BEHIND_PUT_TIMEOUT,
+    ):
+        self.flush = flush
+        self.batch_size = batch_size
+        self.flush_interval = flush_ms / 1000
+        self.maxsize = maxsize
+        self.put_timeout = put_timeout
+        self.batches = 0
+        self.written = 0
+        self._queue: asyncio.Queue | None = None
+        self._worker: asyncio.Task | None = None
+
+    def _start(self) -> asyncio.Queue:
+        """Очередь и фоновая задача в текущем цикле событий"""
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._worker.get_loop() is not loop:
+            self._queue = asyncio.Queue(self.maxsize)
+            self._worker = loop.create_task(self._run(self._queue))
+        return self._queue
+
+    async def submit(self, user_data: dict) -> UserModel:
+        """Поставить пользователя в очередь и дождаться его записи"""
+        queue = self._start()
+        future = asyncio.get_running_loop().create_future()
+        try:
+            await asyncio.wait_for(queue.put((user_data, future)), self.put_timeout)
+        except TimeoutError as exc:
+            metrics.WRITE_BEHIND_REJECTED.labels().inc()
+            raise QueueFull(f'Write-behind queue is full ({self.maxsize})') from exc
+        return await future
+
+    async def _next_batch(
+        self, queue: asyncio.Queue
+    ) -> tuple[list[tuple[dict, asyncio.Future]], bool]:
+        """Пачка: первый элемент очереди и следующие, пришедшие за flush_interval.
+
+        None в очереди - остановка: пачка отдаётся сразу, второй элемент - True.
+        """
+        loop = asyncio.get_running_loop()
+        batch = []
+        deadline = None
+        while len(batch) < self.batch_size:
+            try:
+                item = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                timeout = None if deadline is None else deadline - loop.time()
+                if timeout is not None and timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(queue.get(), timeout)
+                except TimeoutError:
+                    break
+            if item is None:
+                queue.task_done()
+                return batch, True
+            batch.append(item)
+            if deadline is None:
+                deadline = loop.time() + self.flush_interval
+        return batch, False
+
+    async def _run(self, queue: asyncio.Queue):
+        stop = False
+        while not stop:
+            batch, stop = await self._next_batch(queue)
+            if not batch:
+                continue
+            try:
+                await self._write(batch)
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    async def _write(self, batch: list[tuple[dict, asyncio.Future]]):
+        """Записать пачку и передать каждому ожидающему его результат"""
+        metrics.WRITE_BEHIND_BATCH_SIZE.labels().observe(len(batch))
+        try:
+            results = await self.flush([user_data for user_data, _ in batch])
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            logging.exception('On write-behind flush of %s users', len(batch))
+            results = [exc] * len(batch)
+        self.batches += 1
+        self.written += sum(not isinstance(result, Exception) for result in results)
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def close(self):
+        """Записать оставшееся в очереди и остановить фоновую задачу"""
+        worker, queue = self._worker, self._queue
+        self._worker = self._queue = None
+        if worker is None or worker.done() or worker.get_loop() is not asyncio.get_running_loop():
+            return
+        await queue.put(None)
+        await worker
+
+    def stats(self) -> dict[str, int]:
+        """Записанные пачки и пользователи, длина очереди"""
+        return {
+            'batches': self.batches, 'written': self.written,
+            'queued': self._queue.qsize() if self._queue is not None else 0,
+        }
+
+
+async def create_users_batch(new_users: list[dict]) -> list[UserModel | Exception]:
+    """Пачка создания: async-движком при DATABASE_ASYNC, иначе в пуле потоков"""
+    if _engine.DATABASE_ASYNC:
+        return await users.create_users_each_async(new_users)
+    return await run_in_threadpool(users.create_users_each, new_users)
+
+
+user_creates = WriteBehindQueue(create_users_batch)
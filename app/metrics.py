@@ -0,0 +1,166 @@
+import os
+import threading
+from bisect import bisect_left
+from typing import Callable, Iterable, Sequence
+
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+
+class Counter:
+    """Монотонно растущий счётчик"""
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1):
+        """Увеличить счётчик"""
+        with self._lock:
+            self.value += amount
+
+    def samples(self, name: str, labels: str) -> Iterable[str]:
+        """Строки в текстовом формате Prometheus"""
+        yield f'{name}{labels} {self.value}'
+
+
+class Gauge(Counter):
+    """Значение, которое может расти и уменьшаться"""
+    def dec(self, amount: float = 1):
+        """Уменьшить значение"""
+        with self._lock:
+            self.value -= amount
+
+
+class Histogram:
+    """Гистограмма значений с фиксированными границами корзин"""
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        """Учесть значение"""
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def snapshot(self) -> dict:
+        """Накопленные счётчики корзин (le), количество и сумма"""
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        cumulative, buckets = 0, {}
+        for bound, count in zip((*self.buckets, float('inf')), counts):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        return {'buckets': buckets, 'count': cumulative, 'sum': total}
+
+    def samples(self, name: str, labels: str) -> Iterable[str]:
+        """Строки в текстовом формате Prometheus"""
+        snapshot = self.snapshot()
+        prefix = labels[:-1] + ',' if labels else '{'
+        for bound, count in snapshot['buckets'].items():
+            le = '+Inf' if bound == 'inf' else bound
+            yield f'{name}_bucket{prefix}le="{le}"}} {count}'
+        yield f'{name}_sum{labels} {snapshot["sum"]}'
+        yield f'{name}_count{labels} {snapshot["count"]}'
+
+
+class MetricFamily:
+    """Метрика с набором меток"""
+    def __init__(
+        self, name: str, documentation: str, metric_type: str,
+        labelnames: Sequence[str] = (), factory: Callable = Counter,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.metric_type = metric_type
+        self.labelnames = tuple(labelnames)
+        self.factory = factory
+        self._children: dict[tuple, Counter | Histogram] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values) -> Counter | Gauge | Histogram:
+        """Метрика для значений меток"""
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self.factory())
+        return child
+
+    def render(self) -> Iterable[str]:
+        """Метрика в текстовом формате Prometheus"""
+        yield f'# HELP {self.name} {self.documentation}'
+        yield f'# TYPE {self.name} {self.metric_type}'
+        for values, child in list(self._children.items()):
+            yield from child.samples(self.name, format_labels(self.labelnames, values))
+
+
+def format_labels(names: Sequence[str], values: Sequence) -> str:
+    """Метки в формате {name="value"}"""
+    if not names:
+        return ''
+    pairs = (f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return '{' + ','.join(pairs) + '}'
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+REGISTRY: list[MetricFamily] = []
+COLLECTORS: list[Callable[[], Iterable[str]]] = []
+
+
+def register(family: MetricFamily) -> MetricFamily:
+    """Добавить метрику в реестр"""
+    REGISTRY.append(family)
+    return family
+
+
+def render() -> str:
+    """Все метрики в текстовом формате Prometheus"""
+    lines = [line for family in REGISTRY for line in family.render()]
+    lines.extend(line for collector in COLLECTORS for line in collector())
+    return '\n'.join(lines) + '\n'
+
+
+HTTP_REQUESTS = register(MetricFamily(
+    'http_requests_total', 'HTTP requests by route and status code', 'counter',
+    ('method', 'route', 'status'),
+))
+HTTP_REQUEST_DURATION = register(MetricFamily(
+    'http_request_duration_seconds', 'HTTP request latency by route', 'histogram',
+    ('method', 'route'), Histogram,
+))
+HTTP_REQUESTS_IN_PROGRESS = register(MetricFamily(
+    'http_requests_in_progress', 'HTTP requests being processed', 'gauge',
+    ('method',), Gauge,
+))
+DB_STATEMENT_DURATION = register(MetricFamily(
+    'db_statement_duration_seconds', 'SQL statement execution time by operation', 'histogram',
+    ('operation',), Histogram,
+))
+DB_SLOW_STATEMENTS = register(MetricFamily(
+    'db_slow_statements_total', 'SQL statements slower than SLOW_QUERY_THRESHOLD_MS', 'counter',
+))
+HTTP_RATE_LIMITED = register(MetricFamily(
+    'http_rate_limited_total', 'Requests rejected by the rate limiter by route', 'counter',
+    ('route',),
+))
+DB_COALESCED_REQUESTS = register(MetricFamily(
+    'db_coalesced_requests_total', 'Reads that joined an identical in-flight database query',
+    'counter', ('operation',),
+))
+WRITE_BEHIND_BATCH_SIZE = register(MetricFamily(
+    'write_behind_batch_size', 'Users written by one write-behind flush', 'histogram',
+    factory=lambda: Histogram(SIZE_BUCKETS),
+))
+WRITE_BEHIND_REJECTED = register(MetricFamily(
+    'write_behind_rejected_total', 'Creates rejected because the write-behind queue was full',
+    'counter',
+))
@@ -0,0 +1,88 @@
+import os
+from importlib.util import find_spec
+
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipResponder, IdentityResponder
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+COMPRESSION_ENABLED = os.getenv('COMPRESSION_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', '1024'))
+COMPRESSION_GZIP_LEVEL = int(os.getenv('COMPRESSION_GZIP_LEVEL', '6'))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', '4'))
+BROTLI_AVAILABLE = find_spec('brotli') is not None
+
+
+def accepted_encodings(header: str) -> dict[str, float]:
+    """Кодировки из Accept-Encoding с весами q"""
+    encodings = {}
+    for item in header.split(','):
+        name, _, params = item.partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        encodings[name] = quality
+    return encodings
+
+
+def negotiate_encoding(header: str) -> str:
+    """Кодировка ответа: br, gzip или identity с наибольшим q, при равенстве - по этому порядку"""
+    accepted = accepted_encodings(header)
+    wildcard = accepted.get('*', 0.0)
+    supported = ('br', 'gzip') if BROTLI_AVAILABLE else ('gzip',)
+    best, best_quality = 'identity', 0.0
+    for encoding in supported:
+        quality = accepted.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class BrotliResponder(IdentityResponder):
+    """Сжатие тела ответа brotli, в потоковом ответе - с flush после каждой части"""
+    content_encoding = 'br'
+
+    def __init__(self, app: ASGIApp, minimum_size: int, quality: int = 4):
+        super().__init__(app, minimum_size)
+        self.quality = quality
+        self._compressor = None
+
+    async def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        if self._compressor is None:
+            import brotli  # pylint: disable=import-outside-toplevel,import-error
+            self._compressor = brotli.Compressor(quality=self.quality)
+        data = self._compressor.process(body)
+        return data + (self._compressor.flush() if more_body else self._compressor.finish())
+
+
+class CompressionMiddleware:
+    """ASGI middleware: сжатие ответов gzip или brotli по Accept-Encoding.
+
+    Ответы меньше COMPRESSION_MIN_SIZE байт не сжимаются: на них сжатие
+    тратит CPU больше, чем экономит на передаче. brotli - если установлен.
+    """
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http' or not COMPRESSION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get('accept-encoding', ''))
+        if encoding == 'br':
+            responder = BrotliResponder(
+                self.app, COMPRESSION_MIN_SIZE, quality=COMPRESSION_BROTLI_QUALITY)
+        elif encoding == 'gzip':
+            responder = GZipResponder(
+                self.app, COMPRESSION_MIN_SIZE, compresslevel=COMPRESSION_GZIP_LEVEL)
+        else:
+            responder = IdentityResponder(self.app, COMPRESSION_MIN_SIZE)
+        await responder(scope, receive, send)
@@ -0,0 +1,37 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app import metrics
+
+
+class MetricsMiddleware:
+    """ASGI middleware: задержка, количество и статусы запросов по шаблону маршрута"""
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http' or not metrics.METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope['method']
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            await send(message)
+
+        in_progress = metrics.HTTP_REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            in_progress.dec()
+            route = getattr(scope.get('route'), 'path', '<unmatched>')
+            metrics.HTTP_REQUEST_DURATION.labels(method, route).observe(duration)
+            metrics.HTTP_REQUESTS.labels(method, route, status_code).inc()
@@ -0,0 +1,55 @@
+from math import ceil
+
+from fastapi.routing import iter_route_contexts
+from starlette.responses import JSONResponse
+from starlette.routing import Match
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app import metrics, ratelimit
+
+_ROUTE_CACHE_SIZE = 10_000
+
+
+class RateLimitMiddleware:
+    """ASGI middleware: ограничение частоты запросов по IP клиента и шаблону маршрута.
+
+    Шаблон маршрута определяется до маршрутизации приложения и кэшируется
+    по методу и пути. Превышение ограничения - 429 с заголовком Retry-After.
+    """
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._routes: dict[tuple[str, str], str] = {}
+
+    def _route(self, scope: Scope) -> str:
+        """Шаблон маршрута запроса, для ненайденных - общий ключ <unmatched>"""
+        key = (scope['method'], scope['path'])
+        route = self._routes.get(key)
+        if route is None:
+            route = '<unmatched>'
+            for candidate in iter_route_contexts(scope['app'].routes):
+                if candidate.matches(scope)[0] == Match.FULL:
+                    route = candidate.path
+                    break
+            if len(self._routes) >= _ROUTE_CACHE_SIZE:
+                self._routes.clear()
+            self._routes[key] = route
+        return route
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http' or not ratelimit.RATE_LIMIT_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        route = self._route(scope)
+        client = scope['client'][0] if scope.get('client') else 'unknown'
+        wait = await ratelimit.rate_limiter.acquire_async(
+            f'{client} {scope["method"]} {route}', ratelimit.policy_for(route))
+        if wait:
+            metrics.HTTP_RATE_LIMITED.labels(route).inc()
+            response = JSONResponse(
+                {'detail': 'Too Many Requests'}, status_code=429,
+                headers={'Retry-After': str(max(1, ceil(wait)))},
+            )
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
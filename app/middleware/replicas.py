@@ -0,0 +1,53 @@
+from starlette.datastructures import MutableHeaders
+from starlette.requests import cookie_parser
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.database import replicas
+
+STICKY_COOKIE = 'db-primary'
+WRITE_METHODS = frozenset({'POST', 'PUT', 'PATCH', 'DELETE'})
+# Маршруты с методом записи, которые только читают: POST ради списка в теле запроса
+READ_ONLY_ROUTES = frozenset({
+    ('POST', '/api/users/batch-get'),
+})
+
+
+def is_write(scope: Scope) -> bool:
+    """Запрос изменяет данные: метод записи и маршрут не из READ_ONLY_ROUTES"""
+    return (scope['method'] in WRITE_METHODS
+            and (scope['method'], scope['path']) not in READ_ONLY_ROUTES)
+
+
+class ReadYourWritesMiddleware:
+    """ASGI middleware: после записи клиент читает с основной БД STICKY_SECONDS секунд.
+
+    Успешный запрос на запись ставит cookie STICKY_COOKIE с Max-Age, запросы
+    с этой cookie читают с основной БД. Без реплик middleware ничего не делает.
+    """
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http' or not replicas.router.replicas:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope['headers'])
+        sticky = STICKY_COOKIE in cookie_parser(headers.get(b'cookie', b'').decode('latin-1'))
+        write = is_write(scope)
+
+        async def send_wrapper(message: Message):
+            if write and message['type'] == 'http.response.start' and message['status'] < 400:
+                MutableHeaders(scope=message).append(
+                    'set-cookie',
+                    f'{STICKY_COOKIE}=1; Max-Age={replicas.STICKY_SECONDS}; Path=/; '
+                    'HttpOnly; SameSite=Lax',
+                )
+            await send(message)
+
+        token = replicas.use_primary() if sticky or write else None
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if token is not None:
+                replicas.reset_primary(token)
@@ -1,6 +1,11 @@
 # pylint: disable-missing-class-docstring
 
+from datetime import datetime
+
 from pydantic import BaseModel
+from sqlmodel import Field, SQLModel
+
+from app.models.user import utcnow
 
 
 class LoginSchema(BaseModel):
@@ -10,3 +15,11 @@ class LoginSchema(BaseModel):
 
 class LoginResponseSchema(BaseModel):
     token: str
+
+
+class CredentialModel(SQLModel, table=True):
+    __tablename__ = 'credentials'
+    # Поиск при логине идёт по уникальному индексу users.email, затем по первичному ключу
+    user_id: int = Field(primary_key=True, foreign_key='users.id', ondelete='CASCADE')
+    password_hash: str
+    updated_at: datetime = Field(default_factory=utcnow)
@@ -3,3 +3,45 @@ from pydantic import BaseModel
 
 class StatusSchema(BaseModel):
     database: bool
+    pool_saturation: float | None = None
+    last_check_latency: float | None = None
+    last_check_age: float | None = None
+    since_last_success: float | None = None
+
+
+class LivenessSchema(BaseModel):
+    status: str
+
+
+class ReadinessSchema(BaseModel):
+    ready: bool
+    database: bool
+
+
+class HistogramSchema(BaseModel):
+    buckets: dict[str, int]
+    count: int
+    sum: float
+
+
+class PoolStatusSchema(BaseModel):
+    engine: str
+    pool: str
+    size: int | None = None
+    max_overflow: int | None = None
+    timeout: float | None = None
+    checked_out: int | None = None
+    checked_in: int | None = None
+    overflow: int | None = None
+    saturation: float | None = None
+    waiters: int | None = None
+    timeouts: int | None = None
+    checkout_latency: HistogramSchema | None = None
+
+
+class CacheStatsSchema(BaseModel):
+    backend: str
+    hits: int
+    misses: int
+    evictions: int
+    size: int | None
@@ -1,14 +1,59 @@
+from datetime import datetime, timezone
+
 from pydantic import BaseModel, EmailStr, HttpUrl
+from sqlalchemy import Column, Index, Integer, func
 from sqlmodel import Field, SQLModel
 
 
+def postgresql_index(*args, **kwargs) -> Index:
+    """Индекс, создаваемый только в PostgreSQL"""
+    return Index(*args, info={'dialect': 'postgresql'}, **kwargs).ddl_if(dialect='postgresql')
+
+
+def utcnow() -> datetime:
+    """Текущее время в UTC"""
+    return datetime.now(timezone.utc)
+
+
+_version_column = Column('version', Integer, nullable=False, default=1, server_default='1')
+
+
 class UserModel(SQLModel, table=True):
     __tablename__ = 'users'
+    __mapper_args__ = {'version_id_col': _version_column}
     id: int | None = Field(default=None, primary_key=True)
-    email: EmailStr
+    email: EmailStr = Field(unique=True, index=True)
     first_name: str
     last_name: str
     avatar: str
+    # Ведёт сервер, в тело ответа не входят: отдаются в заголовках ETag и Last-Modified.
+    # ORM увеличивает version при каждом UPDATE и проверяет её в WHERE.
+    version: int = Field(default=1, sa_column=_version_column, exclude=True)
+    updated_at: datetime | None = Field(
+        default_factory=utcnow, exclude=True,
+        sa_column_kwargs={'default': utcnow, 'onupdate': utcnow},
+    )
+
+
+_first_name_lower = func.lower(UserModel.first_name).label('first_name_lower')
+_last_name_lower = func.lower(UserModel.last_name).label('last_name_lower')
+
+Index(
+    'ix_users_first_name_lower', _first_name_lower,
+    postgresql_ops={'first_name_lower': 'text_pattern_ops'},
+)
+Index(
+    'ix_users_last_name_lower', _last_name_lower,
+    postgresql_ops={'last_name_lower': 'text_pattern_ops'},
+)
+postgresql_index(
+    'ix_users_first_name_trgm', _first_name_lower,
+    postgresql_using='gin', postgresql_ops={'first_name_lower': 'gin_trgm_ops'},
+)
+postgresql_index(
+    'ix_users_last_name_trgm', _last_name_lower,
+    postgresql_using='gin', postgresql_ops={'last_name_lower': 'gin_trgm_ops'},
+)
 
 
 class UserCreateModel(BaseModel):
@@ -18,6 +63,13 @@ class UserCreateModel(BaseModel):
     avatar: HttpUrl
 
 
+class UserFilterModel(BaseModel):
+    email: str | None = None
+    first_name: str | None = None
+    last_name: str | None = None
+    search: str | None = None
+
+
 class UserUpdateModel(BaseModel):
     email: EmailStr | None = None
     first_name: str | None = None
@@ -31,3 +83,39 @@ class ListUserPaginationModel(BaseModel):
     page: int
     size: int
     pages: int
+
+
+class UserCursorPageModel(BaseModel):
+    items: list[UserModel]
+    size: int
+    next: str | None = None
+    previous: str | None = None
+
+
+class UserBulkUpdateModel(UserUpdateModel):
+    id: int
+
+
+class BulkItemResultModel(BaseModel):
+    index: int
+    ok: bool
+    id: int | None = None
+    user: UserModel | None = None
+    error: str | None = None
+
+
+class BulkResultModel(BaseModel):
+    items: list[BulkItemResultModel]
+    succeeded: int
+    failed: int
+
+
+class ImportErrorModel(BaseModel):
+    row: int
+    error: str
+
+
+class ImportReportModel(BaseModel):
+    imported: int = 0
+    rejected: int = 0
+    errors: list[ImportErrorModel] = []
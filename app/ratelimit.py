@@ -0,0 +1,131 @@
+import os
+import time
+from collections import OrderedDict
+from typing import Any, NamedTuple, Protocol
+
+from fastapi.concurrency import run_in_threadpool
+
+RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+
+
+class RatePolicy(NamedTuple):
+    """Ограничение: rate запросов в секунду в среднем и до burst подряд"""
+    rate: float
+    burst: int
+
+
+DEFAULT_POLICY = RatePolicy(
+    rate=float(os.getenv('RATE_LIMIT_RATE', '20')),
+    burst=int(os.getenv('RATE_LIMIT_BURST', '40')),
+)
+ROUTE_POLICIES = {
+    '/api/login': RatePolicy(
+        rate=float(os.getenv('RATE_LIMIT_LOGIN_RATE', '0.1')),
+        burst=int(os.getenv('RATE_LIMIT_LOGIN_BURST', '5')),
+    ),
+}
+
+
+def policy_for(route: str) -> RatePolicy:
+    """Ограничение для шаблона маршрута"""
+    return ROUTE_POLICIES.get(route, DEFAULT_POLICY)
+
+
+class RateLimitBackend:
+    """Хранилище корзин токенов по ключу клиента и маршрута.
+
+    Корзина хранится одним числом - теоретическим временем следующего
+    запроса (GCRA): это эквивалентно корзине из burst токенов, пополняемой
+    со скоростью rate, но без отдельного счётчика токенов.
+
+    ``acquire_async`` для middleware: у хранилища с блокирующим клиентом
+    (``blocking``) вызов выполняется в пуле потоков, а не в цикле событий.
+    """
+    blocking = False
+
+    def acquire(self, key: str, policy: RatePolicy, now: float | None = None) -> float:
+        """Взять токен: 0 - запрос разрешён, иначе сколько секунд ждать"""
+        raise NotImplementedError
+
+    async def acquire_async(self, key: str, policy: RatePolicy) -> float:
+        """Взять токен (async)"""
+        if self.blocking:
+            return await run_in_threadpool(self.acquire, key, policy)
+        return self.acquire(key, policy)
+
+
+class MemoryRateLimit(RateLimitBackend):
+    """Корзины в памяти процесса, не больше maxsize ключей.
+
+    Вызывается из цикла событий без блокировок. Ключи упорядочены по
+    последнему разрешённому запросу, при переполнении за O(1) удаляется
+    ключ, который дольше всех не обновлялся: его корзина скорее всего полна.
+    """
+    def __init__(self, maxsize: int = 100_000):
+        self.maxsize = maxsize
+        self._tat: OrderedDict[str, float] = OrderedDict()
+
+    def acquire(self, key: str, policy: RatePolicy, now: float | None = None) -> float:
+        now = time.monotonic() if now is None else now
+        emission = 1 / policy.rate
+        tat = max(self._tat.get(key, now), now) + emission
+        wait = tat - emission * policy.burst - now
+        if wait > 0:
+            return wait
+        if key in self._tat:
+            self._tat.move_to_end(key)
+        elif len(self._tat) >= self.maxsize:
+            self._tat.popitem(last=False)
+        self._tat[key] = tat
+        return 0.0
+
+    def __len__(self) -> int:
+        return len(self._tat)
+
+
+class SharedRateLimitClient(Protocol):
+    """Клиент общего хранилища с интерфейсом redis"""
+    def eval(self, script: str, numkeys: int, *keys_and_args: Any) -> Any:
+        """Выполнить Lua-скрипт с numkeys ключами и аргументами"""
+
+
+# GCRA в одном скрипте: чтение и запись времени атомарны для всех процессов
+_GCRA_SCRIPT = '''
+local now = tonumber(ARGV[1])
+local emission = tonumber(ARGV[2])
+local tolerance = tonumber(ARGV[3])
+local tat = math.max(tonumber(redis.call('GET', KEYS[1]) or now), now) + emission
+local wait = tat - tolerance - now
+if wait > 0 then
+    return tostring(wait)
+end
+redis.call('SET', KEYS[1], tostring(tat), 'PX', math.ceil((tat - now) * 1000))
+return '0'
+'''
+
+
+class SharedRateLimit(RateLimitBackend):
+    """Корзины в общем хранилище (redis или совместимом) для нескольких процессов"""
+    blocking = True
+
+    def __init__(self, client: SharedRateLimitClient, prefix: str = 'ratelimit:'):
+        self.client = client
+        self.prefix = prefix
+
+    def acquire(self, key: str, policy: RatePolicy, now: float | None = None) -> float:
+        now = time.time() if now is None else now
+        emission = 1 / policy.rate
+        wait = self.client.eval(
+            _GCRA_SCRIPT, 1, f'{self.prefix}{key}', now, emission, emission * policy.burst)
+        return float(wait)
+
+
+def rate_limit_from_env() -> RateLimitBackend:
+    """Хранилище ограничений по настройкам RATE_LIMIT_*"""
+    if os.getenv('RATE_LIMIT_BACKEND', 'memory').lower() == 'redis':
+        import redis  # pylint: disable=import-outside-toplevel
+        return SharedRateLimit(redis.Redis.from_url(os.getenv('RATE_LIMIT_URL')))
+    return MemoryRateLimit(maxsize=int(os.getenv('RATE_LIMIT_MAX_KEYS', '100000')))
+
+
+rate_limiter: RateLimitBackend = rate_limit_from_env()
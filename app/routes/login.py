@@ -1,20 +1,37 @@
 from fastapi import APIRouter, HTTPException
+from starlette.concurrency import run_in_threadpool
 
-from app.models.login import LoginResponseSchema, LoginSchema
+from app import auth
+from app.database import _engine, credentials
+from app.models.login import CredentialModel, LoginResponseSchema, LoginSchema
 
 router = APIRouter(prefix='/api/login', tags=['Login API'])
 
-login_info_db = {
-    'eve.holt@reqres.i': 'cityslicka'
-}
+
+async def _get_credential(email: str) -> CredentialModel | None:
+    if _engine.DATABASE_ASYNC:
+        return await credentials.get_credential_async(email)
+    return await run_in_threadpool(credentials.get_credential, email)
+
+
+async def _rehash(user_id: int, password: str):
+    """Перехэшировать пароль с текущими параметрами KDF"""
+    password_hash = await auth.hash_password_async(password)
+    if _engine.DATABASE_ASYNC:
+        await credentials.set_password_hash_async(user_id, password_hash)
+    else:
+        await run_in_threadpool(credentials.set_password_hash, user_id, password_hash)
 
 
 @router.post('', response_model=LoginResponseSchema | dict)
-def post_login(login_data: LoginSchema):
-    """Получить пользователя по id"""
-    try:
-        if login_data.password == login_info_db[login_data.email]:
-            return LoginResponseSchema(token='QpwL5tke4Pnpja7X4')
+async def post_login(login_data: LoginSchema):
+    """Выдать подписанный токен по email и паролю"""
+    credential = await _get_credential(login_data.email)
+    if credential is None:
+        raise HTTPException(status_code=404)
+    if not await auth.check_password(
+            login_data.email, login_data.password, credential.password_hash):
         raise HTTPException(status_code=401)
-    except KeyError as exc:
-        raise HTTPException(status_code=404) from exc
+    if auth.needs_rehash(credential.password_hash):
+        await _rehash(credential.user_id, login_data.password)
+    return LoginResponseSchema(token=auth.issue_token(credential.user_id))
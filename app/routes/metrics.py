@@ -0,0 +1,41 @@
+from typing import Iterable
+
+from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import PlainTextResponse
+
+from app import metrics
+from app.database import cache
+from app.database._engine import pools_status
+
+router = APIRouter(prefix='/metrics', tags=['Metrics API'])
+
+_POOL_GAUGES = ('checked_out', 'overflow', 'waiters', 'saturation')
+
+
+def pool_metrics() -> Iterable[str]:
+    """Состояние пулов соединений"""
+    pools = pools_status()
+    for gauge in _POOL_GAUGES:
+        yield f'# TYPE db_pool_{gauge} gauge'
+        for pool in pools:
+            if pool.get(gauge) is not None:
+                yield f'db_pool_{gauge}{{engine="{pool["engine"]}"}} {pool[gauge]}'
+
+
+def cache_metrics() -> Iterable[str]:
+    """Счётчики кэша пользователей"""
+    stats = cache.user_cache.stats()
+    for counter in ('hits', 'misses', 'evictions'):
+        yield f'# TYPE users_cache_{counter}_total counter'
+        yield f'users_cache_{counter}_total {stats[counter]}'
+
+
+metrics.COLLECTORS.extend((pool_metrics, cache_metrics))
+
+
+@router.get('', status_code=status.HTTP_200_OK, response_class=PlainTextResponse)
+def get_metrics() -> PlainTextResponse:
+    """Метрики в текстовом формате Prometheus"""
+    if not metrics.METRICS_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Metrics disabled')
+    return PlainTextResponse(metrics.render(), media_type='text/plain; version=0.0.4')
@@ -1,16 +1,72 @@
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Response, status
 
-from app.database._engine import check_availability
-from app.models.status import StatusSchema
+from app.database import cache, health
+from app.database._engine import pools_status
+from app.models.status import (
+    CacheStatsSchema, LivenessSchema, PoolStatusSchema, ReadinessSchema, StatusSchema)
 
 router = APIRouter(prefix='/status', tags=['Status API'])
 
 
+async def _health() -> dict:
+    """Последний результат проверки БД; до первой фоновой проверки выполняется сразу"""
+    if health.health_monitor.last_check is None:
+        await health.health_monitor.check()
+    return health.health_monitor.snapshot()
+
+
 @router.get(
     '',
     status_code=status.HTTP_200_OK,
     response_model=StatusSchema,
 )
-def status_check() -> StatusSchema:
+async def status_check() -> StatusSchema:
     """Status check"""
-    return StatusSchema(database=check_availability())
+    saturation = [
+        pool['saturation'] for pool in pools_status() if pool.get('saturation') is not None
+    ]
+    return StatusSchema(**await _health(), pool_saturation=max(saturation, default=None))
+
+
+@router.get(
+    '/live',
+    status_code=status.HTTP_200_OK,
+    response_model=LivenessSchema,
+)
+async def liveness_check() -> LivenessSchema:
+    """Liveness: процесс отвечает, БД не проверяется"""
+    return LivenessSchema(status='ok')
+
+
+@router.get(
+    '/ready',
+    status_code=status.HTTP_200_OK,
+    response_model=ReadinessSchema,
+    responses={status.HTTP_503_SERVICE_UNAVAILABLE: {'model': ReadinessSchema}},
+)
+async def readiness_check(response: Response) -> ReadinessSchema:
+    """Readiness: БД доступна по последней проверке"""
+    health = await _health()
+    if not health['database']:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return ReadinessSchema(ready=health['database'], database=health['database'])
+
+
+@router.get(
+    '/pool',
+    status_code=status.HTTP_200_OK,
+    response_model=list[PoolStatusSchema],
+)
+def pool_stats() -> list[PoolStatusSchema]:
+    """Состояние пулов соединений с БД"""
+    return [PoolStatusSchema(**pool) for pool in pools_status()]
+
+
+@router.get(
+    '/cache',
+    status_code=status.HTTP_200_OK,
+    response_model=CacheStatsSchema,
+)
+def cache_stats() -> CacheStatsSchema:
+    """Счётчики кэша пользователей"""
+    return CacheStatsSchema(**cache.user_cache.stats())
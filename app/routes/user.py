@@ -1,54 +1,459 @@
+import asyncio
+import csv
+import io
+import json
+import logging
+import os
+from datetime import datetime
 from http import HTTPStatus
+from math import ceil
+from typing import Annotated, Any, AsyncIterator, Awaitable, Callable, Iterator, Literal, Sequence
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import (
+    APIRouter, Body, Depends, Header, HTTPException, Query, Request, Response, UploadFile, status)
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from fastapi_pagination import Page
+from fastapi_pagination.api import resolve_params
+from pydantic import ValidationError
+from pydantic_core import to_json
+from sqlalchemy.exc import SQLAlchemyError
 
-from app.database import users
+from app import conditional
+from app.database import _engine, changefeed, user_import, users, write_behind
 from app.database.users import get_user as get_user_db
-from app.database.users import get_users_paginated
-from app.models.user import UserCreateModel, UserModel, UserUpdateModel
+from app.database.users import get_user_async as get_user_db_async
+from app.database.users import get_users_paginated, get_users_paginated_async
+from app.models.user import (
+    BulkItemResultModel, BulkResultModel, ImportReportModel, UserBulkUpdateModel, UserCreateModel,
+    UserCursorPageModel, UserFilterModel, UserModel, UserUpdateModel)
 
 router = APIRouter(prefix='/api/users', tags=['Users API'])
 
+BULK_MAX_ITEMS = 1000
+FAST_JSON = os.getenv('USERS_FAST_JSON', 'false').lower() in ('1', 'true', 'yes')
+EXPORT_MEDIA_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+async def _db_call(func: Callable, async_func: Callable[..., Awaitable], *args):
+    """Запрос к БД: async-движком при DATABASE_ASYNC, иначе sync-функцией в пуле потоков"""
+    if _engine.DATABASE_ASYNC:
+        return await async_func(*args)
+    return await run_in_threadpool(func, *args)
+
+
+def _conditional_response(
+    request: Request, response: Response, headers: dict[str, str], content: Any,
+    last_modified: datetime | None = None, *, raw: bool = False,
+):
+    """304, если копия клиента актуальна, иначе content с заголовками валидации.
+
+    При FAST_JSON или raw content сериализуется сразу pydantic-core, без повторной
+    валидации ответа по response_model (raw - для ответа с частью полей).
+    """
+    if conditional.not_modified(request, headers['ETag'], last_modified):
+        return Response(status_code=HTTPStatus.NOT_MODIFIED, headers=headers)
+    if FAST_JSON or raw:
+        return Response(to_json(content), media_type='application/json', headers=headers)
+    response.headers.update(headers)
+    return content
+
+
+def _row_items(rows: Sequence[Sequence], fields: Sequence[str]) -> list[dict]:
+    """Пользователи из строк БД (fields, затем служебные колонки) без создания моделей"""
+    return [dict(zip(fields, row)) for row in rows]
+
+
+def _fields_etag(fields: Sequence[str]) -> tuple:
+    """Поля в ETag страницы, только если выбрана часть полей"""
+    return () if tuple(fields) == users.USER_FIELDS else (tuple(fields),)
+
+
+async def _users_page_rows(
+    filters: UserFilterModel, fields: Sequence[str] = users.USER_FIELDS
+) -> tuple[str, dict]:
+    """ETag и страница пользователей из строк БД для FAST_JSON и fields"""
+    params = resolve_params()
+    raw_params = params.to_raw_params()
+    total, rows = await _db_call(
+        users.get_users_rows, users.get_users_rows_async,
+        filters, raw_params.limit, raw_params.offset, fields,
+    )
+    etag = conditional.page_etag(rows, total, params.page, params.size, *_fields_etag(fields))
+    return etag, {
+        'items': _row_items(rows, fields),
+        'total': total,
+        'page': params.page,
+        'size': params.size,
+        'pages': ceil(total / params.size),
+    }
+
+
+async def _users_cursor_rows(
+    cursor: str | None, size: int, filters: UserFilterModel,
+    fields: Sequence[str] = users.USER_FIELDS,
+) -> tuple[str, dict]:
+    """ETag и страница по курсору из строк БД для FAST_JSON и fields"""
+    rows, next_cursor, previous = await _db_call(
+        users.get_users_keyset_rows, users.get_users_keyset_rows_async,
+        cursor, size, filters, fields,
+    )
+    etag = conditional.page_etag(rows, next_cursor, previous, *_fields_etag(fields))
+    return etag, {
+        'items': _row_items(rows, fields), 'size': size, 'next': next_cursor,
+        'previous': previous}
+
+
+def _validation_error(exc: ValidationError) -> str:
+    """Текст ошибки валидации элемента пакета"""
+    return '; '.join(
+        f"{'.'.join(str(loc) for loc in error['loc'])}: {error['msg']}" for error in exc.errors())
+
+
+def _bulk_result(results: list[BulkItemResultModel]) -> BulkResultModel:
+    """Ответ пакетной операции в порядке элементов запроса"""
+    results.sort(key=lambda result: result.index)
+    succeeded = sum(result.ok for result in results)
+    return BulkResultModel(items=results, succeeded=succeeded, failed=len(results) - succeeded)
+
+
+def _bulk_db_error(indexes: list[int]) -> list[BulkItemResultModel]:
+    """Ошибка транзакции пакета: ни один элемент не записан"""
+    logging.exception('On bulk users write')
+    return [BulkItemResultModel(index=index, ok=False, error='Database error') for index in indexes]
+
+
+def _parse_fields(fields: str | None) -> tuple[str, ...]:
+    """Список полей из параметра fields=a,b,c"""
+    if not fields:
+        return users.USER_FIELDS
+    requested = tuple(dict.fromkeys(field.strip() for field in fields.split(',') if field.strip()))
+    unknown = [field for field in requested if field not in users.USER_FIELDS]
+    if unknown or not requested:
+        raise HTTPException(
+            status_code=HTTPStatus.UNPROCESSABLE_ENTITY, detail=f'Unknown fields: {unknown}')
+    return requested
+
+
+def _encode_rows(rows: Sequence[Sequence], fields: Sequence[str], export_format: str) -> str:
+    """Пачка строк выгрузки в формате NDJSON или CSV"""
+    if export_format == 'csv':
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue()
+    return ''.join(json.dumps(dict(zip(fields, row)), ensure_ascii=False) + '\n' for row in rows)
+
+
+def _export_body(
+    fields: Sequence[str], filters: UserFilterModel, export_format: str
+) -> Iterator[str]:
+    if export_format == 'csv':
+        yield _encode_rows([fields], fields, export_format)
+    for rows in users.stream_users(fields, filters):
+        yield _encode_rows(rows, fields, export_format)
+
+
+async def _export_body_async(
+    fields: Sequence[str], filters: UserFilterModel, export_format: str
+) -> AsyncIterator[str]:
+    if export_format == 'csv':
+        yield _encode_rows([fields], fields, export_format)
+    async for rows in users.stream_users_async(fields, filters):
+        yield _encode_rows(rows, fields, export_format)
+
+
+@router.get('/export', status_code=HTTPStatus.OK, response_class=StreamingResponse)
+async def export_users(
+    filters: Annotated[UserFilterModel, Depends()],
+    export_format: Literal['ndjson', 'csv'] = Query('ndjson', alias='format'),
+    fields: str | None = None,
+):
+    """Потоковая выгрузка пользователей в NDJSON или CSV"""
+    selected = _parse_fields(fields)
+    if _engine.DATABASE_ASYNC:
+        body = _export_body_async(selected, filters, export_format)
+    else:
+        body = _export_body(selected, filters, export_format)
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={'Content-Disposition': f'attachment; filename="users.{export_format}"'},
+    )
+
+
+@router.post('/import', status_code=HTTPStatus.OK)
+async def import_users_file(
+    file: UploadFile,
+    import_format: Literal['ndjson', 'csv'] | None = Query(None, alias='format'),
+) -> ImportReportModel:
+    """Импорт пользователей из файла NDJSON/CSV пачками с отчётом об отклонённых строках"""
+    file_format = import_format or ('csv' if (file.filename or '').endswith('.csv') else 'ndjson')
+    text = io.TextIOWrapper(file.file, encoding='utf-8-sig', newline='')
+    try:
+        return await run_in_threadpool(user_import.import_users, text, file_format)
+    finally:
+        text.detach()
+
+
+@router.post('/bulk', status_code=HTTPStatus.OK)
+async def create_users_bulk(
+    items: Annotated[list[dict[str, Any]], Body(max_length=BULK_MAX_ITEMS)]
+) -> BulkResultModel:
+    """Создать пользователей пакетом в одной транзакции; занятый email - ошибка своего элемента"""
+    results: list[BulkItemResultModel] = []
+    valid: list[tuple[int, dict]] = []
+    for index, item in enumerate(items):
+        try:
+            UserCreateModel.model_validate(item)
+        except ValidationError as exc:
+            results.append(BulkItemResultModel(index=index, ok=False, error=_validation_error(exc)))
+            continue
+        valid.append((index, {field: item[field] for field in UserCreateModel.model_fields}))
+    try:
+        created = await _db_call(
+            users.create_users_each, users.create_users_each_async, [data for _, data in valid])
+    except SQLAlchemyError:
+        results.extend(_bulk_db_error([index for index, _ in valid]))
+    else:
+        results.extend(
+            BulkItemResultModel(index=index, ok=False, error=user.detail)
+            if isinstance(user, HTTPException)
+            else BulkItemResultModel(index=index, ok=True, id=user.id, user=user)
+            for (index, _), user in zip(valid, created)
+        )
+    return _bulk_result(results)
+
+
+@router.patch('/bulk', status_code=HTTPStatus.OK)
+async def update_users_bulk(
+    items: Annotated[list[dict[str, Any]], Body(max_length=BULK_MAX_ITEMS)]
+) -> BulkResultModel:
+    """Изменить пользователей пакетом в одной транзакции; занятый email - ошибка своего элемента"""
+    results: list[BulkItemResultModel] = []
+    valid: list[tuple[int, int, dict]] = []
+    for index, item in enumerate(items):
+        try:
+            update = UserBulkUpdateModel.model_validate(item)
+        except ValidationError as exc:
+            results.append(BulkItemResultModel(index=index, ok=False, error=_validation_error(exc)))
+            continue
+        if update.id < 1:
+            results.append(
+                BulkItemResultModel(index=index, ok=False, id=update.id, error='Invalid user id'))
+            continue
+        valid.append((index, update.id, update.model_dump(exclude_unset=True, exclude={'id'})))
+    try:
+        updated = await _db_call(
+            users.update_users, users.update_users_async,
+            [(user_id, data) for _, user_id, data in valid])
+    except SQLAlchemyError:
+        results.extend(_bulk_db_error([index for index, _, _ in valid]))
+    else:
+        results.extend(
+            BulkItemResultModel(index=index, ok=False, id=user_id, error='User not found')
+            if user is None else
+            BulkItemResultModel(index=index, ok=False, id=user_id, error=user.detail)
+            if isinstance(user, HTTPException) else
+            BulkItemResultModel(index=index, ok=True, id=user_id, user=user)
+            for (index, user_id, _), user in zip(valid, updated)
+        )
+    return _bulk_result(results)
+
+
+@router.delete('/bulk', status_code=HTTPStatus.OK)
+async def delete_users_bulk(
+    user_ids: Annotated[list[int], Body(max_length=BULK_MAX_ITEMS)]
+) -> BulkResultModel:
+    """Удалить пользователей пакетом одним запросом"""
+    results = [
+        BulkItemResultModel(index=index, ok=False, id=user_id, error='Invalid user id')
+        for index, user_id in enumerate(user_ids) if user_id < 1
+    ]
+    valid = [(index, user_id) for index, user_id in enumerate(user_ids) if user_id >= 1]
+    try:
+        deleted = await _db_call(
+            users.delete_users, users.delete_users_async, [user_id for _, user_id in valid])
+    except SQLAlchemyError:
+        results.extend(_bulk_db_error([index for index, _ in valid]))
+    else:
+        results.extend(
+            BulkItemResultModel(index=index, ok=True, id=user_id)
+            if user_id in deleted else
+            BulkItemResultModel(index=index, ok=False, id=user_id, error='User not found')
+            for index, user_id in valid
+        )
+    return _bulk_result(results)
+
+
+@router.post('/batch-get', status_code=HTTPStatus.OK)
+async def get_users_batch(
+    user_ids: Annotated[list[int], Body(max_length=BULK_MAX_ITEMS)]
+) -> BulkResultModel:
+    """Получить пользователей по списку id запросом IN, в порядке запроса"""
+    found = await _db_call(
+        users.get_users_by_ids, users.get_users_by_ids_async,
+        [user_id for user_id in user_ids if user_id >= 1])
+    return _bulk_result([
+        BulkItemResultModel(index=index, ok=False, id=user_id, error='Invalid user id')
+        if user_id < 1 else
+        BulkItemResultModel(index=index, ok=True, id=user_id, user=found[user_id])
+        if user_id in found else
+        BulkItemResultModel(index=index, ok=False, id=user_id, error='User not found')
+        for index, user_id in enumerate(user_ids)
+    ])
+
+
+@router.get('/cursor', status_code=HTTPStatus.OK)
+async def get_users_by_cursor(  # pylint: disable=too-many-positional-arguments
+    filters: Annotated[UserFilterModel, Depends()],
+    request: Request,
+    response: Response,
+    cursor: str | None = None,
+    size: int = Query(50, ge=1, le=100),
+    fields: str | None = None,
+) -> UserCursorPageModel:
+    """Получить пользователей постранично по курсору, с If-None-Match - 304.
+
+    fields=a,b,c - только эти поля: из БД читаются только их колонки.
+    """
+    selected = _parse_fields(fields)
+    if FAST_JSON or fields:
+        etag, page = await _users_cursor_rows(cursor, size, filters, selected)
+    else:
+        page = await _db_call(
+            users.get_users_keyset, users.get_users_keyset_async, cursor, size, filters)
+        etag = conditional.page_etag(page.items, page.next, page.previous)
+    return _conditional_response(
+        request, response, conditional.validators(etag), page, raw=bool(fields))
+
+
+def _sse_event(feed: changefeed.ChangeFeed, event: changefeed.ChangeEvent) -> str:
+    return f'id: {feed.event_id(event.seq)}\nevent: {event.op}\ndata: {event.data}\n\n'
+
+
+async def _change_stream(
+    feed: changefeed.ChangeFeed, subscription: changefeed.Subscription
+) -> AsyncIterator[str]:
+    """События подписки в формате SSE до её закрытия или USERS_CHANGES_STREAM_TTL секунд"""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + changefeed.CHANGES_STREAM_TTL
+    dropped = 0
+    try:
+        yield 'retry: 1000\n\n'
+        if subscription.reset:
+            yield 'event: reset\ndata: {}\n\n'
+        while not subscription.closed or subscription.events:
+            timeout = min(changefeed.CHANGES_KEEPALIVE, deadline - loop.time())
+            if timeout <= 0:
+                break
+            try:
+                events = await asyncio.wait_for(subscription.get(), timeout)
+            except TimeoutError:
+                yield ': keepalive\n\n'
+                continue
+            if subscription.dropped != dropped:
+                yield f'event: dropped\ndata: {subscription.dropped - dropped}\n\n'
+                dropped = subscription.dropped
+            for event in events:
+                yield _sse_event(feed, event)
+    finally:
+        feed.unsubscribe(subscription)
+
+
+@router.get('/changes', status_code=HTTPStatus.OK, response_class=StreamingResponse)
+async def get_user_changes(
+    after: str | None = None,
+    last_event_id: Annotated[str | None, Header()] = None,
+):
+    """Лента изменений пользователей (server-sent events).
+
+    События create, update, delete с id вида epoch-номер и данными
+    {"seq", "op", "id", "user"}. Продолжение после разрыва - с id события
+    after или заголовка Last-Event-ID; reset - пропущенных событий уже нет
+    или id из другой ленты, dropped - медленный клиент пропустил столько событий.
+    """
+    feed = changefeed.feed
+    subscription = feed.subscribe(after or last_event_id)
+    return StreamingResponse(
+        _change_stream(feed, subscription), media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+
 
 @router.get('/{user_id}', status_code=HTTPStatus.OK)
-def get_user_by_id(user_id: int) -> UserModel:
-    """Получить пользователя по user_id"""
+async def get_user_by_id(user_id: int, request: Request, response: Response) -> UserModel:
+    """Получить пользователя по user_id, с If-None-Match / If-Modified-Since - 304"""
     if user_id < 1:
         raise HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail='Invalid user id')
-    user = get_user_db(user_id)
+    user = await _db_call(get_user_db, get_user_db_async, user_id)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='User not found')
-    return user
+    return _conditional_response(
+        request, response, conditional.user_validators(user), user, user.updated_at)
 
 
 @router.get('', status_code=HTTPStatus.OK)
-def get_users() -> Page[UserModel]:
-    """Получить всех пользователей"""
-    return get_users_paginated()
+async def get_users(
+    filters: Annotated[UserFilterModel, Depends()], request: Request, response: Response,
+    fields: str | None = None,
+) -> Page[UserModel]:
+    """Получить всех пользователей с фильтрами поиска, с If-None-Match - 304.
+
+    fields=a,b,c - только эти поля: из БД читаются только их колонки.
+    """
+    selected = _parse_fields(fields)
+    if FAST_JSON or fields:
+        etag, page = await _users_page_rows(filters, selected)
+    else:
+        page = await _db_call(get_users_paginated, get_users_paginated_async, filters)
+        etag = conditional.page_etag(page.items, page.total, page.page, page.size)
+    return _conditional_response(
+        request, response, conditional.validators(etag), page, raw=bool(fields))
 
 
 @router.post('', status_code=HTTPStatus.CREATED)
-def create_user(user: UserModel) -> UserModel:
-    """Создать пользователя"""
+async def create_user(user: UserModel, response: Response) -> UserModel:
+    """Создать пользователя, при USERS_WRITE_BEHIND - через очередь пакетной записи"""
     UserCreateModel.model_validate(user.model_dump())
-    return users.create_user(user)
+    user = UserModel.model_validate(user.model_dump())
+    if write_behind.WRITE_BEHIND_ENABLED:
+        try:
+            created = await write_behind.user_creates.submit(
+                {field: getattr(user, field) for field in UserCreateModel.model_fields})
+        except write_behind.QueueFull as exc:
+            raise HTTPException(
+                status_code=HTTPStatus.SERVICE_UNAVAILABLE, detail='Too many pending writes',
+                headers={'Retry-After': '1'},
+            ) from exc
+    else:
+        created = await _db_call(users.create_user, users.create_user_async, user)
+    response.headers.update(conditional.user_validators(created))
+    return created
 
 
 @router.patch('/{user_id}', status_code=HTTPStatus.OK)
-def update_user(user_id: int, user: UserModel) -> UserModel:
-    """Изменить пользователя"""
+async def update_user(
+    user_id: int, user: UserModel, response: Response,
+    if_match: Annotated[str | None, Header()] = None,
+) -> UserModel:
+    """Изменить пользователя, при несовпадении If-Match - 412"""
     if user_id < 1:
         raise HTTPException(status_code=HTTPStatus.UNPROCESSABLE_ENTITY, detail='Invalid user id')
     UserUpdateModel.model_validate(user.model_dump())
-    return users.update_user(user_id, user)
+    versions = conditional.if_match_versions(if_match, user_id)
+    updated = await _db_call(users.update_user, users.update_user_async, user_id, user, versions)
+    response.headers.update(conditional.user_validators(updated))
+    return updated
 
 
 @router.delete('/{user_id}', status_code=HTTPStatus.OK)
-def delete_user(user_id: int):
+async def delete_user(user_id: int):
     """Удалить пользователя"""
     if user_id < 1:
         raise HTTPException(status_code=HTTPStatus.UNPROCESSABLE_ENTITY, detail='Invalid user id')
-    users.delete_user(user_id)
+    await _db_call(users.delete_user, users.delete_user_async, user_id)
     return {'message': 'User deleted'}
@@ -0,0 +1,144 @@
+import logging
+import os
+import secrets
+from importlib.util import find_spec
+from typing import NamedTuple
+
+import uvicorn
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.pool import NullPool
+
+WEB_HOST = os.getenv('WEB_HOST', '127.0.0.1')
+WEB_PORT = int(os.getenv('WEB_PORT', '8000'))
+WEB_WORKERS = int(os.getenv('WEB_WORKERS', str(os.cpu_count() or 1)))
+WEB_LOOP = os.getenv('WEB_LOOP', 'uvloop' if find_spec('uvloop') else 'asyncio')
+WEB_HTTP = os.getenv('WEB_HTTP', 'httptools' if find_spec('httptools') else 'h11')
+WEB_GRACEFUL_TIMEOUT = int(os.getenv('WEB_GRACEFUL_TIMEOUT', '20'))
+WEB_KEEPALIVE = int(os.getenv('WEB_KEEPALIVE', '5'))
+DATABASE_RESERVED_CONNECTIONS = int(os.getenv('DATABASE_RESERVED_CONNECTIONS', '10'))
+
+APP = 'app.application:create_app'
+
+
+class PoolSize(NamedTuple):
+    """Размер пула одного движка в воркере"""
+    pool_size: int
+    max_overflow: int
+
+
+def worker_pool_size(
+    workers: int, max_connections: int, *, pool_size: int, max_overflow: int, engines: int = 1,
+    reserved: int = DATABASE_RESERVED_CONNECTIONS,
+) -> PoolSize:
+    """Пул движка в воркере: соединений всех движков всех воркеров не больше
+    max_connections - reserved. Заданные pool_size и max_overflow только уменьшаются.
+    """
+    per_engine = (max_connections - reserved) // (workers * engines)
+    if per_engine < 1:
+        raise ValueError(
+            f'{workers} workers x {engines} engines do not fit into '
+            f'{max_connections} - {reserved} reserved database connections')
+    size = min(pool_size, per_engine)
+    return PoolSize(size, min(max_overflow, per_engine - size))
+
+
+def database_max_connections() -> int | None:
+    """Ограничение соединений БД: DATABASE_MAX_CONNECTIONS или SHOW max_connections в PostgreSQL"""
+    if os.getenv('DATABASE_MAX_CONNECTIONS'):
+        return int(os.getenv('DATABASE_MAX_CONNECTIONS'))
+    url = make_url(os.getenv('DATABASE_ENGINE'))
+    if url.get_backend_name() != 'postgresql':
+        return None
+    engine = create_engine(url, poolclass=NullPool)
+    try:
+        with engine.connect() as connection:
+            return int(connection.execute(text('SHOW max_connections')).scalar_one())
+    except SQLAlchemyError as e:
+        logging.warning('Could not read max_connections, pool size is not limited: %s', e)
+        return None
+    finally:
+        engine.dispose()
+
+
+def configure_pools(workers: int) -> PoolSize | None:
+    """Уменьшить DATABASE_POOL_SIZE и DATABASE_MAX_OVERFLOW под число воркеров.
+
+    Значения записываются в окружение до запуска воркеров: каждый воркер
+    импортирует приложение заново и создаёт свои движки с этими настройками.
+    Async-движок создаётся и при DATABASE_ASYNC, и для ленты изменений postgres.
+    """
+    max_connections = database_max_connections()
+    if max_connections is None:
+        return None
+    async_engine = (
+        os.getenv('DATABASE_ASYNC', 'false').lower() in ('1', 'true', 'yes')
+        or os.getenv('USERS_CHANGES_BACKEND', 'memory') == 'postgres'
+    )
+    size = worker_pool_size(
+        workers, max_connections,
+        pool_size=int(os.getenv('DATABASE_POOL_SIZE', '10')),
+        max_overflow=int(os.getenv('DATABASE_MAX_OVERFLOW', '10')),
+        engines=2 if async_engine else 1,
+    )
+    os.environ['DATABASE_POOL_SIZE'] = str(size.pool_size)
+    os.environ['DATABASE_MAX_OVERFLOW'] = str(size.max_overflow)
+    logging.info('Database pool per engine: %s + %s overflow for %s workers (max_connections %s)',
+                 size.pool_size, size.max_overflow, workers, max_connections)
+    return size
+
+
+def check_workers_state(workers: int):
+    """Предупредить о настройках, состояние которых своё в каждом воркере"""
+    if workers > 1 and os.getenv('USERS_CACHE', 'none').lower() == 'lru':
+        logging.warning(
+            'USERS_CACHE=lru is per worker: with %s workers a changed user may be served stale '
+            'for up to USERS_CACHE_TTL seconds, use USERS_CACHE=redis', workers)
+    if workers > 1 and os.getenv('USERS_CHANGES_BACKEND', 'memory') == 'memory':
+        logging.warning(
+            'USERS_CHANGES_BACKEND=memory is per worker: with %s workers a change feed stream '
+            'sees only the writes of its own worker, use USERS_CHANGES_BACKEND=postgres', workers)
+
+
+def share_token_secret(workers: int) -> bool:
+    """Общий для воркеров случайный LOGIN_TOKEN_SECRET, если он не задан.
+
+    Иначе каждый воркер создаёт свой ключ, и токен, выданный одним воркером,
+    не проходит проверку в другом. Ключ записывается в окружение до запуска
+    воркеров; токены перестают действовать при перезапуске сервера.
+    """
+    if workers <= 1 or os.getenv('LOGIN_TOKEN_SECRET'):
+        return False
+    os.environ['LOGIN_TOKEN_SECRET'] = secrets.token_hex(32)
+    logging.warning('LOGIN_TOKEN_SECRET is not set: login tokens will not survive a restart')
+    return True
+
+
+def serve(
+    workers: int | None = None, host: str | None = None, port: int | None = None,
+    loop: str | None = None, http: str | None = None,
+):
+    """Запустить приложение в workers процессах uvicorn.
+
+    SIGTERM/SIGINT - плавная остановка: новые соединения не принимаются,
+    начатые запросы завершаются за WEB_GRACEFUL_TIMEOUT секунд, затем
+    lifespan закрывает соединения с БД. SIGHUP - поочерёдный перезапуск
+    воркеров без остановки обслуживания.
+    """
+    workers = workers or WEB_WORKERS
+    check_workers_state(workers)
+    share_token_secret(workers)
+    configure_pools(workers)
+    uvicorn.run(
+        APP,
+        factory=True,
+        host=host or WEB_HOST,
+        port=port or WEB_PORT,
+        workers=workers,
+        loop=loop or WEB_LOOP,
+        http=http or WEB_HTTP,
+        lifespan='on',
+        timeout_graceful_shutdown=WEB_GRACEFUL_TIMEOUT,
+        timeout_keep_alive=WEB_KEEPALIVE,
+    )
@@ -0,0 +1,85 @@
+import argparse
+import asyncio
+import json
+import os
+
+from benchmarks.report import compare, format_table
+
+
+def parse_args() -> argparse.Namespace:
+    """Аргументы командной строки"""
+    parser = argparse.ArgumentParser(prog='python -m benchmarks')
+    parser.add_argument('--database', help='Адрес БД, по умолчанию DATABASE_ENGINE')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help='Прогнать сценарии нагрузки')
+    run.add_argument('--url', help='Адрес запущенного сервера, по умолчанию приложение в процессе')
+    run.add_argument('--rows', type=int, default=100_000)
+    run.add_argument('--requests', type=int, default=2000)
+    run.add_argument('--concurrency', type=int, default=32)
+    run.add_argument('--warmup', type=int, default=50)
+    run.add_argument('--seed', type=int, default=0)
+    run.add_argument('--scenarios', help='Сценарии через запятую, по умолчанию все')
+    run.add_argument('--output', help='Файл результатов, по умолчанию benchmarks/results/')
+
+    seed = commands.add_parser('seed', help='Заполнить таблицу пользователей')
+    seed.add_argument('--rows', type=int, required=True)
+
+    serialization = commands.add_parser(
+        'serialization', help='Процессорное время сериализации страницы пользователей')
+    serialization.add_argument('--size', type=int, default=100)
+    serialization.add_argument('--repeat', type=int, default=200)
+
+    payload = commands.add_parser(
+        'payload', help='Размер и задержка страницы: выбор полей и сжатие ответа')
+    payload.add_argument('--url', help='Адрес сервера, по умолчанию приложение в процессе')
+    payload.add_argument('--size', type=int, default=100)
+    payload.add_argument('--repeat', type=int, default=200)
+
+    startup = commands.add_parser(
+        'startup', help='Профиль импорта и время от запуска сервера до первого ответа')
+    startup.add_argument('--repeat', type=int, default=5)
+
+    diff = commands.add_parser('compare', help='Сравнить два прогона')
+    diff.add_argument('baseline')
+    diff.add_argument('current')
+    return parser.parse_args()
+
+
+def main():
+    """Точка входа"""
+    args = parse_args()
+    if args.database:
+        os.environ['DATABASE_ENGINE'] = args.database
+    if args.command == 'compare':
+        with open(args.baseline, encoding='utf-8') as baseline, \
+                open(args.current, encoding='utf-8') as current:
+            print(compare(json.load(baseline), json.load(current)))
+        return
+    if args.command == 'startup':
+        # Замеры в отдельных процессах: приложение здесь не импортируется
+        from benchmarks import startup  # pylint: disable=import-outside-toplevel
+        print(json.dumps(startup.run(args.repeat), indent=2))
+        return
+    # pylint: disable=import-outside-toplevel
+    from benchmarks import payload, runner, serialization
+    from benchmarks.data import ensure_users
+
+    if args.command == 'seed':
+        ensure_users(args.rows)
+    elif args.command == 'serialization':
+        print(json.dumps(serialization.run(args.size, args.repeat), indent=2))
+    elif args.command == 'payload':
+        print(json.dumps(asyncio.run(payload.run(args.size, args.repeat, args.url)), indent=2))
+    else:
+        names = args.scenarios.split(',') if args.scenarios else list(runner.SCENARIOS)
+        report = asyncio.run(runner.run(
+            names, args.rows, args.requests, args.concurrency,
+            warmup=args.warmup, url=args.url, seed=args.seed,
+        ))
+        print(format_table(report))
+        print(f'Saved to {runner.save(report, args.output)}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,25 @@
+from sqlmodel import Session, func, select
+
+from app.database._engine import db_init, get_engine
+from app.database.seed import seed_users
+from app.models.user import UserModel
+
+
+def count_users() -> int:
+    """Количество пользователей в БД"""
+    with Session(get_engine()) as session:
+        return session.exec(select(func.count()).select_from(UserModel)).one()
+
+
+def ensure_users(count: int, seed: int | None = None):
+    """Дополнить таблицу пользователей до count строк"""
+    db_init()
+    missing = count - count_users()
+    if missing > 0:
+        seed_users(missing, seed)
+
+
+def sample_user_ids(size: int) -> list[int]:
+    """Случайная выборка id существующих пользователей"""
+    with Session(get_engine()) as session:
+        return list(session.exec(select(UserModel.id).order_by(func.random()).limit(size)))
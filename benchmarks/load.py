@@ -0,0 +1,57 @@
+import asyncio
+import time
+from typing import Awaitable, Callable
+
+import httpx
+
+Request = Callable[[httpx.AsyncClient, int], Awaitable[httpx.Response]]
+
+
+def percentile(values: list[float], percent: float) -> float:
+    """Перцентиль по методу ближайшего ранга"""
+    if not values:
+        return 0.0
+    index = max(0, min(len(values) - 1, round(percent / 100 * len(values) + 0.5) - 1))
+    return values[index]
+
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> dict:
+    """Пропускная способность и перцентили задержки в миллисекундах"""
+    latencies = sorted(latencies)
+    total = len(latencies)
+    return {
+        'requests': total,
+        'errors': errors,
+        'elapsed_s': elapsed,
+        'rps': total / elapsed if elapsed else 0.0,
+        'mean_ms': sum(latencies) / total * 1000 if total else 0.0,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'max_ms': latencies[-1] * 1000 if latencies else 0.0,
+    }
+
+
+async def run_load(
+    client: httpx.AsyncClient, request: Request, requests: int, concurrency: int
+) -> dict:
+    """Выполнить requests запросов в concurrency параллельных потоков"""
+    latencies: list[float] = []
+    errors = 0
+    numbers = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for number in numbers:
+            start = time.perf_counter()
+            try:
+                response = await request(client, number)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            latencies.append(time.perf_counter() - start)
+            errors += failed
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - start)
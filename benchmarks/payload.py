@@ -0,0 +1,41 @@
+import time
+
+from app.middleware.compression import BROTLI_AVAILABLE
+from benchmarks.data import ensure_users
+from benchmarks.load import percentile
+from benchmarks.runner import make_client
+
+FIELDS = {
+    'full': None,
+    'projected': 'id,email',
+}
+ENCODINGS = ('identity', 'gzip', 'br') if BROTLI_AVAILABLE else ('identity', 'gzip')
+
+
+async def run(size: int = 100, repeat: int = 200, url: str | None = None) -> list[dict]:
+    """Байты тела на странице из size пользователей и задержка p50 в миллисекундах.
+
+    Варианты: все поля и fields=id,email, без сжатия, gzip и br (если установлен brotli).
+    bytes - переданный размер тела, ratio - доля от полной страницы без сжатия.
+    """
+    ensure_users(size)
+    results = []
+    async with make_client(url) as client:
+        for name, fields in FIELDS.items():
+            params = {'page': 1, 'size': size, **({'fields': fields} if fields else {})}
+            for encoding in ENCODINGS:
+                headers = {'Accept-Encoding': encoding}
+                latencies, downloaded = [], 0
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    response = await client.get('/api/users', params=params, headers=headers)
+                    latencies.append(time.perf_counter() - start)
+                    response.raise_for_status()
+                    downloaded = response.num_bytes_downloaded
+                results.append({
+                    'fields': name, 'encoding': encoding, 'bytes': downloaded,
+                    'p50_ms': percentile(sorted(latencies), 50) * 1000,
+                })
+    for result in results:
+        result['ratio'] = result['bytes'] / results[0]['bytes']
+    return results
@@ -0,0 +1,40 @@
+def format_table(report: dict) -> str:
+    """Результаты прогона в виде таблицы"""
+    lines = [
+        f'{"scenario":<18}{"rps":>10}{"p50_ms":>10}{"p95_ms":>10}{"p99_ms":>10}'
+        f'{"errors":>8}{"sql/req":>9}'
+    ]
+    for name, result in report['scenarios'].items():
+        statements = result.get('sql_per_request')
+        lines.append(
+            f'{name:<18}{result["rps"]:>10.1f}{result["p50_ms"]:>10.2f}'
+            f'{result["p95_ms"]:>10.2f}{result["p99_ms"]:>10.2f}{result["errors"]:>8}'
+            + (f'{statements:>9.2f}' if statements is not None else f'{"-":>9}')
+        )
+    return '\n'.join(lines)
+
+
+def compare(baseline: dict, current: dict) -> str:
+    """Изменение rps и перцентилей в процентах, сэкономленные SQL-запросы и миллисекунды p50"""
+    metrics = ('rps', 'p50_ms', 'p95_ms', 'p99_ms')
+    lines = [
+        f'{"scenario":<18}' + ''.join(f'{metric:>12}' for metric in metrics)
+        + f'{"p50 saved":>12}{"sql/req":>14}'
+    ]
+    for name, result in current['scenarios'].items():
+        before = baseline['scenarios'].get(name)
+        if before is None:
+            continue
+        changes = (
+            (result[metric] - before[metric]) / before[metric] * 100 if before[metric] else 0.0
+            for metric in metrics
+        )
+        saved = before['p50_ms'] - result['p50_ms']
+        statements = '-'
+        if 'sql_per_request' in before and 'sql_per_request' in result:
+            statements = f'{before["sql_per_request"]:.2f}->{result["sql_per_request"]:.2f}'
+        lines.append(
+            f'{name:<18}' + ''.join(f'{change:>+11.1f}%' for change in changes)
+            + f'{saved:>+10.2f}ms{statements:>14}'
+        )
+    return '\n'.join(lines)
@@ -0,0 +1,113 @@
+import json
+import os
+import subprocess
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from random import Random
+
+import httpx
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.__main__ import app
+from app.database import _engine
+from app.database._engine import get_engine
+from benchmarks.data import ensure_users, sample_user_ids
+from benchmarks.load import run_load
+from benchmarks.scenarios import SCENARIOS, BenchContext
+
+RESULTS_DIR = Path(__file__).parent / 'results'
+
+
+def git_commit() -> str | None:
+    """Текущий коммит репозитория"""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class StatementCounter:
+    """Счётчик SQL-запросов движков приложения (только для прогона в процессе)"""
+    def __init__(self, engines: list[Engine]):
+        self.count = 0
+        for counted in engines:
+            event.listen(counted, 'before_cursor_execute', self._count)
+
+    def _count(self, *_):
+        self.count += 1
+
+
+@asynccontextmanager
+async def make_client(url: str | None):
+    """HTTP-клиент к запущенному серверу либо к приложению в этом процессе"""
+    if url:
+        async with httpx.AsyncClient(base_url=url, timeout=30) as client:
+            yield client
+        return
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+            yield client
+
+
+async def run(
+    names: list[str], rows: int, requests: int, concurrency: int, *,
+    warmup: int = 50, url: str | None = None, seed: int = 0,
+) -> dict:
+    """Прогнать сценарии и вернуть результаты с метаданными прогона"""
+    ensure_users(rows, seed)
+    ctx = BenchContext(ids=sample_user_ids(1000), requests=requests, rng=Random(seed))
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'dialect': get_engine().dialect.name,
+            'database_async': _engine.DATABASE_ASYNC,
+            'target': url or 'in-process',
+            'settings': {
+                'rows': rows, 'requests': requests, 'concurrency': concurrency,
+                'warmup': warmup, 'seed': seed,
+                **{key: value for key, value in os.environ.items()
+                   if key.startswith(
+                       ('DATABASE_POOL', 'USERS_CACHE', 'USERS_FAST_JSON', 'USERS_SINGLEFLIGHT',
+                        'USERS_WRITE_BEHIND'))},
+            },
+        },
+        'scenarios': {},
+    }
+    engines = [get_engine()]
+    if _engine.DATABASE_ASYNC:
+        engines.append(_engine.get_async_engine().sync_engine)
+    counter = None if url else StatementCounter(engines)
+    async with make_client(url) as client:
+        for name in names:
+            scenario = SCENARIOS[name](ctx)
+            await scenario.setup(client)
+            if scenario.repeatable and warmup:
+                await run_load(client, scenario.request, warmup, concurrency)
+            before, cpu = counter and counter.count, time.process_time()
+            result = await run_load(client, scenario.request, requests, concurrency)
+            if counter:
+                result['sql_per_request'] = (counter.count - before) / result['requests']
+                result['cpu_ms_per_request'] = (
+                    (time.process_time() - cpu) / result['requests'] * 1000)
+            report['scenarios'][name] = result
+            await scenario.teardown(client)
+    return report
+
+
+def save(report: dict, output: str | None = None) -> Path:
+    """Сохранить результаты в JSON"""
+    if output:
+        path = Path(output)
+    else:
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        path = RESULTS_DIR / f'{stamp}-{report["meta"]["commit"] or "local"}.json'
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2), encoding='utf-8')
+    return path
@@ -0,0 +1,177 @@
+import random
+from dataclasses import dataclass, field
+
+import httpx
+from mimesis import Locale, Person
+from sqlmodel import Session, select
+
+from app.auth import hash_password
+from app.database._engine import get_engine
+from app.database.credentials import set_password_hash
+from app.database.seed import generate_user
+from app.database.users import encode_cursor
+from app.models.user import UserModel
+
+PAGE_SIZE = 50
+BATCH_GET_SIZE = 100
+BULK_SIZE = 1000
+LOGIN_PASSWORD = 'cityslicka'
+
+
+@dataclass
+class BenchContext:
+    """Общие данные сценариев: выборка id, генератор случайных чисел и объём прогона"""
+    ids: list[int]
+    requests: int
+    rng: random.Random = field(default_factory=lambda: random.Random(0))
+    person: Person = field(default_factory=lambda: Person(Locale.EN))
+
+
+class Scenario:
+    """Сценарий нагрузки: подготовка, запрос и очистка"""
+    name = ''
+    repeatable = True
+
+    def __init__(self, ctx: BenchContext):
+        self.ctx = ctx
+
+    async def setup(self, client: httpx.AsyncClient):
+        """Подготовка перед замером"""
+
+    async def request(self, client: httpx.AsyncClient, number: int) -> httpx.Response:
+        """Один запрос сценария"""
+        raise NotImplementedError
+
+    async def teardown(self, client: httpx.AsyncClient):
+        """Очистка после замера"""
+
+
+class GetUser(Scenario):
+    name = 'get_user'
+
+    async def request(self, client, number):
+        return await client.get(f'/api/users/{self.ctx.rng.choice(self.ctx.ids)}')
+
+
+class BatchGetUsers(Scenario):
+    """BATCH_GET_SIZE случайных пользователей одним запросом batch-get"""
+    name = 'batch_get'
+
+    async def request(self, client, number):
+        ids = self.ctx.rng.sample(self.ctx.ids, min(BATCH_GET_SIZE, len(self.ctx.ids)))
+        return await client.post('/api/users/batch-get', json=ids)
+
+
+class ListShallow(Scenario):
+    name = 'list_shallow'
+
+    async def request(self, client, number):
+        return await client.get('/api/users', params={'page': 1, 'size': PAGE_SIZE})
+
+
+class ListDeep(Scenario):
+    name = 'list_deep'
+    page = 1
+
+    async def setup(self, client):
+        response = await client.get('/api/users', params={'page': 1, 'size': PAGE_SIZE})
+        self.page = max(response.json()['pages'], 1)
+
+    async def request(self, client, number):
+        return await client.get('/api/users', params={'page': self.page, 'size': PAGE_SIZE})
+
+
+class ListCursorDeep(Scenario):
+    name = 'list_cursor_deep'
+    cursor = None
+
+    async def setup(self, client):
+        with Session(get_engine()) as session:
+            user_id = session.exec(
+                select(UserModel.id).order_by(UserModel.id.desc()).offset(PAGE_SIZE).limit(1)
+            ).first()
+        self.cursor = encode_cursor('next', user_id or 0)
+
+    async def request(self, client, number):
+        return await client.get(
+            '/api/users/cursor', params={'cursor': self.cursor, 'size': PAGE_SIZE})
+
+
+class CreateUser(Scenario):
+    name = 'create'
+    repeatable = False
+
+    def __init__(self, ctx):
+        super().__init__(ctx)
+        self.created: list[int] = []
+
+    async def request(self, client, number):
+        response = await client.post(
+            '/api/users', json=generate_user(self.ctx.person).model_dump(mode='json'))
+        if response.status_code == 201:
+            self.created.append(response.json()['id'])
+        return response
+
+    async def teardown(self, client):
+        for start in range(0, len(self.created), BULK_SIZE):
+            await client.request(
+                'DELETE', '/api/users/bulk', json=self.created[start:start + BULK_SIZE])
+
+
+class PatchUser(Scenario):
+    name = 'patch'
+
+    async def request(self, client, number):
+        return await client.patch(
+            f'/api/users/{self.ctx.rng.choice(self.ctx.ids)}',
+            json={'first_name': f'Bench{number}'},
+        )
+
+
+class DeleteUser(Scenario):
+    name = 'delete'
+    repeatable = False
+
+    def __init__(self, ctx):
+        super().__init__(ctx)
+        self.victims: list[int] = []
+
+    async def setup(self, client):
+        """Пользователи для удаления: по одному на запрос, пачки дозаписываются до нужного числа"""
+        while (missing := self.ctx.requests - len(self.victims)) > 0:
+            response = await client.post('/api/users/bulk', json=[
+                generate_user(self.ctx.person).model_dump(mode='json')
+                for _ in range(min(BULK_SIZE, missing))
+            ])
+            created = [item['id'] for item in response.json()['items'] if item['ok']]
+            if not created:
+                raise RuntimeError(f'Could not create users to delete: {response.text[:200]}')
+            self.victims.extend(created)
+
+    async def request(self, client, number):
+        return await client.delete(f'/api/users/{self.victims[number]}')
+
+
+class Login(Scenario):
+    """Повторный логин одного пользователя: после первого запроса KDF не вычисляется"""
+    name = 'login'
+    email = ''
+
+    async def setup(self, client):
+        user_id = self.ctx.ids[0]
+        with Session(get_engine()) as session:
+            self.email = session.get(UserModel, user_id).email
+        set_password_hash(user_id, hash_password(LOGIN_PASSWORD))
+
+    async def request(self, client, number):
+        return await client.post(
+            '/api/login', json={'email': self.email, 'password': LOGIN_PASSWORD})
+
+
+SCENARIOS: dict[str, type[Scenario]] = {
+    scenario.name: scenario
+    for scenario in (
+        GetUser, BatchGetUsers, ListShallow, ListDeep, ListCursorDeep,
+        CreateUser, PatchUser, DeleteUser, Login,
+    )
+}
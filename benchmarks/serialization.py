@@ -0,0 +1,60 @@
+import time
+
+from fastapi_pagination import Page, Params
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+from sqlmodel import Session, select
+
+from app.database._engine import get_engine
+from app.database.users import ROW_COLUMNS, USER_FIELDS
+from app.models.user import UserModel
+from benchmarks.data import ensure_users
+
+
+def _cpu_ms(func, repeat: int) -> float:
+    """Процессорное время одного вызова в миллисекундах"""
+    start = time.process_time()
+    for _ in range(repeat):
+        func()
+    return (time.process_time() - start) / repeat * 1000
+
+
+def run(size: int = 100, repeat: int = 200) -> dict:
+    """Процессорное время на страницу из size пользователей, в миллисекундах.
+
+    default - ORM-объекты и путь FastAPI (валидация по response_model, затем dump_json),
+    fast - строки БД в словари и pydantic-core to_json (USERS_FAST_JSON).
+    *_ms - загрузка из БД и сериализация, *_serialize_ms - только сериализация.
+    """
+    ensure_users(size)
+    params = Params(page=1, size=size)
+    adapter = TypeAdapter(Page[UserModel])
+
+    def load_models() -> Page[UserModel]:
+        with Session(get_engine()) as session:
+            items = session.exec(select(UserModel).limit(size)).all()
+        return Page[UserModel].create(items, params, total=size)
+
+    def load_rows() -> list:
+        with Session(get_engine()) as session:
+            return session.exec(select(*ROW_COLUMNS).limit(size)).all()
+
+    def serialize_models(page: Page[UserModel]) -> bytes:
+        return adapter.dump_json(adapter.validate_python(page, from_attributes=True))
+
+    def serialize_rows(rows: list) -> bytes:
+        return to_json({
+            'items': [dict(zip(USER_FIELDS, row)) for row in rows],
+            'total': size, 'page': 1, 'size': size, 'pages': 1,
+        })
+
+    page, rows = load_models(), load_rows()
+    result = {
+        'size': size,
+        'default_ms': _cpu_ms(lambda: serialize_models(load_models()), repeat),
+        'fast_ms': _cpu_ms(lambda: serialize_rows(load_rows()), repeat),
+        'default_serialize_ms': _cpu_ms(lambda: serialize_models(page), repeat),
+        'fast_serialize_ms': _cpu_ms(lambda: serialize_rows(rows), repeat),
+    }
+    result['saved_ms'] = result['default_ms'] - result['fast_ms']
+    return result
@@ -0,0 +1,79 @@
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+FIRST_REQUEST = '/api/users?size=1'
+
+
+def import_profile(statement: str, top: int = 10) -> dict:
+    """Время импорта по python -X importtime в отдельном процессе, в миллисекундах.
+
+    total_ms - сумма импортов верхнего уровня, slowest - самые долгие из них
+    (вместе с вложенными импортами).
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        capture_output=True, text=True, check=True,
+    )
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.removeprefix('import time:').split('|')
+        if not name.startswith('  '):
+            imports.append((name.strip(), int(cumulative) / 1000))
+    imports.sort(key=lambda item: item[1], reverse=True)
+    return {
+        'statement': statement,
+        'total_ms': sum(ms for _, ms in imports),
+        'slowest': dict(imports[:top]),
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def time_to_first_request(env: dict[str, str] | None = None, timeout: float = 60) -> float:
+    """Секунды от запуска python -m app serve с одним воркером до первого ответа 200"""
+    port = _free_port()
+    start = time.perf_counter()
+    with subprocess.Popen(
+        [sys.executable, '-m', 'app', 'serve', '--workers', '1', '--port', str(port)],
+        env={**os.environ, **(env or {})},
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    ) as process, httpx.Client(base_url=f'http://127.0.0.1:{port}') as client:
+        try:
+            while time.perf_counter() - start < timeout:
+                try:
+                    if client.get(FIRST_REQUEST).status_code == 200:
+                        return time.perf_counter() - start
+                except httpx.TransportError:
+                    pass
+                time.sleep(0.005)
+            raise TimeoutError(f'No response from the server in {timeout}s')
+        finally:
+            process.terminate()
+
+
+def run(repeat: int = 5) -> dict:
+    """Профиль импорта CLI и приложения, медиана времени до первого ответа в миллисекундах.
+
+    Время до первого ответа - с созданием схемы БД при запуске и без
+    (DATABASE_CREATE_ALL=false).
+    """
+    return {
+        'import_cli': import_profile('import app.__main__'),
+        'import_app': import_profile('from app.application import create_app; create_app()'),
+        'first_request_ms': statistics.median(
+            time_to_first_request() for _ in range(repeat)) * 1000,
+        'first_request_no_create_all_ms': statistics.median(
+            time_to_first_request({'DATABASE_CREATE_ALL': 'false'}) for _ in range(repeat)) * 1000,
+    }
@@ -1,4 +1,10 @@
 pytest_plugins = [
+    'tests.fixtures.cache',
+    'tests.fixtures.changefeed',
     'tests.fixtures.login',
-    'tests.fixtures.user'
+    'tests.fixtures.ratelimit',
+    'tests.fixtures.replicas',
+    'tests.fixtures.singleflight',
+    'tests.fixtures.user',
+    'tests.fixtures.write_behind'
 ]
@@ -0,0 +1,82 @@
+import asyncio
+from typing import Generator
+
+from pytest import fixture
+
+from app.database import cache
+
+
+def on_event_loop() -> bool:
+    """Вызов из потока с запущенным циклом событий"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+class FakePipeline:
+    """Конвейер фейкового хранилища: set выполняются в execute()"""
+    def __init__(self, client: 'FakeSharedClient'):
+        self.client = client
+        self.commands: list[tuple] = []
+
+    def set(self, name: str, value: str, ex: int | None = None):
+        """Отложить запись значения"""
+        self.commands.append((name, value, ex))
+
+    def execute(self):
+        """Выполнить отложенные записи одним обращением"""
+        self.client._call('pipeline')  # pylint: disable=protected-access
+        for name, value, _ in self.commands:
+            self.client.data[name] = value
+
+
+class FakeSharedClient:
+    """Локальная замена redis для SharedCache: обращения - в calls,
+    обращения из цикла событий - в loop_calls
+    """
+    def __init__(self):
+        self.data: dict[str, str] = {}
+        self.calls: list[str] = []
+        self.loop_calls = 0
+
+    def _call(self, name: str):
+        self.calls.append(name)
+        self.loop_calls += on_event_loop()
+
+    def get(self, name: str) -> str | None:
+        """Получить значение"""
+        self._call('get')
+        return self.data.get(name)
+
+    def mget(self, keys: list[str]) -> list[str | None]:
+        """Получить значения"""
+        self._call('mget')
+        return [self.data.get(key) for key in keys]
+
+    def set(self, name: str, value: str, ex: int | None = None):  # pylint: disable=unused-argument
+        """Сохранить значение"""
+        self._call('set')
+        self.data[name] = value
+
+    def delete(self, *names: str):
+        """Удалить значения"""
+        self._call('delete')
+        for name in names:
+            self.data.pop(name, None)
+
+    def pipeline(self, transaction: bool = True) -> FakePipeline:  # pylint: disable=unused-argument
+        """Конвейер команд"""
+        return FakePipeline(self)
+
+
+@fixture(params=['lru', 'shared'])
+def user_cache(monkeypatch, request) -> Generator[None, cache.CacheBackend, None]:
+    """Включённый кэш пользователей: LRU в памяти или общий на фейковом хранилище"""
+    if request.param == 'lru':
+        backend = cache.LRUCache(maxsize=2, ttl=60)
+    else:
+        backend = cache.SharedCache(FakeSharedClient(), ttl=60)
+    monkeypatch.setattr(cache, 'user_cache', backend)
+    yield backend
@@ -0,0 +1,53 @@
+import json
+from typing import Generator, Iterable
+
+from pytest import fixture
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.database import changefeed
+from app.database.changefeed import ChangeFeed, PostgresChangeFeed
+from app.models.user import UserModel
+
+STREAM_TTL = 0.5
+
+
+@fixture
+def change_feed(monkeypatch) -> Generator[None, ChangeFeed, None]:
+    """Отдельная лента изменений в памяти, поток событий закрывается через STREAM_TTL секунд"""
+    feed = ChangeFeed()
+    monkeypatch.setattr(changefeed, 'feed', feed)
+    monkeypatch.setattr(changefeed, 'CHANGES_STREAM_TTL', STREAM_TTL)
+    yield feed
+
+
+class NotifyRecorder(PostgresChangeFeed):
+    """Лента PostgreSQL без подключения: вместо NOTIFY запоминает операцию,
+    открыта ли транзакция записи и данные событий
+    """
+    def __init__(self):
+        super().__init__()
+        self.notified: list[tuple[str, bool, list[dict]]] = []
+
+    def _record(self, in_transaction: bool, op: str, changed: Iterable[UserModel | int]):
+        payloads = [json.loads(params['payload']) for params in self._notify_params(op, changed)]
+        self.notified.append((op, in_transaction, payloads))
+
+    def notify(self, session: Session, op: str, changed: Iterable[UserModel | int]):
+        self._record(session.in_transaction(), op, changed)
+
+    async def notify_async(
+        self, session: AsyncSession, op: str, changed: Iterable[UserModel | int]
+    ):
+        self._record(session.in_transaction(), op, changed)
+
+    async def start(self):
+        """Без LISTEN"""
+
+
+@fixture
+def notify_recorder(monkeypatch) -> Generator[None, NotifyRecorder, None]:
+    """Лента PostgreSQL, запоминающая NOTIFY записей"""
+    feed = NotifyRecorder()
+    monkeypatch.setattr(changefeed, 'feed', feed)
+    yield feed
@@ -1,13 +1,18 @@
 from pytest import fixture
 
-from app.routes.login import login_info_db
+from app.auth import hash_password, verified_sessions
+from app.database.credentials import set_password_hash
+from app.database.seed import seeded_users
 
 
 @fixture
 def any_user_credentials():
-    """Email и пароль для логина"""
-    email, password = next(iter(login_info_db.items()))
-    return {
-        'email': email,
-        'password': password
-    }
+    """Email и пароль пользователя с учётными данными в БД"""
+    password = 'cityslicka'
+    with seeded_users(1) as (user,):
+        set_password_hash(user.id, hash_password(password))
+        yield {
+            'email': user.email,
+            'password': password
+        }
+    verified_sessions.clear()
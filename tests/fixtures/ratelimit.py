@@ -0,0 +1,43 @@
+from typing import Any, Generator
+
+from pytest import fixture
+
+from app import ratelimit
+from tests.fixtures.cache import on_event_loop
+
+
+class FakeEvalClient:
+    """Замена redis для SharedRateLimit: разрешает всё, считает обращения
+    и обращения из цикла событий
+    """
+    def __init__(self):
+        self.calls = 0
+        self.loop_calls = 0
+
+    # pylint: disable-next=unused-argument
+    def eval(self, script: str, numkeys: int, *keys_and_args: Any) -> Any:
+        """Выполнить скрипт: запрос разрешён"""
+        self.calls += 1
+        self.loop_calls += on_event_loop()
+        return '0'
+
+
+@fixture
+def rate_limit(monkeypatch) -> Generator[None, ratelimit.MemoryRateLimit, None]:
+    """Ограничение частоты запросов: 3 подряд на маршрут, на логин - 2"""
+    backend = ratelimit.MemoryRateLimit()
+    monkeypatch.setattr(ratelimit, 'RATE_LIMIT_ENABLED', True)
+    monkeypatch.setattr(ratelimit, 'rate_limiter', backend)
+    monkeypatch.setattr(ratelimit, 'DEFAULT_POLICY', ratelimit.RatePolicy(rate=0.01, burst=3))
+    monkeypatch.setitem(
+        ratelimit.ROUTE_POLICIES, '/api/login', ratelimit.RatePolicy(rate=0.01, burst=2))
+    yield backend
+
+
+@fixture
+def shared_rate_limit(monkeypatch) -> Generator[None, FakeEvalClient, None]:
+    """Ограничение частоты запросов в общем хранилище на фейковом клиенте"""
+    client = FakeEvalClient()
+    monkeypatch.setattr(ratelimit, 'RATE_LIMIT_ENABLED', True)
+    monkeypatch.setattr(ratelimit, 'rate_limiter', ratelimit.SharedRateLimit(client))
+    yield client
@@ -0,0 +1,35 @@
+from typing import Generator
+
+from fastapi.testclient import TestClient
+from pytest import fixture
+from sqlalchemy import Engine
+from sqlmodel import SQLModel, create_engine
+
+from app.database import replicas
+
+
+@fixture(name='replica_engines')
+def sqlite_replica_engines(tmp_path) -> Generator[None, list[Engine], None]:
+    """Две реплики - отдельные файлы SQLite со схемой приложения"""
+    engines = [create_engine(f'sqlite:///{tmp_path}/replica{index}.db') for index in range(2)]
+    for engine in engines:
+        SQLModel.metadata.create_all(engine)
+
+    yield engines
+
+    for engine in engines:
+        engine.dispose()
+
+
+@fixture
+def replica_router(
+    monkeypatch, client: TestClient, replica_engines: list[Engine]
+) -> Generator[None, replicas.ReplicaRouter, None]:
+    """Чтение пользователей с реплик, cookie read-your-writes клиента сброшена"""
+    router = replicas.ReplicaRouter(replica_engines)
+    monkeypatch.setattr(replicas, 'router', router)
+    client.cookies.clear()
+
+    yield router
+
+    client.cookies.clear()
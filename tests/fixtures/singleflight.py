@@ -0,0 +1,30 @@
+import asyncio
+import time
+from typing import Generator
+
+from pytest import fixture
+
+from app.database import replicas, singleflight
+
+READ_DELAY = 0.2
+
+
+@fixture
+def user_queries(monkeypatch, user_statements: list[str]) -> Generator[None, list[str], None]:
+    """SQL-запросы к таблице users; чтение замедлено, чтобы одновременные запросы пересеклись"""
+    read, read_async = replicas.router.read, replicas.router.read_async
+
+    def slow_read(func, *args):
+        time.sleep(READ_DELAY)
+        return read(func, *args)
+
+    async def slow_read_async(func, *args):
+        await asyncio.sleep(READ_DELAY)
+        return await read_async(func, *args)
+
+    monkeypatch.setattr(replicas.router, 'read', slow_read)
+    monkeypatch.setattr(replicas.router, 'read_async', slow_read_async)
+    singleflight.user_reads.clear()
+    singleflight.page_reads.clear()
+
+    yield user_statements
@@ -1,25 +1,17 @@
+import json
 from ast import literal_eval
 from http import HTTPStatus
-from random import randint
 from typing import Generator
 
 from fastapi import Response
 from fastapi.testclient import TestClient
-from mimesis import Locale, Person
 from pytest import fixture
+from sqlalchemy import event
 
-from app.models.user import UserCreateModel, UserModel
-
-
-def generate_user() -> UserCreateModel:
-    """Сгенерировать заполненную модель позльзователя"""
-    person = Person(Locale.EN)
-    return UserCreateModel(
-        email=person.email(),
-        first_name=person.name(),
-        last_name=person.surname(),
-        avatar=f'https://reqres.in/img/faces/{randint}-image.jpg'
-    )
+from app.__main__ import app
+from app.database import _engine
+from app.database.seed import generate_user, seeded_users
+from app.models.user import UserModel
 
 
 def create_user_by_model(client: TestClient, user: UserModel) -> UserModel:
@@ -59,17 +51,10 @@ def user_data_for_create() -> dict:
 
 
 @fixture(scope='module', params=[150])
-def fill_users(client: TestClient, request) -> Generator[None, list[UserModel], None]:
+def fill_users(request) -> Generator[None, list[UserModel], None]:
     """Заполение БД пользователями"""
-    users_to_create = [generate_user() for _ in range(request.param)]
-    api_users: list[UserModel] = []
-    for user in users_to_create:
-        api_users.append(create_user_by_model(client=client, user=user))
-
-    yield api_users
-
-    for user in api_users:
-        client.delete(url=f'/api/users/{user.id}')
+    with seeded_users(request.param, seed=request.param) as users:
+        yield users
 
 
 @fixture
@@ -80,3 +65,44 @@ def create_user(client: TestClient) -> Generator[None, UserModel, None]:
     yield user_created
 
     client.delete(url=f'/api/users/{user_created.id}')
+
+
+@fixture
+def user_statements() -> Generator[None, list[str], None]:
+    """SQL-запросы к таблице users, выполненные sync- и async-движком"""
+    statements = []
+
+    def record(_connection, _cursor, statement: str, *_):
+        if 'FROM users' in statement:
+            statements.append(statement)
+
+    engines = [_engine.engine, _engine.get_async_engine().sync_engine]
+    for engine in engines:
+        event.listen(engine, 'before_cursor_execute', record)
+
+    yield statements
+
+    for engine in engines:
+        event.remove(engine, 'before_cursor_execute', record)
+
+
+@fixture
+def async_client(monkeypatch) -> Generator[None, TestClient, None]:
+    """Тестовый клиент с асинхронным движком БД (DATABASE_ASYNC)"""
+    monkeypatch.setattr(_engine, 'DATABASE_ASYNC', True)
+    with TestClient(app) as async_test_client:
+        yield async_test_client
+
+
+@fixture
+def users_for_import(client: TestClient):
+    """Данные пользователей для импорта, импортированные пользователи удаляются"""
+    rows = [json.loads(generate_user().model_dump_json()) for _ in range(10)]
+
+    yield rows
+
+    for row in rows:
+        response = client.get(
+            url='/api/users/export', params={'email': row['email'], 'fields': 'id'})
+        ids = [json.loads(line)['id'] for line in response.iter_lines()]
+        client.request('DELETE', url='/api/users/bulk', json=ids)
@@ -0,0 +1,27 @@
+from typing import Generator
+
+from pytest import fixture
+
+from app.database import users, write_behind
+from app.database.write_behind import WriteBehindQueue
+
+FLUSH_MS = 100
+
+
+@fixture
+def user_creates(monkeypatch) -> Generator[None, WriteBehindQueue, None]:
+    """Очередь отложенной записи (сбор пачки FLUSH_MS), созданные ею пользователи удаляются"""
+    created_ids = []
+
+    async def flush(new_users: list[dict]) -> list:
+        results = await write_behind.create_users_batch(new_users)
+        created_ids.extend(user.id for user in results if not isinstance(user, Exception))
+        return results
+
+    queue = WriteBehindQueue(flush, flush_ms=FLUSH_MS)
+    monkeypatch.setattr(write_behind, 'WRITE_BEHIND_ENABLED', True)
+    monkeypatch.setattr(write_behind, 'user_creates', queue)
+
+    yield queue
+
+    users.delete_users(created_ids)
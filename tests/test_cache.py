@@ -0,0 +1,84 @@
+from ast import literal_eval
+from http import HTTPStatus
+
+from fastapi import Response
+from fastapi.testclient import TestClient
+from pytest import mark
+
+from app.database.cache import CacheBackend, LRUCache
+from app.database.seed import generate_user
+from app.models.status import CacheStatsSchema
+from app.models.user import UserModel
+
+
+class TestUserCache:
+    """Кэш пользователей для GET /api/users/{user_id}"""
+    def test_get_user_from_cache(
+        self, client: TestClient, user_cache: CacheBackend, create_user: UserModel
+    ):
+        """Повторный запрос пользователя обслуживается из кэша
+
+        1. Дважды запросить пользователя по id.
+        2. Проверить: ответы совпадают, оба запроса попали в кэш.
+        3. Проверить: счётчики доступны в /status/cache.
+        """
+        responses = [client.get(url=f'/api/users/{create_user.id}') for _ in range(2)]
+
+        assert all(r.status_code == HTTPStatus.OK for r in responses)
+        assert responses[0].json() == responses[1].json()
+        assert user_cache.hits == 2
+        assert user_cache.misses == 0
+        response: Response = client.get(url='/status/cache')
+        assert response.status_code == HTTPStatus.OK
+        stats = CacheStatsSchema.model_validate(response.json())
+        assert stats.hits == 2
+
+    def test_patch_refreshes_cache(
+        self, client: TestClient, user_cache: CacheBackend, create_user: UserModel
+    ):
+        """Изменение пользователя обновляет запись в кэше
+
+        1. Запросить пользователя, изменить его и запросить снова.
+        2. Проверить: возвращено изменённое значение.
+        """
+        client.get(url=f'/api/users/{create_user.id}')
+        client.patch(url=f'/api/users/{create_user.id}', json={'last_name': 'Cached_last_name'})
+
+        response: Response = client.get(url=f'/api/users/{create_user.id}')
+
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['last_name'] == 'Cached_last_name'
+        assert user_cache.misses == 0
+
+    def test_delete_invalidates_cache(
+        self, client: TestClient, user_cache: CacheBackend, create_user: UserModel
+    ):
+        """Удаление пользователя удаляет запись из кэша
+
+        1. Запросить пользователя, удалить его и запросить снова.
+        2. Проверить: код ответа NOT_FOUND.
+        """
+        client.get(url=f'/api/users/{create_user.id}')
+        client.delete(url=f'/api/users/{create_user.id}')
+
+        response: Response = client.get(url=f'/api/users/{create_user.id}')
+
+        assert response.status_code == HTTPStatus.NOT_FOUND
+        assert user_cache.misses == 1
+
+    @mark.parametrize('user_cache', ['lru'], indirect=True)
+    def test_lru_eviction(self, client: TestClient, user_cache: LRUCache):
+        """Кэш не превышает максимальный размер
+
+        1. Создать пользователей больше, чем вмещает кэш.
+        2. Проверить: размер кэша ограничен, вытеснения посчитаны.
+        """
+        created = [
+            client.post(url='/api/users', json=literal_eval(generate_user().model_dump_json()))
+            for _ in range(user_cache.maxsize + 1)
+        ]
+        for response in created:
+            client.delete(url=f'/api/users/{response.json()['id']}')
+
+        assert user_cache.evictions == 1
+        assert user_cache.stats()['size'] == 0
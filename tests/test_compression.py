@@ -0,0 +1,92 @@
+from http import HTTPStatus
+
+from fastapi.testclient import TestClient
+from pytest import importorskip, mark
+
+from app.middleware import compression
+
+
+class TestCompression:
+    """Сжатие ответов по Accept-Encoding"""
+    @mark.usefixtures('fill_users')
+    def test_gzip_large_response(self, client: TestClient):
+        """Ответ больше порога сжимается gzip
+
+        1. Запросить страницу из 50 пользователей с Accept-Encoding: gzip.
+        2. Проверить: Content-Encoding gzip, Vary, тело распаковывается в ту же страницу.
+        """
+        expected = client.get(
+            url='/api/users', params={'size': 50}, headers={'Accept-Encoding': 'identity'})
+
+        response = client.get(
+            url='/api/users', params={'size': 50}, headers={'Accept-Encoding': 'gzip'})
+
+        assert response.status_code == HTTPStatus.OK
+        assert response.headers['content-encoding'] == 'gzip'
+        assert 'Accept-Encoding' in response.headers['vary']
+        assert int(response.headers['content-length']) < len(expected.content)
+        assert response.json() == expected.json()
+        assert 'content-encoding' not in expected.headers
+
+    def test_small_response_not_compressed(self, client: TestClient):
+        """Ответ меньше порога не сжимается
+
+        1. Запросить статус приложения с Accept-Encoding: gzip.
+        2. Проверить: Content-Encoding не задан.
+        """
+        response = client.get(url='/status', headers={'Accept-Encoding': 'gzip'})
+
+        assert response.status_code == HTTPStatus.OK
+        assert len(response.content) < compression.COMPRESSION_MIN_SIZE
+        assert 'content-encoding' not in response.headers
+
+    @mark.usefixtures('fill_users')
+    def test_compression_disabled(self, client: TestClient, monkeypatch):
+        """Сжатие отключается COMPRESSION_ENABLED
+
+        1. Отключить сжатие и запросить страницу с Accept-Encoding: gzip.
+        2. Проверить: Content-Encoding не задан.
+        """
+        monkeypatch.setattr(compression, 'COMPRESSION_ENABLED', False)
+
+        response = client.get(
+            url='/api/users', params={'size': 50}, headers={'Accept-Encoding': 'gzip'})
+
+        assert 'content-encoding' not in response.headers
+
+    @mark.usefixtures('fill_users')
+    def test_brotli(self, client: TestClient, monkeypatch):
+        """Ответ сжимается brotli, если клиент его предпочитает
+
+        1. Запросить страницу с Accept-Encoding: gzip;q=0.5, br.
+        2. Проверить: Content-Encoding br, тело распаковывается в ту же страницу.
+        """
+        importorskip('brotli')
+        monkeypatch.setattr(compression, 'BROTLI_AVAILABLE', True)
+        expected = client.get(
+            url='/api/users', params={'size': 50}, headers={'Accept-Encoding': 'identity'})
+
+        response = client.get(
+            url='/api/users', params={'size': 50}, headers={'Accept-Encoding': 'gzip;q=0.5, br'})
+
+        assert response.headers['content-encoding'] == 'br'
+        assert response.json() == expected.json()
+
+    @mark.parametrize(('header', 'brotli', 'expected'), [
+        ('gzip, deflate, br', True, 'br'),
+        ('gzip, deflate, br', False, 'gzip'),
+        ('br;q=0.5, gzip', True, 'gzip'),
+        ('gzip;q=0, *', False, 'identity'),
+        ('*;q=0.1', True, 'br'),
+        ('deflate', True, 'identity'),
+        ('', True, 'identity'),
+    ])
+    def test_negotiate_encoding(self, monkeypatch, header: str, brotli: bool, expected: str):
+        """Выбор кодировки по весам q Accept-Encoding
+
+        1. Разобрать заголовок Accept-Encoding с доступным или недоступным brotli.
+        2. Проверить выбранную кодировку.
+        """
+        monkeypatch.setattr(compression, 'BROTLI_AVAILABLE', brotli)
+
+        assert compression.negotiate_encoding(header) == expected
@@ -1,8 +1,16 @@
+import time
 from http import HTTPStatus
 
 from fastapi import Response
 from fastapi.testclient import TestClient
 from pytest import mark
+from sqlmodel import Session
+
+from app import auth
+from app.database import _engine
+from app.database.credentials import get_credential, get_user_id
+from app.database.users import delete_users
+from app.models.login import CredentialModel
 
 
 class TestLogin:
@@ -45,3 +53,104 @@ class TestLogin:
         )
 
         assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+    def test_login_token_signed(self, client: TestClient, any_user_credentials):
+        """Токен логина подписан и проверяется без БД
+
+        1. Запросить логин пользователя.
+        2. Проверить: из токена извлекается id пользователя.
+        3. Проверить: изменённый и просроченный токены не проходят проверку.
+        """
+        response: Response = client.post(url='/api/login', json=any_user_credentials)
+
+        token = response.json()['token']
+        user_id = get_user_id(any_user_credentials['email'])
+        assert auth.verify_token(token) == user_id
+        assert auth.verify_token(token.replace(f'{user_id}.', f'{user_id + 1}.', 1)) is None
+        assert auth.verify_token(token, now=time.time() + auth.TOKEN_TTL + 1) is None
+
+    def test_login_unauthorized(self, client: TestClient, any_user_credentials):
+        """Логин с неверным паролем
+
+        1. Запросить логин с неверным паролем.
+        2. Проверить: код ответа UNAUTHORIZED.
+        """
+        response: Response = client.post(
+            url='/api/login', json={**any_user_credentials, 'password': 'wrong'})
+
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+    def test_login_not_found(self, client: TestClient):
+        """Логин несуществующего пользователя
+
+        1. Запросить логин с email, которого нет в БД.
+        2. Проверить: код ответа NOT_FOUND.
+        """
+        response: Response = client.post(
+            url='/api/login', json={'email': 'nobody@example.com', 'password': 'cityslicka'})
+
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_login_verified_session(self, client: TestClient, any_user_credentials, monkeypatch):
+        """Повторный логин не вычисляет KDF
+
+        1. Выполнить логин дважды, считая вызовы проверки пароля.
+        2. Проверить: хэш вычислялся один раз, оба логина успешны.
+        """
+        calls = []
+        original = auth.verify_password
+
+        def verify_password(password: str, password_hash: str) -> bool:
+            calls.append(password)
+            return original(password, password_hash)
+
+        monkeypatch.setattr(auth, 'verify_password', verify_password)
+
+        responses = [client.post(url='/api/login', json=any_user_credentials) for _ in range(2)]
+
+        assert [r.status_code for r in responses] == [HTTPStatus.OK, HTTPStatus.OK]
+        assert len(calls) == 1
+
+    def test_login_rehash(self, client: TestClient, any_user_credentials, monkeypatch):
+        """Пароль перехэшируется при смене параметров KDF
+
+        1. Изменить параметр KDF и выполнить логин.
+        2. Проверить: хэш в БД получен с новыми параметрами и пароль подходит.
+        """
+        monkeypatch.setattr(auth, 'KDF_N', auth.KDF_N // 2)
+
+        response: Response = client.post(url='/api/login', json=any_user_credentials)
+
+        assert response.status_code == HTTPStatus.OK
+        credential = get_credential(any_user_credentials['email'])
+        assert not auth.needs_rehash(credential.password_hash)
+        assert auth.verify_password(any_user_credentials['password'], credential.password_hash)
+
+
+class TestCredentials:
+    """Хранение учётных данных"""
+    def test_password_hash(self):
+        """Хэш пароля с солью и параметрами KDF
+
+        1. Захэшировать пароль дважды.
+        2. Проверить: хэши различаются, оба подходят только к исходному паролю.
+        """
+        hashes = [auth.hash_password('secret') for _ in range(2)]
+
+        assert hashes[0] != hashes[1]
+        assert all(auth.verify_password('secret', password_hash) for password_hash in hashes)
+        assert not auth.verify_password('Secret', hashes[0])
+        assert not auth.verify_password('secret', 'plain')
+
+    def test_credentials_deleted_with_user(self, any_user_credentials):
+        """Учётные данные удаляются вместе с пользователем
+
+        1. Удалить пользователя с учётными данными.
+        2. Проверить: учётных данных нет в БД.
+        """
+        user_id = get_user_id(any_user_credentials['email'])
+
+        delete_users([user_id])
+
+        with Session(_engine.engine) as session:
+            assert session.get(CredentialModel, user_id) is None
@@ -0,0 +1,67 @@
+import logging
+from http import HTTPStatus
+
+from fastapi import Response
+from fastapi.testclient import TestClient
+from pytest import fixture, mark
+
+from app import metrics
+from app.database import query_metrics
+from app.models.user import UserModel
+
+
+@fixture
+def metrics_enabled(monkeypatch):
+    """Включённые метрики (METRICS_ENABLED)"""
+    monkeypatch.setattr(metrics, 'METRICS_ENABLED', True)
+
+
+class TestMetrics:
+    """Метрики в формате Prometheus GET /metrics"""
+    @mark.usefixtures('metrics_enabled')
+    def test_metrics(self, client: TestClient, create_user: UserModel):
+        """Метрики учитывают запросы по шаблону маршрута и SQL-запросы
+
+        1. Запросить пользователя по id.
+        2. Запросить метрики.
+        3. Проверить: запрос учтён по шаблону маршрута, SELECT учтён в метриках БД.
+        """
+        client.get(url=f'/api/users/{create_user.id}')
+
+        response: Response = client.get(url='/metrics')
+
+        assert response.status_code == HTTPStatus.OK
+        assert response.headers['content-type'].startswith('text/plain')
+        body = response.text
+        assert 'http_requests_total{method="GET",route="/api/users/{user_id}",status="200"}' in body
+        assert (
+            'http_request_duration_seconds_bucket'
+            '{method="GET",route="/api/users/{user_id}",le="+Inf"}'
+        ) in body
+        assert 'db_statement_duration_seconds_count{operation="SELECT"}' in body
+        assert 'db_pool_checked_out{engine="sync"}' in body
+
+    @mark.usefixtures('metrics_enabled')
+    def test_slow_query_log(self, client: TestClient, monkeypatch, caplog):
+        """Запросы дольше порога попадают в журнал медленных запросов
+
+        1. Установить нулевой порог медленного запроса.
+        2. Выполнить запрос к БД.
+        3. Проверить: запрос записан в журнал.
+        """
+        monkeypatch.setattr(query_metrics, 'SLOW_QUERY_THRESHOLD_MS', 0)
+
+        with caplog.at_level(logging.WARNING):
+            client.get(url='/api/users')
+
+        assert any(record.getMessage().startswith('Slow query') for record in caplog.records)
+
+    def test_metrics_disabled(self, client: TestClient):
+        """Выключенные метрики недоступны
+
+        1. Запросить метрики без METRICS_ENABLED.
+        2. Проверить: код ответа NOT_FOUND.
+        """
+        response: Response = client.get(url='/metrics')
+
+        assert response.status_code == HTTPStatus.NOT_FOUND
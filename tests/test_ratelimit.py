@@ -0,0 +1,96 @@
+from http import HTTPStatus
+
+from fastapi.testclient import TestClient
+
+from app.ratelimit import MemoryRateLimit, RatePolicy
+from tests.fixtures.ratelimit import FakeEvalClient
+
+
+class TestRateLimit:
+    """Ограничение частоты запросов"""
+    def test_route_limit(self, client: TestClient, rate_limit: MemoryRateLimit):
+        """Запросы сверх ограничения маршрута получают 429 с Retry-After
+
+        1. Запросить разных пользователей по id больше, чем разрешено подряд.
+        2. Проверить: лишний запрос отклонён с кодом TOO_MANY_REQUESTS и Retry-After.
+        3. Проверить: другой маршрут не ограничен.
+        """
+        responses = [client.get(url=f'/api/users/{user_id}') for user_id in range(1, 5)]
+
+        assert all(r.status_code != HTTPStatus.TOO_MANY_REQUESTS for r in responses[:3])
+        assert responses[3].status_code == HTTPStatus.TOO_MANY_REQUESTS
+        assert int(responses[3].headers['retry-after']) >= 1
+        assert client.get(url='/status/live').status_code == HTTPStatus.OK
+        assert len(rate_limit) == 2
+
+    def test_login_limit(self, client: TestClient, rate_limit: MemoryRateLimit,
+                         any_user_credentials: dict):
+        """Для логина действует более строгое ограничение
+
+        1. Выполнить логин трижды.
+        2. Проверить: третий запрос отклонён, хотя общее ограничение - 3 запроса.
+        """
+        responses = [
+            client.post(url='/api/login', json=any_user_credentials) for _ in range(3)]
+
+        assert [r.status_code for r in responses] == [
+            HTTPStatus.OK, HTTPStatus.OK, HTTPStatus.TOO_MANY_REQUESTS]
+        assert rate_limit
+
+    def test_token_bucket_refill(self):
+        """Корзина пополняется со скоростью rate и независима для разных ключей
+
+        1. Исчерпать корзину ключа.
+        2. Проверить: следующий запрос ждёт 1/rate, другой ключ не ограничен.
+        3. Проверить: через 1/rate запрос разрешён.
+        """
+        limiter = MemoryRateLimit()
+        policy = RatePolicy(rate=2, burst=2)
+
+        assert [limiter.acquire('a', policy, now=0) for _ in range(2)] == [0, 0]
+        assert limiter.acquire('a', policy, now=0) == 0.5
+        assert limiter.acquire('b', policy, now=0) == 0
+        assert limiter.acquire('a', policy, now=0.5) == 0
+
+    def test_memory_bounded(self):
+        """Количество хранимых ключей не превышает maxsize
+
+        1. Запросить с большего числа ключей, чем maxsize.
+        2. Проверить: хранится не больше maxsize ключей.
+        """
+        limiter = MemoryRateLimit(maxsize=100)
+        policy = RatePolicy(rate=1, burst=5)
+
+        for key in range(1000):
+            limiter.acquire(str(key), policy, now=0)
+
+        assert len(limiter) <= 100
+
+    def test_memory_evicts_oldest(self):
+        """При переполнении удаляется ключ, который дольше всех не обновлялся
+
+        1. Заполнить хранилище до maxsize и обновить первый ключ.
+        2. Запросить с нового ключа.
+        3. Проверить: удалён второй ключ, корзина первого сохранилась.
+        """
+        limiter = MemoryRateLimit(maxsize=3)
+        policy = RatePolicy(rate=1, burst=1)
+
+        for key in 'abc':
+            limiter.acquire(key, policy, now=0)
+        limiter.acquire('a', policy, now=1)
+        limiter.acquire('d', policy, now=1)
+
+        assert len(limiter) == 3
+        assert limiter.acquire('a', policy, now=1) == 1
+        assert limiter.acquire('b', policy, now=1) == 0
+
+    def test_shared_off_event_loop(self, client: TestClient, shared_rate_limit: FakeEvalClient):
+        """Общее хранилище вызывается из пула потоков, а не из цикла событий
+
+        1. Выполнить запрос с включённым ограничением в общем хранилище.
+        2. Проверить: скрипт выполнен, но не в цикле событий.
+        """
+        assert client.get(url='/status/live').status_code == HTTPStatus.OK
+        assert shared_rate_limit.calls == 1
+        assert shared_rate_limit.loop_calls == 0
@@ -0,0 +1,99 @@
+from http import HTTPStatus
+
+from fastapi import Response
+from fastapi.testclient import TestClient
+from pytest import mark
+from sqlalchemy import Engine
+from sqlmodel import Session, create_engine
+
+from app.database.replicas import ReplicaRouter
+from app.database.seed import generate_user
+from app.models.user import UserModel
+
+REPLICA_USER_ID = 10 ** 9
+
+
+class TestReplicaRouting:
+    """Чтение пользователей с реплик"""
+    @mark.usefixtures('replica_router')
+    def test_reads_round_robin(self, client: TestClient, replica_engines: list[Engine]):
+        """Чтения распределяются между репликами по кругу
+
+        1. Добавить на каждую реплику пользователя с одним id и разными именами.
+        2. Дважды запросить пользователя.
+        3. Проверить: ответы пришли с обеих реплик.
+        """
+        for index, engine in enumerate(replica_engines):
+            with Session(engine) as session:
+                user = UserModel(
+                    id=REPLICA_USER_ID, **generate_user().model_dump(mode='json'))
+                user.first_name = f'replica{index}'
+                session.add(user)
+                session.commit()
+
+        responses = [client.get(url=f'/api/users/{REPLICA_USER_ID}') for _ in range(2)]
+
+        assert all(response.status_code == HTTPStatus.OK for response in responses)
+        assert {response.json()['first_name'] for response in responses} == {
+            'replica0', 'replica1'}
+
+    @mark.usefixtures('replica_router')
+    def test_read_your_writes(self, client: TestClient, user_data_for_create: dict):
+        """После записи клиент читает с основной БД
+
+        1. Создать пользователя (запись идёт в основную БД).
+        2. Проверить: пользователь сразу доступен этому клиенту.
+        3. Сбросить cookie клиента.
+        4. Проверить: чтение идёт с реплики, где пользователя нет.
+        """
+        response: Response = client.post(url='/api/users', json=user_data_for_create)
+        assert response.status_code == HTTPStatus.CREATED
+        user_id = response.json()['id']
+        assert 'db-primary' in client.cookies
+        try:
+            assert client.get(url=f'/api/users/{user_id}').status_code == HTTPStatus.OK
+
+            client.cookies.clear()
+
+            response = client.get(url=f'/api/users/{user_id}')
+            assert response.status_code == HTTPStatus.NOT_FOUND
+        finally:
+            client.delete(url=f'/api/users/{user_id}')
+
+    @mark.usefixtures('replica_router')
+    def test_batch_get_reads_replica(self, client: TestClient, replica_engines: list[Engine]):
+        """POST batch-get только читает: идёт на реплику и не ставит cookie
+
+        1. Добавить на реплики пользователя, которого нет в основной БД.
+        2. Запросить его через POST /api/users/batch-get.
+        3. Проверить: пользователь найден на реплике, cookie db-primary не выставлена.
+        """
+        for engine in replica_engines:
+            with Session(engine) as session:
+                session.add(UserModel(
+                    id=REPLICA_USER_ID, **generate_user().model_dump(mode='json')))
+                session.commit()
+
+        response: Response = client.post(url='/api/users/batch-get', json=[REPLICA_USER_ID])
+
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['items'][0]['ok']
+        assert 'set-cookie' not in response.headers
+        assert 'db-primary' not in client.cookies
+
+    def test_replica_failure(self, client: TestClient, monkeypatch, create_user: UserModel):
+        """Недоступная реплика исключается, чтение выполняется на основной БД
+
+        1. Подключить реплику с недоступной БД.
+        2. Запросить пользователя.
+        3. Проверить: пользователь получен с основной БД, реплика исключена.
+        """
+        router = ReplicaRouter([create_engine('sqlite:////nonexistent/replica.db')])
+        monkeypatch.setattr('app.database.replicas.router', router)
+        client.cookies.clear()
+
+        response: Response = client.get(url=f'/api/users/{create_user.id}')
+
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['email'] == create_user.email
+        assert not router.replicas[0].available()
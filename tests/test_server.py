@@ -0,0 +1,191 @@
+import os
+import subprocess
+import sys
+
+from fastapi.testclient import TestClient
+from pytest import mark, raises
+
+from app.__main__ import app
+from app.application import create_app
+from app.database import _engine
+from app.server import (
+    PoolSize, check_workers_state, configure_pools, share_token_secret, worker_pool_size)
+
+
+class TestServer:
+    """Запуск в нескольких процессах"""
+    @mark.parametrize(
+        'workers, engines, expected',
+        [
+            (1, 1, PoolSize(10, 10)),
+            (4, 1, PoolSize(10, 10)),
+            (8, 1, PoolSize(10, 1)),
+            (16, 1, PoolSize(5, 0)),
+            (16, 2, PoolSize(2, 0)),
+        ]
+    )
+    def test_worker_pool_size(self, workers: int, engines: int, expected: PoolSize):
+        """Пул воркера уменьшается, чтобы все воркеры уместились в max_connections
+
+        1. Рассчитать пул для числа воркеров и движков при max_connections=100.
+        2. Проверить: размер пула соответствует ожидаемому и сумма не превышает 90.
+        """
+        size = worker_pool_size(
+            workers, 100, pool_size=10, max_overflow=10, engines=engines, reserved=10)
+
+        assert size == expected
+        assert workers * engines * (size.pool_size + size.max_overflow) <= 90
+
+    def test_too_many_workers(self):
+        """Воркеры, которым не хватает соединений, не запускаются
+
+        1. Рассчитать пул для числа воркеров больше доступных соединений.
+        2. Проверить: ошибка ValueError.
+        """
+        with raises(ValueError):
+            worker_pool_size(100, 100, pool_size=10, max_overflow=10, reserved=10)
+
+    def test_configure_pools(self, monkeypatch):
+        """Размер пула передаётся воркерам через окружение
+
+        1. Задать DATABASE_MAX_CONNECTIONS и настроить пулы для 16 воркеров.
+        2. Проверить: DATABASE_POOL_SIZE и DATABASE_MAX_OVERFLOW уменьшены.
+        """
+        monkeypatch.setenv('DATABASE_MAX_CONNECTIONS', '100')
+        monkeypatch.setenv('DATABASE_POOL_SIZE', '10')
+        monkeypatch.setenv('DATABASE_MAX_OVERFLOW', '10')
+        monkeypatch.delenv('DATABASE_ASYNC', raising=False)
+        monkeypatch.delenv('USERS_CHANGES_BACKEND', raising=False)
+
+        size = configure_pools(16)
+
+        assert size == PoolSize(5, 0)
+        assert os.environ['DATABASE_POOL_SIZE'] == '5'
+        assert os.environ['DATABASE_MAX_OVERFLOW'] == '0'
+
+    def test_configure_pools_change_feed(self, monkeypatch):
+        """Async-движок ленты изменений postgres учитывается без DATABASE_ASYNC
+
+        1. Задать USERS_CHANGES_BACKEND=postgres и настроить пулы для 16 воркеров.
+        2. Проверить: пул рассчитан на два движка в воркере.
+        """
+        monkeypatch.setenv('DATABASE_MAX_CONNECTIONS', '100')
+        monkeypatch.setenv('DATABASE_POOL_SIZE', '10')
+        monkeypatch.setenv('DATABASE_MAX_OVERFLOW', '10')
+        monkeypatch.delenv('DATABASE_ASYNC', raising=False)
+        monkeypatch.setenv('USERS_CHANGES_BACKEND', 'postgres')
+
+        assert configure_pools(16) == PoolSize(2, 0)
+        assert os.environ['DATABASE_POOL_SIZE'] == '2'
+
+    def test_lru_cache_warning(self, monkeypatch, caplog):
+        """Кэш в памяти процесса при нескольких воркерах - предупреждение
+
+        1. Задать USERS_CACHE=lru и проверить настройки для 1 и 4 воркеров.
+        2. Проверить: предупреждение только для 4 воркеров.
+        """
+        monkeypatch.setenv('USERS_CACHE', 'lru')
+
+        check_workers_state(1)
+        assert not caplog.records
+        check_workers_state(4)
+
+        assert 'USERS_CACHE=lru' in caplog.text
+
+    def test_change_feed_warning(self, monkeypatch, caplog):
+        """Лента изменений в памяти процесса при нескольких воркерах - предупреждение
+
+        1. Проверить настройки для 4 воркеров с USERS_CHANGES_BACKEND memory и postgres.
+        2. Проверить: предупреждение только для memory.
+        """
+        monkeypatch.setenv('USERS_CHANGES_BACKEND', 'postgres')
+        check_workers_state(4)
+        assert 'USERS_CHANGES_BACKEND' not in caplog.text
+
+        monkeypatch.setenv('USERS_CHANGES_BACKEND', 'memory')
+        check_workers_state(4)
+
+        assert 'USERS_CHANGES_BACKEND=memory' in caplog.text
+
+    def test_share_token_secret(self, monkeypatch):
+        """Без LOGIN_TOKEN_SECRET воркеры получают общий ключ через окружение
+
+        1. Удалить LOGIN_TOKEN_SECRET и подготовить запуск 1 и 4 воркеров.
+        2. Проверить: для одного воркера ключ не задаётся, для четырёх - задаётся.
+        3. Подготовить запуск ещё раз.
+        4. Проверить: заданный ключ не меняется.
+        """
+        monkeypatch.delenv('LOGIN_TOKEN_SECRET', raising=False)
+
+        assert not share_token_secret(1)
+        assert 'LOGIN_TOKEN_SECRET' not in os.environ
+        assert share_token_secret(4)
+        secret = os.environ['LOGIN_TOKEN_SECRET']
+
+        assert not share_token_secret(4)
+        assert os.environ['LOGIN_TOKEN_SECRET'] == secret
+
+    def test_shutdown_disposes_engine(self, monkeypatch):
+        """Остановка приложения закрывает соединения с БД
+
+        1. Запустить и остановить приложение.
+        2. Проверить: пул соединений основного движка закрыт.
+        """
+        disposed = []
+        monkeypatch.setattr(_engine.engine, 'dispose', lambda: disposed.append(True))
+
+        with TestClient(app):
+            assert not disposed
+
+        assert disposed == [True]
+
+
+class TestStartup:
+    """Быстрый запуск: отложенные импорты и создание движков"""
+    def test_lazy_imports(self):
+        """Импорт CLI и модуля БД не импортирует FastAPI и не создаёт движок
+
+        1. В отдельном процессе импортировать app.__main__ и app.database._engine.
+        2. Проверить: FastAPI и маршруты не импортированы, основной движок не создан.
+        3. Обратиться к _engine.engine - движок создан.
+        """
+        code = (
+            'import sys, app.__main__, app.database._engine as e\n'
+            'print("fastapi" in sys.modules, "app.routes.user" in sys.modules, '
+            'e._sync_engine is None, e.engine is e.get_engine())'
+        )
+
+        result = subprocess.run(
+            [sys.executable, '-c', code], capture_output=True, text=True, check=True)
+
+        assert result.stdout.split() == ['False', 'False', 'True', 'True']
+
+    def test_create_app(self):
+        """Фабрика создаёт новое приложение с маршрутами
+
+        1. Создать приложение фабрикой и выполнить запрос статуса.
+        2. Проверить: ответ 200, приложение не совпадает с app.__main__.app.
+        """
+        factory_app = create_app()
+
+        with TestClient(factory_app) as factory_client:
+            response = factory_client.get('/status')
+
+        assert response.status_code == 200
+        assert factory_app is not app
+
+    def test_skip_create_all(self, monkeypatch):
+        """Без DATABASE_CREATE_ALL db_init не меняет схему БД
+
+        1. Отключить DATABASE_CREATE_ALL и вызвать db_init.
+        2. Проверить: create_all, create_columns и create_indexes не вызывались.
+        """
+        calls = []
+        monkeypatch.setattr(_engine, 'DATABASE_CREATE_ALL', False)
+        monkeypatch.setattr(_engine.SQLModel.metadata, 'create_all', calls.append)
+        monkeypatch.setattr(_engine, 'create_columns', lambda: calls.append('columns'))
+        monkeypatch.setattr(_engine, 'create_indexes', lambda: calls.append('indexes'))
+
+        _engine.db_init()
+
+        assert not calls
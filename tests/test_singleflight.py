@@ -0,0 +1,123 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+from fastapi.testclient import TestClient
+from pytest import mark, raises
+
+from app import metrics
+from app.database import _engine, singleflight
+from app.models.user import UserModel
+from tests.fixtures.singleflight import READ_DELAY
+
+BURST = 20
+
+
+def burst(client: TestClient, url: str, **params) -> list:
+    """BURST одновременных одинаковых GET-запросов.
+
+    Клиент без контекста запускает каждый запрос в своём цикле событий,
+    поэтому async-объединение проверяется только через async_client.
+    """
+    with ThreadPoolExecutor(BURST) as executor:
+        return list(executor.map(lambda _: client.get(url=url, params=params), range(BURST)))
+
+
+class TestSingleFlight:
+    """Объединение одинаковых одновременных чтений"""
+    def test_get_user_burst(
+        self, client: TestClient, create_user: UserModel, user_queries: list[str], monkeypatch
+    ):
+        """Одновременные запросы пользователя выполняют один запрос к БД
+
+        1. Одновременно запросить одного пользователя BURST раз.
+        2. Проверить: все ответы успешны и совпадают.
+        3. Проверить: к БД выполнен один запрос, остальные объединены с ним.
+        """
+        monkeypatch.setattr(_engine, 'DATABASE_ASYNC', False)
+        coalesced = metrics.DB_COALESCED_REQUESTS.labels('get_user').value
+
+        responses = burst(client, f'/api/users/{create_user.id}')
+
+        assert all(r.status_code == HTTPStatus.OK for r in responses)
+        assert all(r.json() == responses[0].json() for r in responses)
+        assert len(user_queries) == 1
+        assert singleflight.user_reads.stats() == {'queries': 1, 'coalesced': BURST - 1}
+        assert metrics.DB_COALESCED_REQUESTS.labels('get_user').value == coalesced + BURST - 1
+
+    def test_get_user_burst_async(
+        self, async_client: TestClient, create_user: UserModel, user_queries: list[str]
+    ):
+        """Объединение чтений с асинхронным движком БД
+
+        1. Одновременно запросить одного пользователя BURST раз (DATABASE_ASYNC).
+        2. Проверить: к БД выполнен один запрос.
+        """
+        responses = burst(async_client, f'/api/users/{create_user.id}')
+
+        assert all(r.status_code == HTTPStatus.OK for r in responses)
+        assert len(user_queries) == 1
+        assert singleflight.user_reads.stats() == {'queries': 1, 'coalesced': BURST - 1}
+
+    def test_users_page_burst(
+        self, client: TestClient, create_user: UserModel, user_queries: list[str], monkeypatch
+    ):
+        """Одновременные запросы первой страницы выполняют один COUNT и один SELECT
+
+        1. Одновременно запросить первую страницу пользователей BURST раз.
+        2. Проверить: все ответы совпадают, к БД выполнено два запроса.
+        """
+        monkeypatch.setattr(_engine, 'DATABASE_ASYNC', False)
+        responses = burst(client, '/api/users', page=1, size=50)
+
+        assert all(r.status_code == HTTPStatus.OK for r in responses)
+        assert all(r.json() == responses[0].json() for r in responses)
+        assert any(item['id'] == create_user.id for item in responses[0].json()['items'])
+        assert len(user_queries) == 2
+        assert singleflight.page_reads.stats() == {'queries': 1, 'coalesced': BURST - 1}
+
+    @mark.usefixtures('user_queries')
+    def test_read_after_write_not_coalesced(self, client: TestClient, create_user: UserModel):
+        """Чтение после изменения не присоединяется к чтению, начатому до него
+
+        1. Начать запрос пользователя и во время него изменить пользователя.
+        2. Запросить пользователя, пока первый запрос не завершён.
+        3. Проверить: второй запрос выполнен отдельно и вернул изменённые данные.
+        """
+        with ThreadPoolExecutor(2) as executor:
+            before = executor.submit(client.get, url=f'/api/users/{create_user.id}')
+            time.sleep(READ_DELAY / 4)
+            client.patch(url=f'/api/users/{create_user.id}', json={'last_name': 'Coalesced'})
+            after = executor.submit(client.get, url=f'/api/users/{create_user.id}')
+
+            assert before.result().status_code == HTTPStatus.OK
+            assert after.result().json()['last_name'] == 'Coalesced'
+        assert singleflight.user_reads.stats() == {'queries': 2, 'coalesced': 0}
+
+    def test_error_shared(self):
+        """Ошибка запроса передаётся всем ожидающим
+
+        1. Одновременно вызвать завершающийся ошибкой запрос из нескольких потоков.
+        2. Проверить: запрос выполнен один раз, ошибку получили все.
+        """
+        flight = singleflight.SingleFlight('test')
+        started = threading.Event()
+
+        def fail():
+            started.set()
+            time.sleep(READ_DELAY)
+            raise ValueError('Database error')
+
+        def call():
+            with raises(ValueError):
+                flight.do('key', fail)
+
+        with ThreadPoolExecutor(4) as executor:
+            leader = executor.submit(call)
+            started.wait()
+            followers = [executor.submit(call) for _ in range(3)]
+            for future in [leader, *followers]:
+                future.result()
+
+        assert flight.stats() == {'queries': 1, 'coalesced': 3}
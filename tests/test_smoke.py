@@ -1,8 +1,15 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
 from http import HTTPStatus
 
 from fastapi.testclient import TestClient
+from pytest import mark
+from sqlalchemy import create_engine
 
-from app.models.status import StatusSchema
+from app.database import health
+from app.database.health import HealthMonitor
+from app.database.pool import InstrumentedQueuePool, PoolStats
+from app.models.status import PoolStatusSchema, StatusSchema
 
 
 def test_smoke(client: TestClient):
@@ -12,3 +19,76 @@ def test_smoke(client: TestClient):
 
     assert response.status_code == HTTPStatus.OK
     StatusSchema.model_validate(response.json())
+
+
+def test_pool_status(client: TestClient):
+    """Состояние пула соединений доступно и учитывает получение соединений"""
+    client.get(url='/status')
+
+    response = client.get(url='/status/pool')
+
+    assert response.status_code == HTTPStatus.OK
+    pools = [PoolStatusSchema.model_validate(pool) for pool in response.json()]
+    sync_pool = next(pool for pool in pools if pool.engine == 'sync')
+    assert sync_pool.checkout_latency.count > 0
+    assert sync_pool.waiters == 0
+    assert 0 <= sync_pool.saturation <= 1
+    assert StatusSchema.model_validate(client.get(url='/status').json()).pool_saturation is not None
+
+
+def test_pool_waiters(tmp_path):
+    """Ожидающими считаются только получения соединения из насыщенного пула
+
+    1. Получить соединение из пула на одно соединение без переполнения.
+    2. Проверить: ожидающих нет.
+    3. Получить второе соединение в отдельном потоке.
+    4. Проверить: пока первое не возвращено, один ожидающий, после - ни одного.
+    """
+    engine = create_engine(
+        f'sqlite:///{tmp_path}/pool.db', poolclass=InstrumentedQueuePool,
+        pool_size=1, max_overflow=0, pool_timeout=5)
+    stats: PoolStats = engine.pool.stats
+
+    first = engine.connect()
+    assert stats.waiters == 0
+    with ThreadPoolExecutor(1) as executor:
+        second = executor.submit(engine.connect)
+        while stats.waiters == 0 and not second.done():
+            time.sleep(0.01)
+        assert stats.waiters == 1
+        first.close()
+        second.result().close()
+
+    assert stats.waiters == 0
+    assert stats.checkout_latency.snapshot()['count'] == 2
+    engine.dispose()
+
+
+def test_liveness(client: TestClient):
+    """Liveness отвечает без обращения к БД"""
+    response = client.get(url='/status/live')
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {'status': 'ok'}
+
+
+@mark.parametrize(
+    'probe, status_code_expected',
+    [
+        (lambda: True, HTTPStatus.OK),
+        (lambda: False, HTTPStatus.SERVICE_UNAVAILABLE),
+        (lambda: time.sleep(1) or True, HTTPStatus.SERVICE_UNAVAILABLE),
+    ],
+    ids=['available', 'unavailable', 'timeout']
+)
+def test_readiness(client: TestClient, monkeypatch, probe, status_code_expected):
+    """Readiness отражает результат проверки БД, зависшая проверка прерывается по таймауту"""
+    monitor = HealthMonitor(interval=5, timeout=0.1, probe=probe)
+    monkeypatch.setattr(health, 'health_monitor', monitor)
+
+    response = client.get(url='/status/ready')
+
+    assert response.status_code == status_code_expected
+    status = StatusSchema.model_validate(client.get(url='/status').json())
+    assert status.database is (status_code_expected == HTTPStatus.OK)
+    assert status.last_check_latency < 1
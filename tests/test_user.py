@@ -4,7 +4,7 @@ from fastapi import Response
 from fastapi.testclient import TestClient
 from pytest import mark
 
-from app.models.user import ListUserPaginationModel, UserModel, UserUpdateModel
+from app.models.user import ListUserPaginationModel, UserCursorPageModel, UserModel, UserUpdateModel
 
 
 class TestGetUsersId:
@@ -154,6 +154,118 @@ class TestGetUsers:
         assert len(all_ids) == len(set(all_ids)), 'В пагинации вернулись повторяющиеся элементы'
 
 
+class TestGetUsersSearch:
+    """Поиск пользователей GET /api/users"""
+    def test_get_users_by_email(self, client: TestClient, fill_users: list[UserModel]):
+        """Поиск по email возвращает одного пользователя
+
+        1. Запросить пользователей по email.
+        2. Проверить: найден только пользователь с этим email.
+        """
+        user = fill_users[0]
+
+        response: Response = client.get(url='/api/users', params={'email': user.email})
+
+        assert response.status_code == HTTPStatus.OK
+        assert [item['id'] for item in response.json()['items']] == [user.id]
+        assert response.json()['total'] == 1
+
+    @mark.parametrize('field', ['first_name', 'last_name'])
+    def test_get_users_by_name_prefix(
+        self, client: TestClient, fill_users: list[UserModel], field: str
+    ):
+        """Поиск по префиксу имени не учитывает регистр
+
+        1. Запросить пользователей по префиксу имени в верхнем регистре.
+        2. Проверить: все найденные начинаются с префикса, искомый пользователь найден.
+        """
+        user = fill_users[0]
+        prefix = getattr(user, field)[:2]
+
+        response: Response = client.get(
+            url='/api/users', params={field: prefix.upper(), 'size': 100})
+
+        assert response.status_code == HTTPStatus.OK
+        items = response.json()['items']
+        assert all(item[field].lower().startswith(prefix.lower()) for item in items)
+        assert response.json()['total'] >= 1
+
+    def test_get_users_search(self, client: TestClient, create_user: UserModel):
+        """Поиск по подстроке имени или фамилии не учитывает регистр и учитывает пагинацию
+
+        1. Изменить фамилию пользователя на уникальное значение.
+        2. Запросить пользователей по подстроке фамилии.
+        3. Проверить: найден только этот пользователь.
+        """
+        client.patch(url=f'/api/users/{create_user.id}', json={'last_name': 'Searchable_Zq9'})
+
+        response: Response = client.get(
+            url='/api/users', params={'search': 'able_zQ', 'page': 1, 'size': 10})
+
+        assert response.status_code == HTTPStatus.OK
+        assert [item['id'] for item in response.json()['items']] == [create_user.id]
+
+
+class TestGetUsersCursor:
+    """Запросы списка пользователей по курсору GET /api/users/cursor"""
+    page_size = 50
+
+    def _walk(self, client: TestClient, cursor_key: str, cursor: str | None = None):
+        pages = []
+        while True:
+            params = {'size': self.page_size}
+            if cursor:
+                params['cursor'] = cursor
+            response: Response = client.get(url='/api/users/cursor', params=params)
+            assert response.status_code == HTTPStatus.OK
+            page = UserCursorPageModel.model_validate(response.json())
+            pages.append(page)
+            cursor = getattr(page, cursor_key)
+            if cursor is None:
+                return pages
+
+    def test_get_users_cursor(self, client: TestClient, fill_users: list[UserModel]):
+        """Проход по курсорам вперёд возвращает всех пользователей по возрастанию id
+
+        1. Запросить страницы, переходя по курсору next.
+        2. Проверить: id возрастают и не повторяются, созданные пользователи найдены.
+        3. Проверить: ответ не содержит общего количества.
+        """
+        pages = self._walk(client, 'next')
+
+        ids = [user.id for page in pages for user in page.items]
+        assert ids == sorted(set(ids))
+        assert {user.id for user in fill_users} <= set(ids)
+        assert all(len(page.items) <= self.page_size for page in pages)
+        assert pages[0].previous is None
+
+    def test_get_users_cursor_previous(self, client: TestClient, fill_users: list[UserModel]):
+        """Проход по курсорам назад возвращает те же страницы
+
+        1. Дойти до последней страницы по курсору next.
+        2. Пройти обратно по курсору previous.
+        3. Проверить: страницы совпадают с прямым проходом.
+        """
+        forward = self._walk(client, 'next')
+        backward = self._walk(client, 'previous', forward[-1].previous)
+
+        forward_ids = [[u.id for u in page.items] for page in forward[:-1]]
+        backward_ids = [[u.id for u in page.items] for page in reversed(backward)]
+        assert fill_users
+        assert forward_ids == backward_ids
+
+    @mark.parametrize('cursor', ['aaa', 'bmV4dDp4'])
+    def test_get_users_cursor_invalid(self, client: TestClient, cursor: str):
+        """Невалидный курсор возвращает статус UNPROCESSABLE_ENTITY
+
+        1. Запросить страницу по невалидному курсору.
+        2. Проверить: код ответа соответствует ожидаемому.
+        """
+        response: Response = client.get(url='/api/users/cursor', params={'cursor': cursor})
+
+        assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
 class TestPostUsers:
     """Запросы создания пользователей POST /api/users"""
     def test_post_users(self, client: TestClient, user_data_for_create: dict):
@@ -178,6 +290,22 @@ class TestPostUsers:
         assert response_json['avatar'] == user_data_for_create['avatar']
 
 
+class TestPostUsersConflict:
+    """Уникальность email при создании пользователя POST /api/users"""
+    def test_post_users_duplicate_email(self, client: TestClient, create_user: UserModel):
+        """Создание пользователя с занятым email возвращает статус CONFLICT
+
+        1. Создать пользователя с email существующего пользователя.
+        2. Проверить: код ответа соответствует ожидаемому.
+        """
+        response: Response = client.post(
+            url='/api/users',
+            json={**create_user.model_dump(exclude={'id'}), 'avatar': 'https://reqres.in/a.jpg'}
+        )
+
+        assert response.status_code == HTTPStatus.CONFLICT
+
+
 class TestPatchUsers:
     """Запросы изменения пользователей PATCH /api/users/{user_id}"""
     @mark.parametrize(
@@ -231,6 +359,20 @@ class TestPatchUsers:
             assert response_json[k] == getattr(create_user, k), (
                 f'Значение поля {k} не должно быть изменено')
 
+    def test_patch_users_not_found(self, client: TestClient, create_user: UserModel):
+        """Изменение несуществующего пользователя возвращает статус NOT_FOUND
+
+        1. Удалить пользователя.
+        2. Изменить пользователя.
+        3. Проверить: код ответа NOT_FOUND.
+        """
+        client.delete(url=f'/api/users/{create_user.id}')
+
+        response: Response = client.patch(
+            url=f'/api/users/{create_user.id}', json={'first_name': 'Updated_first_name'})
+
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
 
 class TestDeleteUsers:
     """Запросы удаления пользователей DELETE /api/users/{user_id}"""
@@ -245,3 +387,52 @@ class TestDeleteUsers:
 
         assert response.status_code == HTTPStatus.OK
         assert response.json().get('message') == 'User deleted'
+
+    def test_delete_users_not_found(self, client: TestClient, create_user: UserModel):
+        """Удаление несуществующего пользователя возвращает статус NOT_FOUND
+
+        1. Удалить пользователя.
+        2. Повторно удалить пользователя.
+        3. Проверить: код ответа NOT_FOUND.
+        """
+        client.delete(url=f'/api/users/{create_user.id}')
+
+        response: Response = client.delete(url=f'/api/users/{create_user.id}')
+
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+class TestUsersAsync:
+    """Запросы пользователей через асинхронный движок БД (DATABASE_ASYNC)"""
+    def test_users_crud_async(self, async_client: TestClient, user_data_for_create: dict):
+        """Создание, получение, изменение и удаление пользователя в async-режиме
+
+        1. Создать пользователя.
+        2. Проверить: пользователь доступен по id и в списке пользователей.
+        3. Изменить пользователя.
+        4. Проверить: значение поля изменено.
+        5. Удалить пользователя.
+        6. Проверить: пользователь не найден.
+        """
+        response: Response = async_client.post(url='/api/users', json=user_data_for_create)
+        assert response.status_code == HTTPStatus.CREATED
+        user_id = response.json()['id']
+
+        response = async_client.get(url=f'/api/users/{user_id}')
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['email'] == user_data_for_create['email']
+
+        response = async_client.get(url='/api/users', params={'size': 100})
+        assert response.status_code == HTTPStatus.OK
+        ListUserPaginationModel.model_validate(response.json())
+
+        response = async_client.patch(
+            url=f'/api/users/{user_id}', json={'first_name': 'Updated_first_name'})
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['first_name'] == 'Updated_first_name'
+
+        response = async_client.delete(url=f'/api/users/{user_id}')
+        assert response.status_code == HTTPStatus.OK
+
+        response = async_client.get(url=f'/api/users/{user_id}')
+        assert response.status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,107 @@
+from http import HTTPStatus
+
+from fastapi import Response
+from fastapi.testclient import TestClient
+from pytest import mark
+
+from app.database import users
+from app.database.cache import CacheBackend, SharedCache
+from app.models.user import BulkResultModel, UserModel
+
+
+class TestBatchGetUsers:
+    """Получение пользователей по списку id POST /api/users/batch-get"""
+    def test_batch_get_order(
+        self, client: TestClient, fill_users: list[UserModel], user_statements: list[str]
+    ):
+        """Пользователи возвращаются в порядке запроса одним запросом к БД
+
+        1. Запросить пользователей в обратном порядке с повтором, несуществующим и невалидным id.
+        2. Проверить: порядок и повторы сохранены, отсутствующие отмечены ошибкой.
+        3. Проверить: к БД выполнен один запрос.
+        """
+        ids = [user.id for user in reversed(fill_users[:5])]
+        missing = fill_users[-1].id + 10_000_000
+        response: Response = client.post(
+            url='/api/users/batch-get', json=[*ids, ids[0], missing, 0])
+
+        assert response.status_code == HTTPStatus.OK
+        result = BulkResultModel.model_validate(response.json())
+        assert [item.id for item in result.items] == [*ids, ids[0], missing, 0]
+        assert [item.user.id for item in result.items[:6]] == [*ids, ids[0]]
+        assert [item.error for item in result.items[6:]] == ['User not found', 'Invalid user id']
+        assert (result.succeeded, result.failed) == (6, 2)
+        assert len(user_statements) == 1
+
+    def test_batch_get_chunks(
+        self, client: TestClient, fill_users: list[UserModel], user_statements: list[str],
+        monkeypatch,
+    ):
+        """Длинный список id запрашивается частями
+
+        1. Ограничить часть запроса двумя id и запросить пять пользователей.
+        2. Проверить: найдены все пользователи, к БД выполнено три запроса.
+        """
+        monkeypatch.setattr(users, 'BATCH_GET_CHUNK_SIZE', 2)
+        ids = [user.id for user in fill_users[:5]]
+
+        response: Response = client.post(url='/api/users/batch-get', json=ids)
+
+        result = BulkResultModel.model_validate(response.json())
+        assert [item.user.id for item in result.items] == ids
+        assert len(user_statements) == 3
+
+    @mark.parametrize('user_cache', ['lru'], indirect=True)
+    def test_batch_get_cache(
+        self, client: TestClient, fill_users: list[UserModel], user_cache: CacheBackend,
+        user_statements: list[str],
+    ):
+        """Пользователи из кэша не запрашиваются из БД
+
+        1. Запросить пользователя по id, затем его же с другим пользователем пакетом.
+        2. Проверить: из БД запрошен только второй пользователь.
+        """
+        client.get(url=f'/api/users/{fill_users[0].id}')
+        user_statements.clear()
+
+        response: Response = client.post(
+            url='/api/users/batch-get', json=[fill_users[0].id, fill_users[1].id])
+
+        result = BulkResultModel.model_validate(response.json())
+        assert all(item.ok for item in result.items)
+        assert user_cache.hits == 1
+        assert len(user_statements) == 1
+
+    @mark.parametrize('user_cache', ['shared'], indirect=True)
+    @mark.parametrize('client_fixture', ['client', 'async_client'])
+    def test_batch_get_shared_cache(
+        self, request, fill_users: list[UserModel], user_cache: SharedCache, client_fixture: str
+    ):
+        """Общий кэш читается одним MGET и заполняется одним конвейером
+
+        1. Дважды запросить пакетом пять пользователей (sync и DATABASE_ASYNC).
+        2. Проверить: к хранилищу по одному обращению на чтение и запись, второй раз - из кэша.
+        3. Проверить: обращения не из цикла событий.
+        """
+        client: TestClient = request.getfixturevalue(client_fixture)
+        ids = [user.id for user in fill_users[:5]]
+
+        responses = [client.post(url='/api/users/batch-get', json=ids) for _ in range(2)]
+
+        assert all(BulkResultModel.model_validate(r.json()).succeeded == 5 for r in responses)
+        assert user_cache.client.calls == ['mget', 'pipeline', 'mget']
+        assert (user_cache.hits, user_cache.misses) == (5, 5)
+        assert user_cache.client.loop_calls == 0
+
+    def test_batch_get_async(self, async_client: TestClient, fill_users: list[UserModel]):
+        """Получение пользователей по списку id с асинхронным движком БД
+
+        1. Запросить пользователей по списку id (DATABASE_ASYNC).
+        2. Проверить: пользователи возвращены в порядке запроса.
+        """
+        ids = [user.id for user in reversed(fill_users[:3])]
+
+        response: Response = async_client.post(url='/api/users/batch-get', json=ids)
+
+        result = BulkResultModel.model_validate(response.json())
+        assert [item.user.id for item in result.items] == ids
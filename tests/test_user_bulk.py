@@ -0,0 +1,145 @@
+from http import HTTPStatus
+
+from fastapi import Response
+from fastapi.testclient import TestClient
+from pytest import mark
+
+from app.models.user import BulkResultModel, UserModel
+
+
+class TestPostUsersBulk:
+    """Пакетное создание пользователей POST /api/users/bulk"""
+    def test_post_users_bulk(self, client: TestClient, user_data_for_create: dict):
+        """Пакет создаётся с отчётом по каждому элементу
+
+        1. Создать пакет из валидного и невалидного пользователя.
+        2. Проверить: валидный создан, невалидный отклонён с ошибкой.
+        """
+        response: Response = client.post(
+            url='/api/users/bulk',
+            json=[user_data_for_create, {**user_data_for_create, 'email': 'not-an-email'}]
+        )
+
+        assert response.status_code == HTTPStatus.OK
+        result = BulkResultModel.model_validate(response.json())
+        client.delete(url=f'/api/users/{result.items[0].id}')
+        assert (result.succeeded, result.failed) == (1, 1)
+        assert result.items[0].ok and result.items[0].user.email == user_data_for_create['email']
+        assert not result.items[1].ok and 'email' in result.items[1].error
+
+    def test_post_users_bulk_email_conflict(
+        self, client: TestClient, create_user: UserModel, user_data_for_create: dict
+    ):
+        """Занятый email - ошибка только своего элемента, остальные создаются
+
+        1. Создать пакет: новый пользователь, email существующего, повтор email пакета.
+        2. Проверить: первый создан, два других отклонены с 'Email already registered'.
+        """
+        response: Response = client.post(
+            url='/api/users/bulk',
+            json=[
+                user_data_for_create,
+                {**user_data_for_create, 'email': create_user.email},
+                user_data_for_create,
+            ]
+        )
+
+        assert response.status_code == HTTPStatus.OK
+        result = BulkResultModel.model_validate(response.json())
+        client.delete(url=f'/api/users/{result.items[0].id}')
+        assert (result.succeeded, result.failed) == (1, 2)
+        assert result.items[0].user.email == user_data_for_create['email']
+        assert [item.error for item in result.items[1:]] == ['Email already registered'] * 2
+
+    def test_post_users_bulk_order(self, fill_users: list[UserModel]):
+        """Созданные пакетом пользователи возвращаются в порядке запроса
+
+        1. Создать пакет пользователей.
+        2. Проверить: id уникальны и возрастают в порядке элементов запроса.
+        """
+        ids = [user.id for user in fill_users]
+        assert ids == sorted(set(ids))
+
+
+class TestPatchUsersBulk:
+    """Пакетное изменение пользователей PATCH /api/users/bulk"""
+    def test_patch_users_bulk(self, client: TestClient, create_user: UserModel):
+        """Пакет изменений применяется с отчётом по каждому элементу
+
+        1. Изменить существующего и несуществующего пользователя, передать невалидный id.
+        2. Проверить: существующий изменён, остальные элементы отклонены.
+        """
+        response: Response = client.patch(
+            url='/api/users/bulk',
+            json=[
+                {'id': create_user.id, 'first_name': 'Bulk_first_name'},
+                {'id': create_user.id + 10_000_000, 'first_name': 'Bulk_first_name'},
+                {'id': 0, 'first_name': 'Bulk_first_name'},
+            ]
+        )
+
+        assert response.status_code == HTTPStatus.OK
+        result = BulkResultModel.model_validate(response.json())
+        assert [item.ok for item in result.items] == [True, False, False]
+        assert result.items[0].user.first_name == 'Bulk_first_name'
+        assert result.items[0].user.last_name == create_user.last_name
+        assert result.items[1].error == 'User not found'
+        assert result.items[2].error == 'Invalid user id'
+        response = client.get(url=f'/api/users/{create_user.id}')
+        assert response.json()['first_name'] == 'Bulk_first_name'
+
+
+    @mark.parametrize('client_fixture', ['client', 'async_client'])
+    def test_patch_users_bulk_email_conflict(
+        self, request, create_user: UserModel, user_data_for_create: dict, client_fixture: str
+    ):
+        """Занятый email - 409 только для своего элемента, остальные изменения применяются
+
+        1. Создать второго пользователя.
+        2. Изменить пакетом: имя первого, email второго на email первого, фамилию второго
+           (sync и DATABASE_ASYNC).
+        3. Проверить: первый и третий элементы применены, второй отклонён.
+        4. Проверить: email второго не изменился.
+        """
+        client: TestClient = request.getfixturevalue(client_fixture)
+        second = client.post(url='/api/users', json=user_data_for_create).json()
+
+        response: Response = client.patch(
+            url='/api/users/bulk',
+            json=[
+                {'id': create_user.id, 'first_name': 'Bulk_first_name'},
+                {'id': second['id'], 'email': create_user.email},
+                {'id': second['id'], 'last_name': 'Bulk_last_name'},
+            ]
+        )
+        found = client.get(url=f'/api/users/{second["id"]}').json()
+        client.delete(url=f'/api/users/{second["id"]}')
+
+        assert response.status_code == HTTPStatus.OK
+        result = BulkResultModel.model_validate(response.json())
+        assert [item.ok for item in result.items] == [True, False, True]
+        assert result.items[0].user.first_name == 'Bulk_first_name'
+        assert result.items[1].error == 'Email already registered'
+        assert result.items[1].id == second['id']
+        assert result.items[2].user.last_name == 'Bulk_last_name'
+        assert result.items[2].user.email == second['email']
+        assert (found['email'], found['last_name']) == (second['email'], 'Bulk_last_name')
+
+
+class TestDeleteUsersBulk:
+    """Пакетное удаление пользователей DELETE /api/users/bulk"""
+    def test_delete_users_bulk(self, client: TestClient, create_user: UserModel):
+        """Пакет удаляется одним запросом с отчётом по каждому элементу
+
+        1. Удалить существующего и несуществующего пользователя.
+        2. Проверить: существующий удалён, несуществующий отмечен как не найденный.
+        """
+        response: Response = client.request(
+            'DELETE', url='/api/users/bulk', json=[create_user.id, create_user.id + 10_000_000]
+        )
+
+        assert response.status_code == HTTPStatus.OK
+        result = BulkResultModel.model_validate(response.json())
+        assert [item.ok for item in result.items] == [True, False]
+        response = client.get(url=f'/api/users/{create_user.id}')
+        assert response.status_code == HTTPStatus.NOT_FOUND
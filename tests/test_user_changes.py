@@ -0,0 +1,225 @@
+import asyncio
+import json
+import threading
+from http import HTTPStatus
+
+from fastapi.testclient import TestClient
+from pytest import mark
+
+from app.database import users
+from app.database.changefeed import CHANGES_CHANNEL, ChangeFeed, PostgresChangeFeed, Subscription
+from app.database.seed import generate_user
+from app.models.user import UserModel
+from tests.fixtures.changefeed import NotifyRecorder
+
+
+def parse_events(body: str) -> list[dict]:
+    """События SSE из тела ответа, без комментариев и retry"""
+    events = []
+    for block in body.split('\n\n'):
+        fields = dict(
+            line.split(': ', 1) for line in block.splitlines()
+            if ': ' in line and not line.startswith(':'))
+        if 'event' in fields:
+            events.append(fields)
+    return events
+
+
+def notify_payload(seq: int) -> str:
+    """payload NOTIFY ленты PostgreSQL: номер и JSON события удаления"""
+    return f'{seq} ' + json.dumps({'op': 'delete', 'id': seq, 'user': None})
+
+
+def create_user() -> UserModel:
+    """Создать пользователя напрямую в БД"""
+    return users.create_user(UserModel.model_validate(generate_user().model_dump(mode='json')))
+
+
+class TestUserChanges:
+    """Лента изменений GET /api/users/changes"""
+    def test_resume(self, client: TestClient, change_feed: ChangeFeed):
+        """Продолжение с id события: пропущенные создание, изменение и удаление по порядку
+
+        1. Создать пользователя, запомнить номер события.
+        2. Создать второго, изменить и удалить его.
+        3. Получить ленту с after и с Last-Event-ID.
+        4. Проверить: четыре события по порядку с id и данными.
+        """
+        first = create_user()
+        after = change_feed.last_seq()
+        last_event_id = change_feed.event_id(after)
+        second = create_user()
+        update = generate_user().model_dump(mode='json')
+        client.patch(url=f'/api/users/{second.id}', json=update)
+        client.delete(url=f'/api/users/{second.id}')
+        users.delete_user(first.id)
+
+        response = client.get(url='/api/users/changes', params={'after': last_event_id})
+        by_header = client.get(url='/api/users/changes', headers={'Last-Event-ID': last_event_id})
+
+        assert response.status_code == HTTPStatus.OK
+        assert response.headers['content-type'].startswith('text/event-stream')
+        events = parse_events(response.text)
+        assert [event['event'] for event in events] == ['create', 'update', 'delete', 'delete']
+        assert [event['id'] for event in events] == [
+            change_feed.event_id(seq) for seq in range(after + 1, after + 5)]
+        data = [json.loads(event['data']) for event in events]
+        assert [item['id'] for item in data] == [second.id, second.id, second.id, first.id]
+        assert data[1]['user']['email'] == update['email']
+        assert data[2]['user'] is None
+        assert parse_events(by_header.text) == events
+
+    def test_live(self, async_client: TestClient, change_feed: ChangeFeed):
+        """Новые изменения приходят в открытый поток
+
+        1. Открыть ленту без номера (DATABASE_ASYNC), через 0.1 с создать пользователя.
+        2. Проверить: в потоке одно событие create этого пользователя.
+        """
+        created = []
+        timer = threading.Timer(0.1, lambda: created.append(create_user()))
+        timer.start()
+
+        response = async_client.get(url='/api/users/changes')
+        timer.join()
+        users.delete_user(created[0].id)
+
+        events = parse_events(response.text)
+        assert [event['event'] for event in events] == ['create']
+        assert json.loads(events[0]['data'])['user']['email'] == created[0].email
+        assert not change_feed.subscriptions
+
+    @mark.parametrize('last_event_id', ['future', 'other', '42'])
+    def test_reset(self, client: TestClient, change_feed: ChangeFeed, last_event_id: str):
+        """id вне истории или из ленты другого процесса (воркер, перезапуск) - событие reset
+
+        1. Получить ленту с номером больше последнего, с id другой ленты, с номером без epoch.
+        2. Проверить: одно событие reset, подписка снята после закрытия потока.
+        """
+        last_event_id = {
+            'future': change_feed.event_id(10 ** 9),
+            'other': ChangeFeed().event_id(change_feed.last_seq()),
+        }.get(last_event_id, last_event_id)
+
+        response = client.get(url='/api/users/changes', headers={'Last-Event-ID': last_event_id})
+
+        assert [event['event'] for event in parse_events(response.text)] == ['reset']
+        assert not change_feed.subscriptions
+
+
+class TestSubscription:
+    """Ограниченный буфер подписчика"""
+    def test_overflow_drop(self):
+        """Политика drop: старые события отбрасываются, писатель не ждёт
+
+        1. Подписаться с буфером 2 и опубликовать 5 событий.
+        2. Проверить: получены два последних, dropped = 3, подписка открыта.
+        """
+        async def scenario() -> tuple[Subscription, list]:
+            feed = ChangeFeed(buffer_size=2, overflow='drop')
+            subscription = feed.subscribe()
+            feed.publish('delete', range(1, 6))
+            return subscription, await subscription.get()
+
+        subscription, events = asyncio.run(scenario())
+
+        assert [event.user_id for event in events] == [4, 5]
+        assert subscription.dropped == 3
+        assert not subscription.closed
+
+    def test_overflow_disconnect(self):
+        """Политика disconnect: переполненная подписка закрывается, продолжение - по номеру
+
+        1. Подписаться с буфером 2 и опубликовать 5 событий.
+        2. Проверить: подписка закрыта с двумя событиями.
+        3. Подписаться заново после последнего полученного номера.
+        4. Проверить: получены оставшиеся три события из истории.
+        """
+        async def scenario() -> tuple[Subscription, list, list]:
+            feed = ChangeFeed(buffer_size=2, overflow='disconnect')
+            subscription = feed.subscribe()
+            feed.publish('delete', range(1, 6))
+            events = await subscription.get()
+            resumed = feed.subscribe(feed.event_id(events[-1].seq))
+            return subscription, events, await resumed.get()
+
+        subscription, events, resumed = asyncio.run(scenario())
+
+        assert subscription.closed
+        assert [event.user_id for event in events] == [1, 2]
+        assert [event.user_id for event in resumed] == [3, 4, 5]
+
+
+class TestPostgresChangeFeed:
+    """Лента через LISTEN/NOTIFY без подключения к БД"""
+    def test_resume_commit_order(self):
+        """Номера приходят в порядке фиксации, а не выдачи: продолжение - по месту в истории
+
+        1. Получить события 1, 3, 2 через обработчик NOTIFY.
+        2. Проверить: продолжение с 3 получает 2, с 1 - 3 и 2, с 4 - reset.
+        """
+        async def scenario() -> tuple[list, list, Subscription]:
+            feed = PostgresChangeFeed()
+            for seq in (1, 3, 2):
+                feed.on_notify(None, 0, CHANGES_CHANNEL, notify_payload(seq))
+            after_three = feed.subscribe(feed.event_id(3))
+            after_one = feed.subscribe(feed.event_id(1))
+            unknown = feed.subscribe(feed.event_id(4))
+            return list(after_three.events), list(after_one.events), unknown
+
+        after_three, after_one, unknown = asyncio.run(scenario())
+
+        assert [event.seq for event in after_three] == [2]
+        assert [event.seq for event in after_one] == [3, 2]
+        assert unknown.reset
+
+    def test_restart(self):
+        """Переподключение LISTEN: подписки закрываются, история начинается заново
+
+        1. Подписаться и получить события 1-3 через обработчик NOTIFY.
+        2. Начать историю заново, как после переподключения.
+        3. Проверить: подписка закрыта, продолжение с 3 - reset.
+        4. Получить события 5 и 4.
+        5. Проверить: продолжение с 5 получает 4.
+        """
+        async def scenario() -> tuple[Subscription, Subscription, list]:
+            feed = PostgresChangeFeed()
+            subscription = feed.subscribe()
+            for seq in range(1, 4):
+                feed.on_notify(None, 0, CHANGES_CHANNEL, notify_payload(seq))
+            feed.restart()
+            stale = feed.subscribe(feed.event_id(3))
+            for seq in (5, 4):
+                feed.on_notify(None, 0, CHANGES_CHANNEL, notify_payload(seq))
+            return subscription, stale, list(feed.subscribe(feed.event_id(5)).events)
+
+        subscription, stale, events = asyncio.run(scenario())
+
+        assert subscription.closed
+        assert stale.reset
+        assert [event.seq for event in events] == [4]
+
+    @mark.parametrize('client_fixture', ['client', 'async_client'])
+    def test_notify_in_write_transaction(
+        self, request, notify_recorder: NotifyRecorder, user_data_for_create: dict,
+        client_fixture: str,
+    ):
+        """NOTIFY выполняется в транзакции записи, неудачная запись его не выполняет
+
+        1. Создать пользователя, повторить создание с тем же email, изменить и удалить его.
+        2. Проверить: NOTIFY create, update, delete, каждый - в открытой транзакции
+           с данными пользователя.
+        """
+        client: TestClient = request.getfixturevalue(client_fixture)
+        user_id = client.post(url='/api/users', json=user_data_for_create).json()['id']
+        response = client.post(url='/api/users', json=user_data_for_create)
+        assert response.status_code == HTTPStatus.CONFLICT
+        update = generate_user().model_dump(mode='json')
+        client.patch(url=f'/api/users/{user_id}', json=update)
+        client.delete(url=f'/api/users/{user_id}')
+
+        assert [(op, in_transaction) for op, in_transaction, _ in notify_recorder.notified] == [
+            ('create', True), ('update', True), ('delete', True)]
+        payloads = [payload for _, _, items in notify_recorder.notified for payload in items]
+        assert [payload['id'] for payload in payloads] == [user_id] * 3
+        assert payloads[0]['user']['email'] == user_data_for_create['email']
+        assert payloads[1]['user']['email'] == update['email']
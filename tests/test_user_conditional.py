@@ -0,0 +1,125 @@
+from http import HTTPStatus
+
+from fastapi import Response
+from fastapi.testclient import TestClient
+from pytest import mark
+
+from app.database.cache import CacheBackend
+from app.models.user import UserModel
+
+
+class TestConditionalGetUser:
+    """Условные запросы GET /api/users/{user_id}"""
+    def test_get_user_not_modified(self, client: TestClient, create_user: UserModel):
+        """Запрос с актуальным ETag возвращает 304 без тела
+
+        1. Запросить пользователя, получить ETag и Last-Modified.
+        2. Повторить запрос с If-None-Match.
+        3. Проверить: код ответа NOT_MODIFIED, тело пустое, ETag тот же.
+        """
+        response: Response = client.get(url=f'/api/users/{create_user.id}')
+        assert response.status_code == HTTPStatus.OK
+        etag = response.headers['etag']
+        assert response.headers['last-modified']
+
+        response = client.get(
+            url=f'/api/users/{create_user.id}', headers={'If-None-Match': etag})
+
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+        assert response.content == b''
+        assert response.headers['etag'] == etag
+
+    def test_get_user_if_modified_since(self, client: TestClient, create_user: UserModel):
+        """Запрос с If-Modified-Since не раньше Last-Modified возвращает 304
+
+        1. Запросить пользователя, получить Last-Modified.
+        2. Повторить запрос с If-Modified-Since.
+        3. Проверить: код ответа NOT_MODIFIED.
+        """
+        response: Response = client.get(url=f'/api/users/{create_user.id}')
+
+        response = client.get(
+            url=f'/api/users/{create_user.id}',
+            headers={'If-Modified-Since': response.headers['last-modified']},
+        )
+
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+    @mark.usefixtures('user_cache')
+    def test_get_user_modified(self, client: TestClient, create_user: UserModel):
+        """После изменения пользователя старый ETag не подходит
+
+        1. Запросить пользователя, получить ETag.
+        2. Изменить пользователя.
+        3. Проверить: запрос со старым ETag возвращает OK и новый ETag.
+        """
+        etag = client.get(url=f'/api/users/{create_user.id}').headers['etag']
+        client.patch(url=f'/api/users/{create_user.id}', json={'first_name': 'Modified'})
+
+        response: Response = client.get(
+            url=f'/api/users/{create_user.id}', headers={'If-None-Match': etag})
+
+        assert response.status_code == HTTPStatus.OK
+        assert response.headers['etag'] != etag
+        assert response.json()['first_name'] == 'Modified'
+
+
+class TestConditionalGetUsers:
+    """Условные запросы списков пользователей"""
+    @mark.parametrize('url', ['/api/users', '/api/users/cursor'])
+    @mark.usefixtures('fill_users')
+    def test_get_users_not_modified(self, client: TestClient, url: str):
+        """Неизменившаяся страница возвращает 304
+
+        1. Запросить страницу, получить ETag.
+        2. Повторить запрос с If-None-Match.
+        3. Проверить: код ответа NOT_MODIFIED.
+        """
+        etag = client.get(url=url, params={'size': 10}).headers['etag']
+
+        response: Response = client.get(
+            url=url, params={'size': 10}, headers={'If-None-Match': etag})
+
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+
+class TestPatchUserIfMatch:
+    """Изменение пользователя с If-Match PATCH /api/users/{user_id}"""
+    def test_patch_user_if_match(self, client: TestClient, create_user: UserModel):
+        """Изменение с устаревшим ETag отклоняется
+
+        1. Изменить пользователя с актуальным ETag.
+        2. Проверить: код ответа OK, в ответе новый ETag.
+        3. Повторить изменение со старым ETag.
+        4. Проверить: код ответа PRECONDITION_FAILED, пользователь не изменён.
+        """
+        etag = client.get(url=f'/api/users/{create_user.id}').headers['etag']
+
+        response: Response = client.patch(
+            url=f'/api/users/{create_user.id}',
+            json={'first_name': 'First'}, headers={'If-Match': etag},
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.headers['etag'] != etag
+
+        response = client.patch(
+            url=f'/api/users/{create_user.id}',
+            json={'first_name': 'Second'}, headers={'If-Match': etag},
+        )
+        assert response.status_code == HTTPStatus.PRECONDITION_FAILED
+        assert client.get(url=f'/api/users/{create_user.id}').json()['first_name'] == 'First'
+
+    def test_patch_user_version_not_writable(
+        self, client: TestClient, user_cache: CacheBackend, create_user: UserModel
+    ):
+        """Версию нельзя задать в теле запроса
+
+        1. Изменить пользователя, передав version в теле.
+        2. Проверить: ETag соответствует следующей версии, а не переданной.
+        """
+        response: Response = client.patch(
+            url=f'/api/users/{create_user.id}', json={'first_name': 'New', 'version': 100})
+
+        assert response.headers['etag'] == f'"{create_user.id}.2"'
+        assert 'version' not in response.json()
+        assert user_cache.get(create_user.id).version == 2
@@ -0,0 +1,68 @@
+import csv
+import io
+import json
+from http import HTTPStatus
+
+from fastapi import Response
+from fastapi.testclient import TestClient
+from pytest import mark
+
+from app.models.user import UserModel
+
+
+class TestExportUsers:
+    """Потоковая выгрузка пользователей GET /api/users/export"""
+    def test_export_users_ndjson(self, client: TestClient, fill_users: list[UserModel]):
+        """Выгрузка NDJSON содержит всех пользователей
+
+        1. Выгрузить пользователей в NDJSON.
+        2. Проверить: каждая строка - валидная модель UserModel, созданные пользователи найдены.
+        """
+        response: Response = client.get(url='/api/users/export')
+
+        assert response.status_code == HTTPStatus.OK
+        assert response.headers['content-type'].startswith('application/x-ndjson')
+        exported = [UserModel.model_validate(json.loads(line)) for line in response.iter_lines()]
+        assert {user.id for user in fill_users} <= {user.id for user in exported}
+
+    def test_export_users_csv_fields(self, client: TestClient, fill_users: list[UserModel]):
+        """Выгрузка CSV содержит только запрошенные поля
+
+        1. Выгрузить пользователей в CSV с полями id и email.
+        2. Проверить: заголовок и строки содержат только эти поля.
+        """
+        response: Response = client.get(
+            url='/api/users/export', params={'format': 'csv', 'fields': 'id,email'})
+
+        assert response.status_code == HTTPStatus.OK
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert all(row.keys() == {'id', 'email'} for row in rows)
+        exported = {int(row['id']): row['email'] for row in rows}
+        assert all(exported[user.id] == user.email for user in fill_users)
+
+    def test_export_users_filter(self, client: TestClient, fill_users: list[UserModel]):
+        """Выгрузка фильтруется по значению поля
+
+        1. Выгрузить пользователей с фильтром по email.
+        2. Проверить: выгружены только пользователи с этим email.
+        """
+        user = fill_users[0]
+
+        response: Response = client.get(
+            url='/api/users/export', params={'email': user.email, 'fields': 'id,email'})
+
+        assert response.status_code == HTTPStatus.OK
+        exported = [json.loads(line) for line in response.iter_lines()]
+        assert {'id': user.id, 'email': user.email} in exported
+        assert all(item['email'] == user.email for item in exported)
+
+    @mark.parametrize('params', [{'fields': 'id,password'}, {'format': 'xml'}])
+    def test_export_users_unprocessable_entity(self, client: TestClient, params: dict):
+        """Невалидные параметры выгрузки возвращают статус UNPROCESSABLE_ENTITY
+
+        1. Запросить выгрузку с неизвестным полем или форматом.
+        2. Проверить: код ответа соответствует ожидаемому.
+        """
+        response: Response = client.get(url='/api/users/export', params=params)
+
+        assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
@@ -0,0 +1,69 @@
+from http import HTTPStatus
+
+from fastapi.testclient import TestClient
+from pytest import mark
+
+from app.models.user import UserModel
+from app.routes import user as user_routes
+
+
+class TestFastJson:
+    """Быстрая сериализация ответов USERS_FAST_JSON"""
+    @mark.parametrize('params', [
+        {'page': 2, 'size': 20},
+        {'page': 1, 'size': 50, 'search': 'a'},
+    ])
+    @mark.usefixtures('fill_users')
+    def test_get_users_fast_json(self, client: TestClient, monkeypatch, params: dict):
+        """Страница списка в быстром режиме совпадает с обычной
+
+        1. Запросить страницу в обычном режиме.
+        2. Запросить ту же страницу с USERS_FAST_JSON.
+        3. Проверить: тела ответов и ETag совпадают.
+        """
+        expected = client.get(url='/api/users', params=params)
+        monkeypatch.setattr(user_routes, 'FAST_JSON', True)
+
+        response = client.get(url='/api/users', params=params)
+
+        assert response.status_code == HTTPStatus.OK
+        assert response.headers['content-type'] == 'application/json'
+        assert response.json() == expected.json()
+        assert response.headers['etag'] == expected.headers['etag']
+
+    @mark.usefixtures('fill_users')
+    def test_get_users_cursor_fast_json(self, client: TestClient, monkeypatch):
+        """Страница по курсору в быстром режиме совпадает с обычной
+
+        1. Запросить первую и вторую страницы по курсору в обычном режиме.
+        2. Запросить те же страницы с USERS_FAST_JSON.
+        3. Проверить: тела ответов и ETag совпадают.
+        """
+        first = client.get(url='/api/users/cursor', params={'size': 10})
+        params = {'size': 10, 'cursor': first.json()['next']}
+        expected = client.get(url='/api/users/cursor', params=params)
+        monkeypatch.setattr(user_routes, 'FAST_JSON', True)
+
+        responses = [
+            client.get(url='/api/users/cursor', params={'size': 10}),
+            client.get(url='/api/users/cursor', params=params),
+        ]
+
+        assert [r.json() for r in responses] == [first.json(), expected.json()]
+        assert responses[1].headers['etag'] == expected.headers['etag']
+
+    def test_get_user_fast_json(self, client: TestClient, monkeypatch, create_user: UserModel):
+        """Пользователь по id в быстром режиме совпадает с обычным ответом
+
+        1. Запросить пользователя в обычном режиме и с USERS_FAST_JSON.
+        2. Проверить: тела ответов и заголовки валидации совпадают.
+        """
+        expected = client.get(url=f'/api/users/{create_user.id}')
+        monkeypatch.setattr(user_routes, 'FAST_JSON', True)
+
+        response = client.get(url=f'/api/users/{create_user.id}')
+
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == expected.json()
+        assert response.headers['etag'] == expected.headers['etag']
+        assert response.headers['last-modified'] == expected.headers['last-modified']
@@ -0,0 +1,91 @@
+from http import HTTPStatus
+
+from fastapi.testclient import TestClient
+from pytest import mark
+
+from app.models.user import UserModel
+
+
+class TestUserFields:
+    """Выбор полей списка пользователей параметром fields"""
+    def test_get_users_fields(
+        self, client: TestClient, fill_users: list[UserModel], user_statements: list[str]
+    ):
+        """Страница содержит только выбранные поля, из БД читаются только их колонки
+
+        1. Запросить страницу с fields=id,email.
+        2. Проверить: в элементах только id и email, значения совпадают с полной страницей.
+        3. Проверить: запрос страницы к БД не выбирает остальные колонки.
+        """
+        params = {'page': 1, 'size': 10}
+        expected = client.get(url='/api/users', params=params).json()
+        user_statements.clear()
+
+        response = client.get(url='/api/users', params={**params, 'fields': 'id,email'})
+
+        assert response.status_code == HTTPStatus.OK
+        body = response.json()
+        assert body['total'] == expected['total'] >= len(fill_users)
+        assert body['items'] == [
+            {'id': item['id'], 'email': item['email']} for item in expected['items']]
+        page_query = next(statement for statement in user_statements if 'LIMIT' in statement)
+        assert 'users.email' in page_query
+        assert 'users.avatar' not in page_query
+        assert 'users.first_name' not in page_query
+
+    @mark.usefixtures('fill_users')
+    def test_get_users_fields_without_id(self, client: TestClient):
+        """Без id в fields элементы без id, ETag страницы отличается от полной
+
+        1. Запросить полную страницу и страницу с fields=email.
+        2. Проверить: в элементах только email, ETag разный.
+        3. Повторить запрос с полученным ETag в If-None-Match - 304.
+        """
+        full = client.get(url='/api/users')
+
+        response = client.get(url='/api/users', params={'fields': 'email'})
+
+        assert all(list(item) == ['email'] for item in response.json()['items'])
+        assert response.headers['etag'] != full.headers['etag']
+        repeated = client.get(
+            url='/api/users', params={'fields': 'email'},
+            headers={'If-None-Match': response.headers['etag']})
+        assert repeated.status_code == HTTPStatus.NOT_MODIFIED
+
+    @mark.usefixtures('fill_users')
+    def test_get_users_cursor_fields(self, client: TestClient):
+        """Страница по курсору с выбором полей
+
+        1. Запросить две страницы по курсору с fields=first_name.
+        2. Проверить: в элементах только first_name, курсор следующей страницы работает.
+        """
+        first = client.get(url='/api/users/cursor', params={'size': 2, 'fields': 'first_name'})
+        second = client.get(url='/api/users/cursor', params={
+            'size': 2, 'fields': 'first_name', 'cursor': first.json()['next']})
+
+        assert second.status_code == HTTPStatus.OK
+        for page in (first.json(), second.json()):
+            assert [list(item) for item in page['items']] == [['first_name']] * 2
+
+    @mark.parametrize('fields', ['password', 'id,version', ','])
+    def test_get_users_unknown_fields(self, client: TestClient, fields: str):
+        """Неизвестные или пустые поля - 422
+
+        1. Запросить страницу с неизвестным полем.
+        2. Проверить: код ответа 422.
+        """
+        response = client.get(url='/api/users', params={'fields': fields})
+
+        assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+    @mark.usefixtures('fill_users')
+    def test_get_users_fields_async(self, async_client: TestClient):
+        """Выбор полей с асинхронным движком БД
+
+        1. Запросить страницу с fields=id,last_name (DATABASE_ASYNC).
+        2. Проверить: в элементах только id и last_name.
+        """
+        response = async_client.get(url='/api/users', params={'fields': 'id,last_name'})
+
+        assert response.status_code == HTTPStatus.OK
+        assert all(list(item) == ['id', 'last_name'] for item in response.json()['items'])
@@ -0,0 +1,83 @@
+import csv
+import io
+import json
+from http import HTTPStatus
+
+from fastapi import Response
+from fastapi.testclient import TestClient
+from pytest import mark
+
+from app.models.user import ImportReportModel, UserCreateModel, UserModel
+
+
+def to_ndjson(rows: list[dict]) -> str:
+    """Строки в формате NDJSON"""
+    return ''.join(json.dumps(row) + '\n' for row in rows)
+
+
+def to_csv(rows: list[dict]) -> str:
+    """Строки в формате CSV с заголовком"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(UserCreateModel.model_fields))
+    writer.writeheader()
+    writer.writerows(rows)
+    return buffer.getvalue()
+
+
+class TestImportUsers:
+    """Импорт пользователей POST /api/users/import"""
+    @mark.parametrize('file_format, encode', [('ndjson', to_ndjson), ('csv', to_csv)])
+    def test_import_users(
+        self, client: TestClient, users_for_import: list[dict], file_format: str, encode
+    ):
+        """Импорт загружает валидные строки и отчитывается об отклонённых
+
+        1. Импортировать файл с валидными строками и строкой с невалидным email.
+        2. Проверить: валидные строки загружены, невалидная отклонена с номером строки.
+        """
+        rows = users_for_import + [{**users_for_import[0], 'email': 'not-an-email'}]
+
+        response: Response = client.post(
+            url='/api/users/import',
+            params={'format': file_format},
+            files={'file': (f'users.{file_format}', encode(rows))},
+        )
+
+        assert response.status_code == HTTPStatus.OK
+        report = ImportReportModel.model_validate(response.json())
+        assert (report.imported, report.rejected) == (len(users_for_import), 1)
+        assert report.errors[0].row == len(rows) + int(file_format == 'csv')
+        exported = client.get(url='/api/users/export', params={'fields': 'email'})
+        emails = {json.loads(line)['email'] for line in exported.iter_lines()}
+        assert {row['email'] for row in users_for_import} <= emails
+
+    @mark.parametrize('file_format, encode', [('ndjson', to_ndjson), ('csv', to_csv)])
+    def test_import_email_conflict(
+        self, client: TestClient, users_for_import: list[dict], create_user: UserModel,
+        file_format: str, encode
+    ):
+        """Занятый email отклоняет только свою строку
+
+        1. Импортировать файл с email существующего пользователя и повтором email в файле.
+        2. Проверить: остальные строки загружены, обе строки отклонены с номерами строк.
+        """
+        rows = users_for_import[:5] + [
+            {**users_for_import[5], 'email': create_user.email},
+            {**users_for_import[6], 'email': users_for_import[0]['email']},
+        ] + users_for_import[7:]
+
+        response: Response = client.post(
+            url='/api/users/import',
+            params={'format': file_format},
+            files={'file': (f'users.{file_format}', encode(rows))},
+        )
+
+        assert response.status_code == HTTPStatus.OK
+        report = ImportReportModel.model_validate(response.json())
+        assert (report.imported, report.rejected) == (len(rows) - 2, 2)
+        header = int(file_format == 'csv')
+        assert [error.row for error in report.errors] == [6 + header, 7 + header]
+        assert {error.error for error in report.errors} == {'Email already registered'}
+        exported = client.get(url='/api/users/export', params={'fields': 'email'})
+        emails = {json.loads(line)['email'] for line in exported.iter_lines()}
+        assert {row['email'] for row in users_for_import[7:]} <= emails
@@ -0,0 +1,63 @@
+import random
+from http import HTTPStatus
+
+from fastapi.testclient import TestClient
+from pytest import MonkeyPatch
+from sqlmodel import Session, col, select
+
+from app.database import seed
+from app.database._engine import get_engine
+from app.database.seed import generate_users, seed_users, seeded_users
+from app.database.users import delete_users
+from app.models.user import UserCreateModel, UserModel
+
+
+class TestSeedUsers:
+    """Генерация пользователей для тестов и нагрузки"""
+    def test_generate_users_seeded(self):
+        """Одинаковый seed даёт одинаковых валидных пользователей с уникальными email
+
+        1. Сгенерировать две пачки с одним seed.
+        2. Проверить: пачки совпадают, email уникальны, строки проходят UserCreateModel.
+        """
+        users = generate_users(500, seed=1)
+
+        assert users == generate_users(500, seed=1)
+        assert len({user['email'] for user in users}) == len(users)
+        assert all(UserCreateModel.model_validate(user) for user in users)
+
+    def test_seeded_users_cleanup(self, client: TestClient):
+        """Временные пользователи доступны через API и удаляются после использования
+
+        1. Создать пользователей через seeded_users.
+        2. Проверить: пользователь доступен через API.
+        3. Проверить: после выхода из контекста пользователи удалены.
+        """
+        with seeded_users(20, seed=2) as users:
+            assert len(users) == 20
+            response = client.get(url=f'/api/users/{users[0].id}')
+            assert response.status_code == HTTPStatus.OK
+            assert response.json()['email'] == users[0].email
+
+        for user in users:
+            assert client.get(url=f'/api/users/{user.id}').status_code == HTTPStatus.NOT_FOUND
+
+    def test_seed_users_conflicts(self, monkeypatch: MonkeyPatch):
+        """seed_users возвращает число реально добавленных строк
+
+        1. Зафиксировать стартовый номер email и добавить пачку пользователей.
+        2. Повторить с тем же seed: все email уже заняты.
+        3. Проверить: первый вызов вернул размер пачки, повторный вернул 0.
+        """
+        start = 10 ** 9
+        monkeypatch.setattr(seed, 'next_number', lambda: start)
+        users = generate_users(5, random.Random(3).getrandbits(64), start)
+        emails = [user['email'] for user in users]
+        try:
+            assert seed_users(5, seed=3) == 5
+            assert seed_users(5, seed=3) == 0
+        finally:
+            with Session(get_engine()) as session:
+                user_ids = session.exec(
+                    select(UserModel.id).where(col(UserModel.email).in_(emails))).all()
+            delete_users(list(user_ids))
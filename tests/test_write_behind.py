@@ -0,0 +1,150 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+from fastapi.testclient import TestClient
+
+from app.__main__ import app
+from app.database import _engine
+from app.database.seed import generate_user
+from app.database.write_behind import QueueFull, WriteBehindQueue
+from app.models.user import UserModel
+
+BURST = 20
+
+
+def create_burst(client: TestClient, payloads: list[dict]) -> list:
+    """Одновременные POST /api/users"""
+    with ThreadPoolExecutor(len(payloads)) as executor:
+        return list(executor.map(
+            lambda user_data: client.post(url='/api/users', json=user_data), payloads))
+
+
+def users_data(count: int) -> list[dict]:
+    """Данные для создания count пользователей"""
+    return [generate_user().model_dump(mode='json') for _ in range(count)]
+
+
+class TestWriteBehind:
+    """Отложенная пакетная запись создаваемых пользователей USERS_WRITE_BEHIND"""
+    def test_create_burst(self, monkeypatch, user_creates: WriteBehindQueue):
+        """Одновременные создания записываются пачками, каждый получает свой id
+
+        1. Одновременно создать BURST пользователей.
+        2. Проверить: все ответы 201 с разными id, пользователи читаются по id.
+        3. Проверить: записано меньше пачек, чем пользователей.
+        """
+        monkeypatch.setattr(_engine, 'DATABASE_ASYNC', False)
+        data = users_data(BURST)
+
+        with TestClient(app) as client:
+            responses = create_burst(client, data)
+            created = [UserModel.model_validate(response.json()) for response in responses]
+            found = client.get(url=f'/api/users/{created[-1].id}')
+
+        assert [response.status_code for response in responses] == [HTTPStatus.CREATED] * BURST
+        assert [user.email for user in created] == [user_data['email'] for user_data in data]
+        assert len({user.id for user in created}) == BURST
+        assert found.json()['email'] == data[-1]['email']
+        assert user_creates.stats()['written'] == BURST
+        assert user_creates.stats()['batches'] < BURST
+
+    def test_create_conflict(self, async_client: TestClient, user_creates: WriteBehindQueue):
+        """Занятый email в пачке - 409 только для своего запроса
+
+        1. Создать пользователя, затем одновременно его же и ещё четырёх (DATABASE_ASYNC).
+        2. Проверить: повтор - 409, остальные созданы.
+        """
+        data = users_data(5)
+        first = async_client.post(url='/api/users', json=data[0])
+
+        responses = create_burst(async_client, data)
+
+        assert first.status_code == HTTPStatus.CREATED
+        assert responses[0].status_code == HTTPStatus.CONFLICT
+        assert [response.status_code for response in responses[1:]] == [HTTPStatus.CREATED] * 4
+        assert user_creates.stats()['written'] == 5
+
+    def test_queue_full(self):
+        """Заполненная очередь отклоняет запись после ожидания
+
+        1. Создать очередь на одну запись с медленной записью пачек.
+        2. Одновременно поставить три записи.
+        3. Проверить: одна отклонена QueueFull, остальные записаны.
+        """
+        async def slow_flush(new_users: list[dict]) -> list:
+            await asyncio.sleep(0.2)
+            return new_users
+
+        async def submit_three():
+            queue = WriteBehindQueue(slow_flush, batch_size=1, maxsize=1, put_timeout=0.05)
+            results = await asyncio.gather(
+                *(queue.submit({'n': n}) for n in range(3)), return_exceptions=True)
+            await queue.close()
+            return results
+
+        results = asyncio.run(submit_three())
+
+        assert [type(result) for result in results] == [dict, dict, QueueFull]
+
+    def test_queue_full_response(self, client: TestClient, user_data_for_create: dict, monkeypatch,
+                                 user_creates: WriteBehindQueue):
+        """Переполнение очереди - 503 с Retry-After
+
+        1. Сделать постановку в очередь всегда неуспешной.
+        2. Создать пользователя.
+        3. Проверить: код ответа 503, заголовок Retry-After.
+        """
+        async def full(_):
+            raise QueueFull
+        monkeypatch.setattr(user_creates, 'submit', full)
+
+        response = client.post(url='/api/users', json=user_data_for_create)
+
+        assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+        assert response.headers['retry-after'] == '1'
+
+    def test_close_flushes(self):
+        """Остановка записывает всё, что осталось в очереди
+
+        1. Поставить записи в очередь с долгим интервалом сбора пачки, не дожидаясь их.
+        2. Остановить очередь.
+        3. Проверить: все записи записаны одной пачкой, ожидающие получили результат.
+        """
+        written = []
+
+        async def flush(new_users: list[dict]) -> list:
+            written.append(new_users)
+            return new_users
+
+        async def submit_and_close():
+            queue = WriteBehindQueue(flush, flush_ms=60_000)
+            pending = [asyncio.ensure_future(queue.submit({'n': n})) for n in range(3)]
+            await asyncio.sleep(0)
+            await queue.close()
+            return await asyncio.gather(*pending)
+
+        results = asyncio.run(submit_and_close())
+
+        assert written == [[{'n': 0}, {'n': 1}, {'n': 2}]]
+        assert results == [{'n': 0}, {'n': 1}, {'n': 2}]
+
+    def test_flush_error(self):
+        """Ошибка записи пачки передаётся всем её ожидающим
+
+        1. Поставить две записи в очередь, запись пачки завершается ошибкой.
+        2. Проверить: оба вызова получили ошибку.
+        """
+        async def broken(_):
+            raise RuntimeError('database is down')
+
+        async def submit_two():
+            queue = WriteBehindQueue(broken)
+            results = await asyncio.gather(
+                queue.submit({}), queue.submit({}), return_exceptions=True)
+            await queue.close()
+            return results
+
+        results = asyncio.run(submit_two())
+
+        assert all(isinstance(result, RuntimeError) for result in results)